@@ -7,9 +7,16 @@ structured findings that the React ``AIAnalysisModal`` can render.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import TTLCache
+from .termmatch import TermMatcher
 
 UNCERTAINTY_TERMS = {
     "maybe",
@@ -48,15 +55,40 @@ MEDIA_HINT_TERMS = {
     "screenshot",
 }
 
+# Built once; counts all three families in one call.  Terms match as
+# substrings, like the client-side analyser, so "roads" counts as "road".
+TERM_MATCHER = TermMatcher(
+    {
+        "uncertainty_terms": UNCERTAINTY_TERMS,
+        "evidence_terms": MEDIA_HINT_TERMS,
+        "concrete_terms": CONCRETE_DETAIL_TERMS,
+    }
+)
+
 SEVERITY_ORDER = {"low": 0, "medium": 1, "moderate": 1, "high": 2, "critical": 3}
 
 RESPONSE_LABELS = ["Suspicious", "Needs Review", "Likely Authentic"]
 
+# Incidents normalised and scored together by ``analyse_batch``.
+BATCH_CHUNK_SIZE = 256
+
 
 @dataclass
 class NormalisedIncident:
     """Container for the normalised incident payload."""
 
+    __slots__ = (
+        "description",
+        "type",
+        "severity",
+        "location",
+        "full_address",
+        "tags",
+        "photo_url",
+        "created_at",
+        "reporter_reputation",
+    )
+
     description: str
     type: str
     severity: str
@@ -71,27 +103,167 @@ class NormalisedIncident:
     def has_photo(self) -> bool:
         return bool(self.photo_url)
 
+    @property
+    def has_verified_tag(self) -> bool:
+        return any(t.lower() == "verified" for t in self.tags)
+
+    def cache_key(self) -> str:
+        """Stable digest of the fields that scoring reads, except the time.
+
+        Incidents with the same key score the same apart from recency, which
+        ``AIReportAnalyzer`` recomputes on every call.
+        """
+
+        fields = [
+            self.description,
+            self.type,
+            self.severity,
+            self.location or self.full_address,
+            self.has_photo,
+            bool(self.tags),
+            self.has_verified_tag,
+            self.reporter_reputation,
+        ]
+        encoded = json.dumps(fields, ensure_ascii=False).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+@dataclass
+class IncidentFeatures:
+    """Scoring inputs derived from a ``NormalisedIncident``.
+
+    Scorers read the typed attributes directly; ``as_dict`` builds the
+    ``feature_summary`` of a response.  Recency is not stored, so the record
+    can be cached as the incident ages.
+    """
+
+    __slots__ = (
+        "description",
+        "word_count",
+        "char_count",
+        "uncertainty_terms",
+        "evidence_terms",
+        "concrete_terms",
+        "has_digits",
+        "has_photo",
+        "severity",
+        "severity_rank",
+        "type",
+        "location",
+        "has_tags",
+        "has_verified_tag",
+        "reporter_reputation",
+    )
+
+    description: str
+    word_count: int
+    char_count: int
+    uncertainty_terms: int
+    evidence_terms: int
+    concrete_terms: int
+    has_digits: bool
+    has_photo: bool
+    severity: str
+    severity_rank: int
+    type: str
+    location: str
+    has_tags: bool
+    has_verified_tag: bool
+    reporter_reputation: Optional[float]
+
+    def as_dict(self, recency_hours: Optional[float] = None) -> Dict[str, object]:
+        summary = dict(zip(self.__slots__, _feature_values(self)))
+        summary["recency_hours"] = recency_hours
+        return summary
+
+
+_feature_values = attrgetter(*IncidentFeatures.__slots__)
+
+# Features, authenticity, red flags and recommendation: the parts of an
+# analysis that do not depend on the current time.
+_StaticScores = Tuple[IncidentFeatures, Dict[str, object], List[str], str]
+
 
 class AIReportAnalyzer:
     """Rule-based incident analyser that mimics an AI assistant."""
 
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[TTLCache] = None) -> None:
         self._model_status = {
             "ready": True,
             "message": "Heuristic scoring engine initialised inside admin-frontend.",
         }
+        # Time-independent scores by ``NormalisedIncident.cache_key``.
+        # Results built from a cached entry share its parts, so callers must
+        # not modify what ``analyse`` returns.
+        self.cache = cache
 
     # ------------------------------------------------------------------
     def analyse(self, incident: Dict) -> Dict:
         """Analyse an incident and return structured findings."""
 
-        normalised = self._normalise(incident)
-        features = self._extract_features(normalised)
+        return self._analyse_normalised(self._normalise(incident))
+
+    def analyse_batch(
+        self, incidents: Iterable[Dict], chunk_size: int = BATCH_CHUNK_SIZE
+    ) -> Iterator[Dict]:
+        """Analyse many incidents, yielding one outcome per incident in order.
+
+        Each outcome is ``{"status": "success", "analysis": ...}`` or
+        ``{"status": "error", "error": ...}``; an invalid incident does not
+        stop the batch.  ``incidents`` is consumed lazily, ``chunk_size`` at
+        a time.
+        """
+
+        iterator = iter(incidents)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+
+            outcomes: List[Optional[Dict]] = [None] * len(chunk)
+            valid: List[int] = []
+            normalised: List[NormalisedIncident] = []
+            for i, incident in enumerate(chunk):
+                try:
+                    normalised.append(self._normalise(incident))
+                    valid.append(i)
+                except ValueError as exc:
+                    outcomes[i] = {"status": "error", "error": str(exc)}
+                except Exception as exc:
+                    outcomes[i] = _failure(exc)
+
+            now = datetime.utcnow()
+            for i, item in zip(valid, normalised):
+                try:
+                    outcomes[i] = {"status": "success", "analysis": self._analyse_normalised(item, now)}
+                except Exception as exc:
+                    outcomes[i] = _failure(exc)
+
+            yield from outcomes
 
+    # ------------------------------------------------------------------
+    def _analyse_normalised(self, incident: NormalisedIncident, now: Optional[datetime] = None) -> Dict:
+        static = None
+        if self.cache is not None:
+            key = incident.cache_key()
+            static = self.cache.get(key)
+        if static is None:
+            static = self._score_static(self._extract_features(incident))
+            if self.cache is not None:
+                self.cache.set(key, static)
+        return self._assemble(static, self._recency_hours(incident, now))
+
+    def _score_static(self, features: IncidentFeatures) -> _StaticScores:
         authenticity = self._score_authenticity(features)
-        quality = self._score_quality(features)
         red_flags = self._detect_red_flags(features)
         recommendation = self._generate_recommendation(authenticity, red_flags)
+        return features, authenticity, red_flags, recommendation
+
+    def _assemble(self, static: _StaticScores, recency_hours: Optional[float]) -> Dict:
+        """Complete an analysis with the time-dependent quality score."""
+
+        features, authenticity, red_flags, recommendation = static
+        quality = self._score_quality(features, recency_hours)
         reasoning = self._build_reasoning(features, authenticity, quality, red_flags)
 
         return {
@@ -101,7 +273,7 @@ class AIReportAnalyzer:
             "red_flags": red_flags,
             "recommendation": recommendation,
             "reasoning": reasoning,
-            "feature_summary": features,
+            "feature_summary": features.as_dict(recency_hours),
         }
 
     # ------------------------------------------------------------------
@@ -181,48 +353,36 @@ class AIReportAnalyzer:
         )
 
     # ------------------------------------------------------------------
-    def _extract_features(self, incident: NormalisedIncident) -> Dict[str, object]:
-        words = [w for w in incident.description.split() if w]
-        word_count = len(words)
-        char_count = len(incident.description)
-
-        uncertainty_hits = self._count_terms(incident.description, UNCERTAINTY_TERMS)
-        evidence_terms = self._count_terms(incident.description, MEDIA_HINT_TERMS)
-        concrete_terms = self._count_terms(incident.description, CONCRETE_DETAIL_TERMS)
-        has_digits = any(ch.isdigit() for ch in incident.description)
-
-        severity_rank = SEVERITY_ORDER.get(incident.severity, 1)
-        has_tags = bool(incident.tags)
-        has_verified_tag = any(t.lower() == "verified" for t in incident.tags)
-
-        recency_hours = None
-        if incident.created_at:
-            recency_hours = max(
-                (datetime.utcnow() - incident.created_at).total_seconds() / 3600.0,
-                0,
-            )
+    def _extract_features(self, incident: NormalisedIncident) -> IncidentFeatures:
+        description = incident.description
+        uncertainty_hits, evidence_terms, concrete_terms = TERM_MATCHER.count(description)
+
+        return IncidentFeatures(
+            description=description,
+            word_count=len(description.split()),
+            char_count=len(description),
+            uncertainty_terms=uncertainty_hits,
+            evidence_terms=evidence_terms,
+            concrete_terms=concrete_terms,
+            has_digits=any(map(str.isdigit, description)),
+            has_photo=incident.has_photo,
+            severity=incident.severity,
+            severity_rank=SEVERITY_ORDER.get(incident.severity, 1),
+            type=incident.type,
+            location=incident.location or incident.full_address,
+            has_tags=bool(incident.tags),
+            has_verified_tag=incident.has_verified_tag,
+            reporter_reputation=incident.reporter_reputation,
+        )
 
-        return {
-            "description": incident.description,
-            "word_count": word_count,
-            "char_count": char_count,
-            "uncertainty_terms": uncertainty_hits,
-            "evidence_terms": evidence_terms,
-            "concrete_terms": concrete_terms,
-            "has_digits": has_digits,
-            "has_photo": incident.has_photo,
-            "severity": incident.severity,
-            "severity_rank": severity_rank,
-            "type": incident.type,
-            "location": incident.location or incident.full_address,
-            "has_tags": has_tags,
-            "has_verified_tag": has_verified_tag,
-            "reporter_reputation": incident.reporter_reputation,
-            "recency_hours": recency_hours,
-        }
+    @staticmethod
+    def _recency_hours(incident: NormalisedIncident, now: Optional[datetime] = None) -> Optional[float]:
+        if not incident.created_at:
+            return None
+        return max(((now or datetime.utcnow()) - incident.created_at).total_seconds() / 3600.0, 0)
 
     # ------------------------------------------------------------------
-    def _score_authenticity(self, features: Dict[str, object]) -> Dict[str, object]:
+    def _score_authenticity(self, features: IncidentFeatures) -> Dict[str, object]:
         score = 58.0
         confidence_weighting: Dict[str, float] = {
             "Likely Authentic": 0.33,
@@ -232,36 +392,36 @@ class AIReportAnalyzer:
 
         adjustments: List[str] = []
 
-        if features["has_photo"]:
+        if features.has_photo:
             score += 12
             adjustments.append("Photo evidence provided")
             confidence_weighting["Likely Authentic"] += 0.1
             confidence_weighting["Suspicious"] -= 0.05
 
-        if features["has_digits"] or features["concrete_terms"] >= 2:
+        if features.has_digits or features.concrete_terms >= 2:
             score += 10
             adjustments.append("Specific details detected in description")
             confidence_weighting["Likely Authentic"] += 0.06
             confidence_weighting["Needs Review"] -= 0.03
 
-        if features["uncertainty_terms"]:
-            penalty = min(18, features["uncertainty_terms"] * 6)
+        if features.uncertainty_terms:
+            penalty = min(18, features.uncertainty_terms * 6)
             score -= penalty
             adjustments.append("Uncertainty language used")
             confidence_weighting["Suspicious"] += 0.08
             confidence_weighting["Likely Authentic"] -= 0.04
 
-        if features["severity_rank"] >= 2 and features["word_count"] < 12:
+        if features.severity_rank >= 2 and features.word_count < 12:
             score -= 10
             adjustments.append("Severe incident reported with little context")
             confidence_weighting["Suspicious"] += 0.05
 
-        if features["has_verified_tag"]:
+        if features.has_verified_tag:
             score += 6
             adjustments.append("Previously verified by moderators")
             confidence_weighting["Likely Authentic"] += 0.05
 
-        reputation = features.get("reporter_reputation")
+        reputation = features.reporter_reputation
         if reputation is not None:
             if reputation >= 0.7:
                 score += 5
@@ -292,40 +452,41 @@ class AIReportAnalyzer:
         }
 
     # ------------------------------------------------------------------
-    def _score_quality(self, features: Dict[str, object]) -> Dict[str, object]:
+    def _score_quality(
+        self, features: IncidentFeatures, recency_hours: Optional[float] = None
+    ) -> Dict[str, object]:
         score = 55.0
         signals: List[str] = []
 
-        if features["word_count"] >= 20:
+        if features.word_count >= 20:
             score += 8
             signals.append("Detailed description (>20 words)")
-        elif features["word_count"] < 8:
+        elif features.word_count < 8:
             score -= 8
             signals.append("Very short description (<8 words)")
 
-        if features["concrete_terms"] >= 2:
+        if features.concrete_terms >= 2:
             score += 6
             signals.append("Contains concrete location cues")
 
-        if features["has_photo"]:
+        if features.has_photo:
             score += 10
             signals.append("Includes supporting photo evidence")
 
-        if features["evidence_terms"]:
+        if features.evidence_terms:
             score += 4
             signals.append("Mentions attached media")
 
-        if features["uncertainty_terms"]:
-            penalty = min(12, features["uncertainty_terms"] * 4)
+        if features.uncertainty_terms:
+            penalty = min(12, features.uncertainty_terms * 4)
             score -= penalty
             signals.append("Uses uncertainty language")
 
-        recency = features.get("recency_hours")
-        if recency is not None:
-            if recency <= 3:
+        if recency_hours is not None:
+            if recency_hours <= 3:
                 score += 5
                 signals.append("Reported within the last 3 hours")
-            elif recency > 24:
+            elif recency_hours > 24:
                 score -= 4
                 signals.append("Report is older than 24 hours")
 
@@ -337,23 +498,23 @@ class AIReportAnalyzer:
         }
 
     # ------------------------------------------------------------------
-    def _detect_red_flags(self, features: Dict[str, object]) -> List[str]:
+    def _detect_red_flags(self, features: IncidentFeatures) -> List[str]:
         red_flags: List[str] = []
 
-        if features["uncertainty_terms"] >= 2:
+        if features.uncertainty_terms >= 2:
             red_flags.append("Multiple uncertainty phrases detected in the report")
 
-        if features["severity_rank"] >= 2 and features["word_count"] <= 6:
+        if features.severity_rank >= 2 and features.word_count <= 6:
             red_flags.append(
                 "High severity incident described with five words or fewer"
             )
 
-        if not features["has_photo"] and features["severity_rank"] >= 2:
+        if not features.has_photo and features.severity_rank >= 2:
             red_flags.append("Severe incident reported without supporting media")
 
         if (
-            features.get("reporter_reputation") is not None
-            and features["reporter_reputation"] <= 0.2
+            features.reporter_reputation is not None
+            and features.reporter_reputation <= 0.2
         ):
             red_flags.append("Reporter reputation is flagged as very low")
 
@@ -377,21 +538,21 @@ class AIReportAnalyzer:
     # ------------------------------------------------------------------
     def _build_reasoning(
         self,
-        features: Dict[str, object],
+        features: IncidentFeatures,
         authenticity: Dict[str, object],
         quality: Dict[str, object],
         red_flags: List[str],
     ) -> str:
         fragments: List[str] = []
 
-        if features["has_photo"]:
+        if features.has_photo:
             fragments.append("Photo evidence increases confidence.")
         else:
             fragments.append("No media was attached.")
 
-        if features["word_count"]:
+        if features.word_count:
             fragments.append(
-                f"Description length: {features['word_count']} words with {features['concrete_terms']} location cues."
+                f"Description length: {features.word_count} words with {features.concrete_terms} location cues."
             )
 
         if authenticity["signals"]:
@@ -442,10 +603,9 @@ class AIReportAnalyzer:
                     continue
         return None
 
-    @staticmethod
-    def _count_terms(text: str, terms: Iterable[str]) -> int:
-        lowered = text.lower()
-        return sum(lowered.count(term) for term in terms)
+
+def _failure(exc: Exception) -> Dict[str, str]:
+    return {"status": "error", "error": "Failed to analyse incident.", "detail": str(exc)}
 
 
 __all__ = ["AIReportAnalyzer"]
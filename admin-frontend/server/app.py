@@ -6,24 +6,61 @@ application's backend codebase.
 """
 from __future__ import annotations
 
-from dataclasses import asdict
-from typing import Any
+import os
+from typing import Dict, Iterable, Iterator, Optional
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 
-from .analyzer import AIReportAnalyzer
+from .analyzer import BATCH_CHUNK_SIZE, AIReportAnalyzer
+from .cache import TTLCache
+from .jsonprovider import FastJSONProvider
+from .workers import AnalysisPool, resolve_workers
 
 app = Flask(__name__)
+# Dataclasses and NumPy values are encoded by the provider itself.
+app.json = FastJSONProvider(app)
 CORS(app)
-_analyzer = AIReportAnalyzer()
+
+# Admins reopen the same incidents; their time-independent scores are kept
+# for AI_ANALYSIS_CACHE_TTL seconds.  AI_ANALYSIS_CACHE_SIZE=0 disables it.
+ANALYSIS_CACHE_SIZE = int(os.environ.get("AI_ANALYSIS_CACHE_SIZE", 2048))
+ANALYSIS_CACHE_TTL = float(os.environ.get("AI_ANALYSIS_CACHE_TTL", 3600))
+_analyzer = AIReportAnalyzer(
+    cache=TTLCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL) if ANALYSIS_CACHE_SIZE > 0 else None
+)
+
+# Batch analysis runs on AI_ANALYSIS_WORKERS processes ("auto": one per
+# core); 0 keeps it in the request thread.  Single incidents are always
+# analysed in the request thread.
+_pool = AnalysisPool(
+    workers=resolve_workers(os.environ.get("AI_ANALYSIS_WORKERS")),
+    chunk_size=int(os.environ.get("AI_ANALYSIS_CHUNK_SIZE", BATCH_CHUNK_SIZE)),
+    max_pending=int(os.environ.get("AI_ANALYSIS_MAX_PENDING", 0)) or None,
+    start_method=os.environ.get("AI_ANALYSIS_START_METHOD") or None,
+    analyzer=_analyzer,
+    # Each worker process keeps its own cache of the same size.
+    cache_size=ANALYSIS_CACHE_SIZE,
+    cache_ttl=ANALYSIS_CACHE_TTL,
+)
+
+# Largest batch accepted by /ai-analysis/batch, and the size above which a
+# JSON response is streamed rather than built in memory.
+BATCH_MAX_ITEMS = int(os.environ.get("AI_BATCH_MAX_ITEMS", 10000))
+BATCH_STREAM_THRESHOLD = int(os.environ.get("AI_BATCH_STREAM_THRESHOLD", 200))
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
 
 
 @app.get("/health")
 def healthcheck():
     """Return a simple readiness marker for monitoring."""
 
-    return jsonify({"status": "ok", "engine": _analyzer._model_status})
+    return jsonify({
+        "status": "ok",
+        "engine": _analyzer._model_status,
+        "analysis_cache": _analyzer.cache.stats() if _analyzer.cache is not None else None,
+        "analysis_pool": _pool.stats(),
+    })
 
 
 @app.post("/ai-analysis")
@@ -49,21 +86,105 @@ def run_analysis():
             500,
         )
 
-    # Dataclasses appear within the feature summary; normalise for JSON.
-    serialised = _serialise(analysis)
-    return jsonify({"status": "success", "analysis": serialised})
-
-
-def _serialise(obj: Any) -> Any:
-    """Recursively convert dataclass instances within nested structures."""
-
-    if hasattr(obj, "__dataclass_fields__"):
-        return {key: _serialise(value) for key, value in asdict(obj).items()}
-    if isinstance(obj, dict):
-        return {key: _serialise(value) for key, value in obj.items()}
-    if isinstance(obj, list):
-        return [_serialise(value) for value in obj]
-    return obj
+    return jsonify({"status": "success", "analysis": analysis})
+
+
+@app.post("/ai-analysis/batch")
+def run_batch_analysis():
+    """Analyse many incidents in one request.
+
+    The body is ``{"incidents": [...]}``, a bare JSON array, or NDJSON (one
+    incident per line, ``Content-Type: application/x-ndjson``).  Items may
+    be incidents or ``{"incident": {...}}`` wrappers.  Results come back in
+    input order, each tagged with its ``index``; an invalid item gets an
+    error entry instead of failing the batch.  NDJSON requests, or requests
+    that ``Accept`` NDJSON, get NDJSON back.  Large JSON batches are
+    streamed.
+    """
+
+    ndjson_in = request.mimetype in NDJSON_MIMETYPES
+    ndjson_out = ndjson_in or request.accept_mimetypes.best_match(
+        ["application/json", *NDJSON_MIMETYPES]
+    ) in NDJSON_MIMETYPES
+    parse_errors: Dict[int, str] = {}
+
+    if ndjson_in:
+        incidents: Iterable = _ndjson_incidents(request.stream, parse_errors)
+        total: Optional[int] = None
+    else:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get("incidents")
+        if not isinstance(payload, list):
+            return (
+                jsonify({"status": "error", "error": "Request body must be a list of incidents or {'incidents': [...]}."}),
+                400,
+            )
+        if len(payload) > BATCH_MAX_ITEMS:
+            return (
+                jsonify({"status": "error", "error": f"A batch may contain at most {BATCH_MAX_ITEMS} incidents."}),
+                413,
+            )
+        incidents = (_unwrap(item) for item in payload)
+        total = len(payload)
+
+    def results() -> Iterator[Dict]:
+        for index, outcome in enumerate(_pool.analyse_batch(incidents)):
+            if index in parse_errors:
+                outcome = {"status": "error", "error": parse_errors.pop(index)}
+            yield {"index": index, **outcome}
+        if "limit" in parse_errors:
+            yield {"status": "error", "error": parse_errors.pop("limit")}
+
+    if ndjson_out:
+        lines = (app.json.dumps(item) + "\n" for item in results())
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    if total is not None and total <= BATCH_STREAM_THRESHOLD:
+        items = list(results())
+        return jsonify({
+            "status": "success",
+            "count": len(items),
+            "errors": sum(1 for item in items if item["status"] != "success"),
+            "results": items,
+        })
+
+    def document() -> Iterator[str]:
+        count = errors = 0
+        yield '{"status":"success","results":['
+        for item in results():
+            if item["status"] != "success":
+                errors += 1
+            yield ("," if count else "") + app.json.dumps(item)
+            count += 1
+        yield f'],"count":{count},"errors":{errors}}}\n'
+
+    return Response(stream_with_context(document()), mimetype="application/json")
+
+
+def _unwrap(item):
+    if isinstance(item, dict) and isinstance(item.get("incident"), dict):
+        return item["incident"]
+    return item
+
+
+def _ndjson_incidents(stream, parse_errors: Dict) -> Iterator:
+    """Incidents from an NDJSON body, read line by line as they are consumed."""
+
+    index = 0
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        if index >= BATCH_MAX_ITEMS:
+            parse_errors["limit"] = f"Batch limit of {BATCH_MAX_ITEMS} incidents reached; later lines were ignored."
+            return
+        try:
+            item = app.json.loads(line)
+        except ValueError as exc:
+            parse_errors[index] = f"Line {line_no} is not valid JSON: {exc}"
+            item = None
+        yield _unwrap(item)
+        index += 1
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""Re-score an export of incidents with the analysis worker pool.
+
+Reads incidents from a JSON array or NDJSON file (``-`` for stdin) and
+writes one NDJSON line per incident, ``{"index": i, ...outcome}``, in input
+order.  Lines are read only as fast as the workers can take them.  A
+summary goes to stderr.
+
+Run from ``admin-frontend``::
+
+    python -m server.rescore incidents.ndjson -o scores.ndjson --workers auto
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Iterator, TextIO
+
+from .analyzer import BATCH_CHUNK_SIZE
+from .workers import AnalysisPool, resolve_workers
+
+
+def read_incidents(fh: TextIO, errors: Dict[int, str]) -> Iterator:
+    """Incidents from a JSON array or NDJSON stream; bad lines go to ``errors``."""
+
+    first = fh.read(1)
+    while first.isspace():
+        first = fh.read(1)
+    if first == "[":
+        items = json.loads(first + fh.read())
+    else:
+        items = (line for line in _prepend(first, fh) if line.strip())
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except ValueError as exc:
+                errors[index] = f"Invalid JSON: {exc}"
+                item = None
+        if isinstance(item, dict) and isinstance(item.get("incident"), dict):
+            item = item["incident"]
+        yield item
+
+
+def _prepend(first: str, fh: TextIO) -> Iterator[str]:
+    lines = iter(fh)
+    yield first + next(lines, "")
+    yield from lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSON array or NDJSON file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--workers", default="auto", help="worker processes, or auto (default)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--max-pending", type=int, default=None, help="chunks queued at once")
+    args = parser.parse_args()
+
+    pool = AnalysisPool(resolve_workers(args.workers), args.chunk_size, args.max_pending)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    parse_errors: Dict[int, str] = {}
+    count = failed = 0
+    started = time.perf_counter()
+    try:
+        for index, outcome in enumerate(pool.analyse_batch(read_incidents(source, parse_errors))):
+            if index in parse_errors:
+                outcome = {"status": "error", "error": parse_errors.pop(index)}
+            if outcome["status"] != "success":
+                failed += 1
+            sink.write(json.dumps({"index": index, **outcome}) + "\n")
+            count += 1
+    finally:
+        pool.shutdown()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Scored {count} incident(s), {failed} failed, in {elapsed:.1f}s "
+        f"({count / elapsed if elapsed else 0:.0f}/s, {pool.mode}, {pool.workers} worker(s))",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Process pool for batch incident analysis.
+
+``AIReportAnalyzer`` is pure Python, so analysis in the request thread is
+limited to one core by the GIL.  ``AnalysisPool`` sends batches to worker
+processes instead.  Incidents are grouped into chunks so each round trip
+carries enough work to pay for its pickling.  Every worker builds its
+analyser once, when it starts, with its own ``TTLCache`` of
+``cache_size`` entries when that is above zero.  Caches are not shared
+between processes; each chunk's result carries its worker's cache stats,
+and ``stats()`` sums the latest of them.
+
+Only a bounded number of chunks can be queued or running at once.  A caller
+submitting past that limit blocks until a chunk finishes, so a large
+re-scoring job is read at the pace the workers can absorb it.  Results are
+yielded in input order.
+
+With ``workers=0`` the pool analyses in the calling thread, with
+``analyzer`` if one is given, and no processes are started.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .analyzer import BATCH_CHUNK_SIZE, AIReportAnalyzer, _failure
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Analyser of the current worker process, built by ``_init_worker``.
+_worker_analyzer: Optional[AIReportAnalyzer] = None
+
+
+def _init_worker(cache_size: int = 0, cache_ttl: float = 3600.0) -> None:
+    global _worker_analyzer
+    _worker_analyzer = AIReportAnalyzer(cache=TTLCache(cache_size, cache_ttl) if cache_size > 0 else None)
+
+
+def _analyse_chunk(incidents: List) -> Tuple[int, Optional[Dict[str, object]], List[Dict]]:
+    """Outcomes for ``incidents``, with this worker's pid and cache stats."""
+
+    outcomes = list(_worker_analyzer.analyse_batch(incidents, chunk_size=max(len(incidents), 1)))
+    cache = _worker_analyzer.cache
+    return os.getpid(), cache.stats() if cache is not None else None, outcomes
+
+
+def resolve_workers(value: Optional[str]) -> int:
+    """Worker count from a setting: a number, or ``auto`` for one per core."""
+
+    value = (value or "0").strip().lower()
+    if value == "auto":
+        return os.cpu_count() or 1
+    workers = int(value)
+    if workers < 0:
+        raise ValueError("worker count must be 0 or more")
+    return workers
+
+
+class AnalysisPool:
+    """Runs ``AIReportAnalyzer.analyse_batch`` on worker processes.
+
+    ``max_pending`` bounds the chunks queued or running across all callers
+    (default: two per worker).  ``start_method`` picks the multiprocessing
+    start method; the platform default is used when it is ``None``.
+    ``cache_size`` and ``cache_ttl`` configure each worker's analysis cache.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        max_pending: Optional[int] = None,
+        start_method: Optional[str] = None,
+        analyzer: Optional[AIReportAnalyzer] = None,
+        cache_size: int = 0,
+        cache_ttl: float = 3600.0,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_pending = max(max_pending or 2 * workers, 1)
+        self.start_method = start_method
+        self.cache_size = cache_size
+        self.cache_ttl = float(cache_ttl)
+        self._local = analyzer or AIReportAnalyzer()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._pending = 0
+        self._chunks = 0
+        self._incidents = 0
+        self._restarts = 0
+        # Latest cache stats reported by each live worker, by pid.
+        self._worker_caches: Dict[int, Dict[str, object]] = {}
+
+    @property
+    def mode(self) -> str:
+        return "process" if self.workers else "inline"
+
+    def analyse_batch(self, incidents: Iterable) -> Iterator[Dict]:
+        """Outcomes for ``incidents``, in order, as ``analyse_batch`` yields them."""
+
+        if not self.workers:
+            yield from self._local.analyse_batch(incidents, self.chunk_size)
+            return
+
+        iterator = iter(incidents)
+        # This caller's chunks in flight, oldest first.
+        in_flight: Deque[Tuple[Future, int, ProcessPoolExecutor]] = deque()
+        try:
+            while True:
+                chunk = list(islice(iterator, self.chunk_size))
+                if not chunk:
+                    break
+                # Collect what is already done before blocking for a slot.
+                while in_flight and in_flight[0][0].done():
+                    yield from self._collect(*in_flight.popleft())
+                if len(in_flight) >= self.max_pending:
+                    yield from self._collect(*in_flight.popleft())
+                in_flight.append(self._submit(chunk))
+            while in_flight:
+                yield from self._collect(*in_flight.popleft())
+        finally:
+            for future, _, _ in in_flight:
+                future.cancel()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "max_pending": self.max_pending,
+            "pending_chunks": self._pending,
+            "chunks": self._chunks,
+            "incidents": self._incidents,
+            "restarts": self._restarts,
+            "worker_caches": self._cache_stats(),
+        }
+
+    def _cache_stats(self) -> Optional[Dict[str, object]]:
+        if not (self.workers and self.cache_size > 0):
+            return None
+        with self._lock:
+            reports = list(self._worker_caches.values())
+        totals: Dict[str, object] = {
+            "workers_reporting": len(reports),
+            "maxsize_per_worker": self.cache_size,
+            "ttl_seconds": self.cache_ttl,
+        }
+        for name in ("size", "hits", "misses", "evictions", "expirations"):
+            totals[name] = sum(report[name] for report in reports)
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 3) if lookups else 0.0
+        return totals
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._executor_pid == os.getpid():
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    def _submit(self, chunk: List) -> Tuple[Future, int, ProcessPoolExecutor]:
+        # Backpressure: wait for a free slot before queueing more work.
+        self._slots.acquire()
+        try:
+            executor = self._ensure_executor()
+            future = executor.submit(_analyse_chunk, chunk)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending += 1
+            self._chunks += 1
+            self._incidents += len(chunk)
+        future.add_done_callback(self._release)
+        return future, len(chunk), executor
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _collect(self, future: Future, size: int, executor: ProcessPoolExecutor) -> Iterator[Dict]:
+        try:
+            pid, cache_stats, outcomes = future.result()
+        except BrokenProcessPool as exc:
+            # A worker died; later chunks go to a fresh pool.
+            self._reset_executor(executor)
+            outcomes = [_failure(exc)] * size
+        except Exception as exc:
+            outcomes = [_failure(exc)] * size
+        else:
+            if cache_stats is not None:
+                with self._lock:
+                    if self._executor is executor:
+                        self._worker_caches[pid] = cache_stats
+        yield from outcomes
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    context = multiprocessing.get_context(self.start_method)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=context,
+                        initializer=_init_worker,
+                        initargs=(self.cache_size, self.cache_ttl),
+                    )
+                    self._executor_pid = pid
+                    logger.info("Started %d analysis worker(s) (%s)", self.workers, context.get_start_method())
+        return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Chunks that were queued on the broken pool all fail; reset once.
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self._restarts += 1
+            # The new workers start with empty caches.
+            self._worker_caches.clear()
+        logger.warning("Analysis worker pool broke; restarting it")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["AnalysisPool", "resolve_workers"]
@@ -3,6 +3,8 @@
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from sentence_transformers import SentenceTransformer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
@@ -55,11 +57,24 @@ keyword_type_map = {
 # === LTA TrafficSpeedBands fetch ===
 ACCOUNT_KEY = "orxOhzCKSY+kXRrlIyWWrQ=="
 BASE_URL = "https://datamall2.mytransport.sg/ltaodataservice/v4/TrafficSpeedBands"
+LTA_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+
+# One keep-alive session for all DataMall calls, with bounded retries and backoff
+lta_session = requests.Session()
+lta_session.mount("https://", HTTPAdapter(
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+))
 
 def get_live_speed(road_name):
     headers = {"AccountKey": ACCOUNT_KEY, "accept": "application/json"}
     try:
-        resp = requests.get(BASE_URL, headers=headers)
+        resp = lta_session.get(BASE_URL, headers=headers, timeout=LTA_TIMEOUT)
         data = resp.json().get("value", [])
         for entry in data:
             if road_name.lower() in entry["RoadName"].lower():
@@ -231,7 +246,7 @@ def analyze_report(description, road_name, incident_type, live_speed=None):
 def fetch_road_names():
     headers = {"AccountKey": ACCOUNT_KEY, "accept": "application/json"}
     try:
-        resp = requests.get(BASE_URL, headers=headers)
+        resp = lta_session.get(BASE_URL, headers=headers, timeout=LTA_TIMEOUT)
         data = resp.json().get("value", [])
 
         # Extract unique road names
@@ -1,55 +1,195 @@
 # backend-app.py (COMPLETE - USING ALL YOUR IPYNB CODE)
 # Flask backend for traffic congestion prediction
-from flask import Flask, request, jsonify
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
-import joblib
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import requests
+import logging
 import os
+import threading
+
+from backend.congestion import CongestionRanking
+from backend.fanout import UpstreamPool, UpstreamTimeout
+from backend.geocache import GeocodeCache
+from backend.geometry import format_geometry, parse_geometry_options
+from backend.history import SpeedHistory, history_capacity
+from backend.inference import CongestionScorer
+from backend.jsonprovider import FastJSONProvider
+from backend.ingest import SpeedBandIngester
+from backend.linkmatch import LinkIndex
+from backend.linkscores import FORECAST_HORIZONS_MIN, LinkScoreTable
+from backend.logs import configure_logging
+from backend.outbound import OutboundClient, UpstreamConfig
+from backend.registry import ModelRegistry
+from backend.routecache import RouteCache
+from backend.speedbands import SpeedBandStore
+from backend.startup import StartupProfile, warm_up
+from backend.telemetry import MetricsRegistry, RequestTimer, begin_request, end_request, new_request_id, stage
+from backend.treepredict import compile_for
+
+# Start-up phase timings, reported on /health
+startup = StartupProfile(started=_import_started)
+startup.record('imports', time.perf_counter() - _import_started)
+
+# Log records are queued and written by a background thread, tagged with the
+# request id; LOG_LEVEL=DEBUG adds per-route detail
+log_handler = configure_logging(
+    os.environ.get('LOG_LEVEL', 'INFO'),
+    maxsize=int(os.environ.get('LOG_QUEUE_SIZE', 10000)),
+)
+log = logging.getLogger('backend.app')
+
+# Per-process metrics, scraped from /metrics
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    'http_request_duration_seconds', 'Time to produce a response.',
+    ('endpoint', 'method', 'status'),
+)
+stage_seconds = metrics.histogram(
+    'backend_stage_duration_seconds', 'Time spent in one stage of a request.',
+    ('endpoint', 'stage'),
+)
 
 app = Flask(__name__)
+# orjson-backed jsonify that also encodes NumPy scalars and arrays
+app.json = FastJSONProvider(app)
 CORS(app, resources={
     r"/*": {
         "origins": [
             "https://fyp-trafficforecast-development-driver.onrender.com",
             "https://curly-space-system-g4xw75qxrxq4fjj-3000.app.github.dev",
             "http://localhost:3000"
-        ]
+        ],
+        "expose_headers": ["X-Request-ID", "Server-Timing"]
     }
 })
 
-MODEL_PATH = 'congestion_model_2.pkl'
-model = None
-FEATS = None
-
-try:
-    if os.path.exists(MODEL_PATH):
-        mdl_bundle = joblib.load(MODEL_PATH)
-        model = mdl_bundle["model"]
-        FEATS = mdl_bundle["features"]
-        print(f"✅ Model loaded successfully")
-        print(f"✅ Features: {FEATS}")
-    else:
-        print(f"⚠️ Model file not found at {MODEL_PATH}")
-        FEATS = [
-            "SpeedKMH_Est", "MinimumSpeed", "MaximumSpeed",
-            "dow", "hour", "incident_count", "vms_count", "cctv_count", "ett_mean"
-        ]
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    FEATS = [
-        "SpeedKMH_Est", "MinimumSpeed", "MaximumSpeed",
-        "dow", "hour", "incident_count", "vms_count", "cctv_count", "ett_mean"
-    ]
+
+@app.before_request
+def start_request_telemetry():
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_timer = RequestTimer(request.endpoint or 'unmatched', stage_seconds)
+    g.telemetry_tokens = begin_request(g.request_timer, g.request_id)
+
+
+@app.after_request
+def finish_request_telemetry(response):
+    timer = g.get('request_timer')
+    if timer is not None:
+        request_seconds.observe(
+            timer.elapsed(), endpoint=timer.endpoint,
+            method=request.method, status=str(response.status_code),
+        )
+        response.headers['X-Request-ID'] = g.request_id
+        response.headers['Server-Timing'] = timer.server_timing()
+    return response
+
+
+@app.teardown_request
+def end_request_telemetry(exc):
+    tokens = g.pop('telemetry_tokens', None)
+    if tokens is not None:
+        end_request(tokens)
+
+# Map the model's tree arrays from the file instead of copying them
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '0') == '1'
+COMPILED_PREDICTOR = os.environ.get('COMPILED_PREDICTOR', '1') == '1'
+COMPILED_MAX_ROWS = int(os.environ.get('COMPILED_MAX_ROWS', 512))
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP', '1') == '1'
+
+# Cross-request micro-batching; off unless a max wait is configured since it
+# trades a few milliseconds of latency for throughput under concurrency.
+INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', 64))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 0))
+
+
+def build_scorer(model, features):
+    scorer = CongestionScorer(model, features)
+    
+    # Small batches are scored by a NumPy export of the trees, checked against
+    # sklearn before use; anything that doesn't compile stays on sklearn
+    if COMPILED_PREDICTOR:
+        try:
+            scorer.enable_compiled(compile_for(model, features), max_rows=COMPILED_MAX_ROWS)
+            log.info("Compiled tree predictor matches sklearn")
+        except Exception as e:
+            log.warning("Compiled predictor unavailable, using sklearn: %s", e)
+    
+    # One throwaway prediction so the first request doesn't pay lazy init costs;
+    # it starts no threads, so it is safe in a preloading gunicorn master
+    if STARTUP_WARMUP:
+        seconds = warm_up(scorer)
+        if not startup.finished:
+            startup.record('warm_up', seconds)
+    
+    if INFERENCE_MAX_WAIT_MS > 0:
+        scorer.enable_batching(max_batch=INFERENCE_MAX_BATCH, max_wait_ms=INFERENCE_MAX_WAIT_MS)
+    
+    return scorer
+
+
+# Model versions are loaded on first use and hot-swapped when their file
+# changes; ACTIVE_MODEL serves requests, SHADOW_MODEL can score a sample of
+# them off the request path for comparison
+model_registry = ModelRegistry(
+    build_scorer,
+    mmap=MODEL_MMAP,
+    check_interval=float(os.environ.get('MODEL_CHECK_SECONDS', 30)),
+    profile=startup,
+)
+model_registry.register('v2', 'congestion_model_2.pkl')
+model_registry.register('v1', 'congestion_model.pkl')
+model_registry.register('rf', 'rf.joblib', features_path='feature_columns.joblib')
+model_registry.set_active(os.environ.get('ACTIVE_MODEL', 'v2'))
+if os.environ.get('SHADOW_MODEL'):
+    model_registry.set_shadow(os.environ['SHADOW_MODEL'], float(os.environ.get('SHADOW_PERCENT', 5)))
+
+# The active model is loaded now, so a preloading master shares it with workers
+with startup.phase('model_load'):
+    active_model = model_registry.active()
+
+if active_model is not None:
+    log.info("Model %s loaded successfully", active_model.name)
+    log.info("Features: %s", active_model.features)
+else:
+    log.error("Error loading model %s", model_registry.active_name)
 
 LTA_ACCOUNT_KEY = '9/ZLa/JOSf2zKSPsVJ3dUA=='
+# Upstream URLs are overridable so the backend can be pointed at local stand-ins
+LTA_SPEEDBANDS_URL = os.environ.get(
+    'LTA_SPEEDBANDS_URL',
+    'https://datamall2.mytransport.sg/ltaodataservice/v4/TrafficSpeedBands'
+)
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+OSRM_URL = os.environ.get('OSRM_URL', 'http://router.project-osrm.org/route/v1/driving')
+# LTA republishes speed bands roughly every 5 minutes
+LTA_REFRESH_SECONDS = float(os.environ.get('LTA_REFRESH_SECONDS', 300))
+LTA_MAX_STALE_SECONDS = float(os.environ.get('LTA_MAX_STALE_SECONDS', 1800))
+
+# One pooled client per upstream; their SLAs differ, so do their policies.
+# Nominatim's usage policy allows very little concurrency.
+nominatim = OutboundClient(UpstreamConfig(
+    name='nominatim', base_url=NOMINATIM_URL,
+    read_timeout=5, retries=1, pool_size=2, max_concurrency=2,
+    breaker_threshold=5, breaker_reset=60,
+))
+osrm = OutboundClient(UpstreamConfig(
+    name='osrm', base_url=OSRM_URL,
+    read_timeout=15, retries=1, pool_size=8, max_concurrency=8,
+    breaker_threshold=5, breaker_reset=30,
+))
+datamall = OutboundClient(UpstreamConfig(
+    name='datamall', base_url=LTA_SPEEDBANDS_URL,
+    read_timeout=10, retries=2, pool_size=4, max_concurrency=4,
+    breaker_threshold=3, breaker_reset=60,
+))
 
 
 def geocode_address(address):
     try:
-        url = "https://nominatim.openstreetmap.org/search"
         params = {
             'q': f"{address}, Singapore",
             'format': 'json',
@@ -57,7 +197,7 @@ def geocode_address(address):
         }
         headers = {'User-Agent': 'TrafficPredictionApp/1.0'}
         
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        response = nominatim.get(params=params, headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -66,55 +206,150 @@ def geocode_address(address):
         
         return None, None
     except Exception as e:
-        print(f"❌ Geocoding error: {e}")
+        log.error("Geocoding error: %s", e)
         return None, None
 
 
+# Geocodes are cached in memory and in a SQLite file that survives restarts
+GEOCODE_CACHE_PATH = os.environ.get('GEOCODE_CACHE_PATH', 'geocode_cache.sqlite3') or None
+GEOCODE_PREWARM_FILE = os.environ.get('GEOCODE_PREWARM_FILE')
+geocode_cache = GeocodeCache(path=GEOCODE_CACHE_PATH)
+
+
+def prewarm_geocode_cache(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            places = [line for line in fh if line.strip() and not line.startswith('#')]
+        fetched = geocode_cache.prewarm(places, geocode_address)
+        log.info("Geocode cache prewarmed: %d new of %d places", fetched, len(places))
+    except Exception as e:
+        log.warning("Geocode prewarm failed: %s", e)
+
+
+if GEOCODE_PREWARM_FILE:
+    threading.Thread(
+        target=prewarm_geocode_cache, args=(GEOCODE_PREWARM_FILE,),
+        name='geocode-prewarm', daemon=True
+    ).start()
+
+
+# All TrafficSpeedBands pages ($skip in steps of 500) are fetched concurrently
+# and parsed straight into the columnar snapshot
+speedband_ingester = SpeedBandIngester(
+    datamall,
+    headers={'AccountKey': LTA_ACCOUNT_KEY, 'accept': 'application/json'},
+    max_workers=int(os.environ.get('LTA_PAGE_WORKERS', 4)),
+    max_pages=int(os.environ.get('LTA_MAX_PAGES', 400)),
+)
+
+
 def get_lta_traffic_speedbands():
-    url = 'https://datamall2.mytransport.sg/ltaodataservice/v4/TrafficSpeedBands'
-    headers = {'AccountKey': LTA_ACCOUNT_KEY, 'accept': 'application/json'}
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            print(f"LTA API error: {response.status_code}")
-            return pd.DataFrame()
-        
-        data = response.json().get('value', [])
-        if not data:
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(data)
-        
-        num_cols = ["SpeedBand", "MinimumSpeed", "MaximumSpeed"]
-        for c in num_cols:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
-        
-        if 'MinimumSpeed' in df.columns and 'MaximumSpeed' in df.columns:
-            df["SpeedKMH_Est"] = (df["MinimumSpeed"] + df["MaximumSpeed"]) / 2
-        else:
-            print("⚠️ Warning: MinimumSpeed or MaximumSpeed not in LTA response")
-            return pd.DataFrame()
-        
         now = datetime.now() + timedelta(hours=8)
-        df['dow'] = now.weekday()
-        df['hour'] = now.hour
         
-        df['incident_count'] = 0
-        df['vms_count'] = 0
-        df['cctv_count'] = 36000
-        df['ett_mean'] = 1.75
+        # Features without a live source are constant across the snapshot
+        table = speedband_ingester.fetch(constants={
+            'dow': now.weekday(),
+            'hour': now.hour,
+            'minute': now.minute,
+            'incident_count': 0,
+            'vms_count': 0,
+            'cctv_count': 36000,
+            'ett_mean': 1.75,
+        })
+        
+        if table.empty:
+            return None
         
-        df["SpeedKMH_Est"] = df["SpeedKMH_Est"].clip(0, 120)
-        df["MinimumSpeed"] = df["MinimumSpeed"].clip(0, 120)
-        df["MaximumSpeed"] = df["MaximumSpeed"].clip(0, 120)
+        if np.isnan(table.min_speed).all() or np.isnan(table.max_speed).all():
+            log.warning("MinimumSpeed or MaximumSpeed not in LTA response")
+            return None
         
-        return df
+        return table
         
     except Exception as e:
-        print(f"Error fetching LTA data: {e}")
-        return pd.DataFrame()
+        log.error("Error fetching LTA data: %s", e)
+        return None
+
+
+speedband_store = SpeedBandStore(
+    get_lta_traffic_speedbands,
+    refresh_interval=LTA_REFRESH_SECONDS,
+    max_stale=LTA_MAX_STALE_SECONDS,
+)
+speedband_store.register_derived('link_index', LinkIndex.from_table)
+speedband_store.register_derived('congestion', CongestionRanking.from_table)
+
+# Last few hours of per-link speeds, appended on every refresh, so forecasts
+# can follow each link's recent trend
+SPEED_HISTORY_HOURS = float(os.environ.get('SPEED_HISTORY_HOURS', 3))
+speed_history = SpeedHistory(
+    capacity=history_capacity(SPEED_HISTORY_HOURS, LTA_REFRESH_SECONDS),
+    max_links=int(os.environ.get('SPEED_HISTORY_MAX_LINKS', 100_000)),
+    window=int(os.environ.get('SPEED_TREND_WINDOW', 6)),
+)
+speedband_store.register_derived('speed_features', speed_history.append)
+
+
+def build_link_scores(tbl):
+    version = model_registry.active()
+    if version is None:
+        raise RuntimeError('no model loaded')
+    # Through the registry, so the build shows in the model's metrics and
+    # the shadow model scores a sample of its rows
+    return LinkScoreTable.build(
+        tbl, version.features, lambda X: model_registry.score_bulk(X, version),
+        FORECAST_HORIZONS_MIN, speed_history.features_for(tbl),
+        model=(version.name, version.generation),
+    )
+
+
+# Score every link for every /forecast horizon once per snapshot
+speedband_store.register_derived('link_scores', build_link_scores)
+link_scores_rebuild = threading.Lock()
+
+
+def current_link_scores(snapshot):
+    """The snapshot's link_scores, if the active model version produced them
+    
+    After a hot swap (or a change of active version) the table is rebuilt in
+    the background; until it is, None is returned and requests score their
+    routes' links on the new version directly.
+    """
+    link_scores = snapshot.derived.get('link_scores')
+    version = model_registry.active()
+    if link_scores is None or version is None or link_scores.model == (version.name, version.generation):
+        return link_scores
+    
+    if link_scores_rebuild.acquire(blocking=False):
+        threading.Thread(target=rebuild_link_scores, name='link-scores-rebuild', daemon=True).start()
+    return None
+
+
+def rebuild_link_scores():
+    try:
+        if speedband_store.rebuild_derived('link_scores'):
+            log.info("Link scores rebuilt for model %s", model_registry.active_name)
+    finally:
+        link_scores_rebuild.release()
+
+
+def score_route_links(snapshot, routes_linkids):
+    """Link scores for just these routes, for a snapshot without link_scores
+    
+    Built like the precomputed table, so a route gets the same probability
+    (the mean over its links) either way.
+    """
+    tbl = snapshot.table
+    rows = np.unique(np.concatenate([tbl.rows(ids) for ids in routes_linkids]))
+    version = model_registry.active()
+    
+    with stage('inference'):
+        return LinkScoreTable.build(
+            tbl, version.features, lambda X: model_registry.score_matrix(X, version),
+            FORECAST_HORIZONS_MIN, snapshot.derived.get('speed_features'), rows=rows,
+            model=(version.name, version.generation),
+        )
 
 
 def get_multiple_routes(start_lat, start_lon, end_lat, end_lon):
@@ -126,7 +361,7 @@ def get_multiple_routes(start_lat, start_lon, end_lat, end_lon):
     
     try:
         # Try to get alternatives from OSRM
-        url = f"http://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
+        path = f"/{start_lon},{start_lat};{end_lon},{end_lat}"
         params = {
             'overview': 'full',
             'geometries': 'geojson',
@@ -135,7 +370,7 @@ def get_multiple_routes(start_lat, start_lon, end_lat, end_lon):
             'alternatives': '2'  # Request up to 2 alternatives
         }
         
-        response = requests.get(url, params=params, timeout=15)
+        response = osrm.get(path, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -148,52 +383,73 @@ def get_multiple_routes(start_lat, start_lon, end_lat, end_lon):
                         'duration': route['duration']
                     })
         
-        print(f"🛣️  OSRM returned {len(routes)} route(s)")
+        log.debug("OSRM returned %d route(s)", len(routes))
         
         # If we only got 1 route, that's still okay - return it
         return routes if routes else None
         
     except Exception as e:
-        print(f"OSRM error: {e}")
+        log.error("OSRM error: %s", e)
         return None
 
 
-def map_route_to_linkids(route_coords, tbl):
-    available_links = tbl['LinkID'].unique().tolist()
-    
-    if not available_links:
+# Routes are cached per ~50 m origin/destination cell pair
+route_cache = RouteCache(
+    cell_m=float(os.environ.get('ROUTE_CACHE_CELL_M', 50)),
+    maxsize=int(os.environ.get('ROUTE_CACHE_SIZE', 512)),
+    ttl=float(os.environ.get('ROUTE_CACHE_TTL_SECONDS', 6 * 3600)),
+)
+
+
+def get_cached_routes(start_lat, start_lon, end_lat, end_lon):
+    with stage('route'):
+        return route_cache.get_routes(start_lat, start_lon, end_lat, end_lon, get_multiple_routes)
+
+
+def get_speedband_snapshot():
+    with stage('speedbands'):
+        return speedband_store.snapshot()
+
+
+# Upstream calls of a request run concurrently, each with its own budget
+upstream = UpstreamPool(max_workers=int(os.environ.get('UPSTREAM_POOL_SIZE', 16)))
+GEOCODE_TIMEOUT = float(os.environ.get('GEOCODE_TIMEOUT_SECONDS', 8))
+ROUTE_TIMEOUT = float(os.environ.get('ROUTE_TIMEOUT_SECONDS', 20))
+SPEEDBANDS_TIMEOUT = float(os.environ.get('SPEEDBANDS_TIMEOUT_SECONDS', 15))
+
+
+def upstream_error(e, service):
+    """Generic 504/502 response for an upstream that timed out or failed"""
+    log.warning("%s failed: %s", service, e)
+    if isinstance(e, UpstreamTimeout):
+        return jsonify({'error': f'{service} timed out. Please try again.'}), 504
+    return jsonify({'error': f'{service} unavailable. Please try again.'}), 502
+
+
+def map_route_to_linkids(route_coords, link_index):
+    if link_index is None:
+        log.warning("No link index available for this snapshot")
         return []
     
-    num_segments = min(len(route_coords) // 10, 15)
-    num_segments = max(num_segments, 5)
-    
-    selected = available_links[:num_segments] if len(available_links) >= num_segments else available_links
+    with stage('link_mapping'):
+        selected = link_index.match(route_coords)
     
-    print(f"🔗 Mapped {len(route_coords)} coords to {len(selected)} LinkIDs")
+    log.debug("Mapped %d coords to %d LinkIDs", len(route_coords), len(selected))
     
     return selected
 
 
-def aggregate_route_features(route_linkids, tbl):
-    segs = tbl[tbl["LinkID"].isin(route_linkids)]
+def route_speed(route_linkids, tbl):
+    """Mean estimated speed (km/h) over the route's segments, or None"""
+    rows = np.unique(tbl.rows(route_linkids))
     
-    if segs.empty:
-        print("⚠️ No segments found for LinkIDs")
+    if len(rows) == 0:
+        log.warning("No segments found for LinkIDs")
         return None
     
-    print(f"✅ Found {len(segs)} segments for route")
+    log.debug("Found %d segments for route", len(rows))
     
-    return {
-        "SpeedKMH_Est": float(segs["SpeedKMH_Est"].mean()),
-        "MinimumSpeed": float(segs["MinimumSpeed"].mean()),
-        "MaximumSpeed": float(segs["MaximumSpeed"].mean()),
-        "incident_count": int(segs["incident_count"].sum()),
-        "vms_count": int(segs["vms_count"].sum()),
-        "cctv_count": int(segs["cctv_count"].sum()),
-        "ett_mean": float(segs["ett_mean"].mean()),
-        "dow": int(segs["dow"].mode().iloc[0]) if len(segs["dow"].mode()) > 0 else int(segs["dow"].iloc[0]),
-        "hour": int(segs["hour"].mode().iloc[0]) if len(segs["hour"].mode()) > 0 else int(segs["hour"].iloc[0]),
-    }
+    return float(np.nanmean(tbl.speed_est[rows], dtype=np.float64))
 
 
 def parse_coordinates(coord_string):
@@ -210,11 +466,12 @@ def parse_coordinates(coord_string):
                 except ValueError:
                     pass
         
-        print(f"🔍 Geocoding: {coord_string}")
-        lat, lon = geocode_address(coord_string)
+        log.debug("Geocoding: %s", coord_string)
+        with stage('geocode'):
+            lat, lon = geocode_cache.lookup(coord_string, geocode_address)
         
         if lat and lon:
-            print(f"✅ Found: {lat},{lon}")
+            log.debug("Found: %s,%s", lat, lon)
             return lat, lon
         else:
             raise ValueError(f"Could not find location: {coord_string}")
@@ -225,15 +482,17 @@ def parse_coordinates(coord_string):
 
 @app.route('/')
 def home():
+    version = model_registry.active()
     return jsonify({
         'message': 'Traffic Prediction API - Production Ready',
         'status': 'active',
-        'model_loaded': model is not None,
-        'model_type': 'HistGradientBoostingClassifier' if model else None,
-        'features': FEATS,
+        'model_loaded': version is not None,
+        'model_type': type(version.model).__name__ if version else None,
+        'features': version.features if version else None,
         'endpoints': {
             '/': 'GET - API information',
             '/health': 'GET - Check API health',
+            '/metrics': 'GET - Latency histograms (Prometheus)',
             '/predict': 'POST - Predict traffic congestion'
         },
         'example': {
@@ -270,93 +529,132 @@ def predict():
         if from_location.lower() == to_location.lower():
             return jsonify({'error': 'Origin and destination cannot be the same'}), 400
         
+        # Optional compact geometry: geometry_format=polyline|polyline6 and/or
+        # simplify_m=<metres>; the default stays full GeoJSON coordinates
+        try:
+            geometry_format, simplify_m = parse_geometry_options(
+                data.get('geometry_format', request.args.get('geometry_format')),
+                data.get('simplify_m', request.args.get('simplify_m')),
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Geocode both ends and load the traffic snapshot concurrently
+        pending_from = upstream.submit(parse_coordinates, from_location)
+        pending_to = upstream.submit(parse_coordinates, to_location)
+        pending_snapshot = upstream.submit(get_speedband_snapshot)
+        
         try:
-            start_lat, start_lon = parse_coordinates(from_location)
-            end_lat, end_lon = parse_coordinates(to_location)
+            start_lat, start_lon = upstream.result(pending_from, GEOCODE_TIMEOUT, 'geocoder')
+            end_lat, end_lon = upstream.result(pending_to, GEOCODE_TIMEOUT, 'geocoder')
         except ValueError as e:
+            upstream.cancel(pending_to, pending_snapshot)
             return jsonify({'error': f'Location error: {str(e)}'}), 400
         except Exception as e:
-            return jsonify({'error': 'Failed to process locations. Please check your input.'}), 400
+            upstream.cancel(pending_to, pending_snapshot)
+            return upstream_error(e, 'Geocoding service')
         
-        print(f"\n📍 Route: {from_location} → {to_location}")
-        print(f"📍 Coords: ({start_lat},{start_lon}) → ({end_lat},{end_lon})")
+        log.info("Route: %s → %s", from_location, to_location)
+        log.debug("Coords: (%s,%s) → (%s,%s)", start_lat, start_lon, end_lat, end_lon)
         
+        # Routing runs while the snapshot may still be loading
         try:
-            osrm_routes = get_multiple_routes(start_lat, start_lon, end_lat, end_lon)
+            pending_routes = upstream.submit(get_cached_routes, start_lat, start_lon, end_lat, end_lon)
+            osrm_routes = upstream.result(pending_routes, ROUTE_TIMEOUT, 'router')
         except Exception as e:
-            return jsonify({'error': 'Routing service unavailable. Please try again.'}), 503
+            upstream.cancel(pending_snapshot)
+            return upstream_error(e, 'Routing service')
         
         if not osrm_routes or len(osrm_routes) == 0:
+            upstream.cancel(pending_snapshot)
             return jsonify({'error': 'No route found between these locations'}), 404
         
-        print(f"🛣️  Found {len(osrm_routes)} route(s)")
+        log.debug("Found %d route(s)", len(osrm_routes))
         
         try:
-            tbl = get_lta_traffic_speedbands()
+            snapshot = upstream.result(pending_snapshot, SPEEDBANDS_TIMEOUT, 'speedbands')
         except Exception as e:
-            return jsonify({'error': 'Traffic data service unavailable. Please try again.'}), 503
+            return upstream_error(e, 'Traffic data service')
         
-        if tbl.empty:
+        if snapshot is None or snapshot.empty:
             return jsonify({'error': 'No traffic data available at this time'}), 503
         
-        print(f"📊 Fetched {len(tbl)} traffic segments")
+        tbl = snapshot.table
+        link_index = snapshot.derived.get('link_index')
         
-        if model is None:
-            return jsonify({'error': 'Prediction model not available'}), 503
+        log.debug("Fetched %d traffic segments", len(tbl))
         
-        route_predictions = []
+        if model_registry.active() is None:
+            return jsonify({'error': 'Prediction model not available'}), 503
         
-        # Predict congestion for EACH route
+        # Map EACH route onto its links
+        mapped = []
         for idx, route in enumerate(osrm_routes):
             try:
-                route_linkids = map_route_to_linkids(route['coordinates'], tbl)
-                
-                if not route_linkids:
-                    continue
-                
-                features = aggregate_route_features(route_linkids, tbl)
-                
-                if features is None:
-                    continue
-                
-                # ML PREDICTION for this specific route
-                X = pd.DataFrame([features])[FEATS]
-                proba = model.predict_proba(X)[:, 1][0]
-                status = 'congested' if proba >= 0.5 else 'clear'
-                
-                # Determine emoji based on congestion level
-                if proba >= 0.7:
-                    emoji = '🔴'
-                    label = 'High Congestion'
-                elif proba >= 0.4:
-                    emoji = '🟡'
-                    label = 'Moderate Traffic'
-                else:
-                    emoji = '🟢'
-                    label = 'Clear Traffic'
-                
-                route_name = f"{from_location} → {to_location}"
-                if idx > 0:
-                    route_name += f" (Route {idx + 1})"
+                route_linkids = map_route_to_linkids(route['coordinates'], link_index)
                 
-                route_predictions.append({
-                    'route_id': f'route_{idx}',
-                    'route_name': route_name,
-                    'label': f'{emoji} {label}',
-                    'congestion_prob': round(float(proba), 3),
-                    'status': status,
-                    'confidence': 0.835,
-                    'duration_min': round(route['duration'] / 60),
-                    'distance_km': round(route['distance'] / 1000, 1),
-                    'link_ids_count': len(route_linkids),
-                    'route_coordinates': route['coordinates']
-                })
-                
-                print(f"✅ Route {idx + 1}: {proba:.1%} congested, {route['distance']/1000:.1f}km, {route['duration']/60:.0f}min")
+                if route_linkids:
+                    mapped.append((idx, route, route_linkids))
             except Exception as e:
-                print(f"⚠️ Error processing route {idx}: {e}")
+                log.warning("Error processing route %d: %s", idx, e)
                 continue
         
+        # A route's probability is the mean over its links. Per-link
+        # probabilities are precomputed for every snapshot; until they are
+        # available, the links of these routes are scored the same way now.
+        link_scores = current_link_scores(snapshot)
+        if link_scores is None and mapped:
+            link_scores = score_route_links(snapshot, [ids for _, _, ids in mapped])
+        
+        candidates = []
+        with stage('inference'):
+            for idx, route, route_linkids in mapped:
+                proba = link_scores.route_probability(route_linkids)
+                if proba is not None:
+                    candidates.append((idx, route, route_linkids, proba))
+        
+        route_predictions = []
+        
+        for idx, route, route_linkids, proba in candidates:
+            status = 'congested' if proba >= 0.5 else 'clear'
+            
+            # Determine emoji based on congestion level
+            if proba >= 0.7:
+                emoji = '🔴'
+                label = 'High Congestion'
+            elif proba >= 0.4:
+                emoji = '🟡'
+                label = 'Moderate Traffic'
+            else:
+                emoji = '🟢'
+                label = 'Clear Traffic'
+            
+            route_name = f"{from_location} → {to_location}"
+            if idx > 0:
+                route_name += f" (Route {idx + 1})"
+            
+            # Links are matched on the full geometry; only the response is compacted
+            with stage('geometry'):
+                route_geometry = format_geometry(route['coordinates'], geometry_format, simplify_m)
+            
+            route_predictions.append({
+                'route_id': f'route_{idx}',
+                'route_name': route_name,
+                'label': f'{emoji} {label}',
+                'congestion_prob': round(proba, 3),
+                'status': status,
+                'confidence': 0.835,
+                'duration_min': round(route['duration'] / 60),
+                'distance_km': round(route['distance'] / 1000, 1),
+                'link_ids_count': len(route_linkids),
+                'route_coordinates': route_geometry
+            })
+            
+            log.debug(
+                "Route %d: %.1f%% congested, %.1fkm, %.0fmin",
+                idx + 1, proba * 100, route['distance'] / 1000, route['duration'] / 60,
+            )
+        
         if not route_predictions:
             return jsonify({'error': 'Could not analyze traffic for this route. Please try a different route.'}), 400
         
@@ -380,73 +678,76 @@ def predict():
             'best': best_route,
             'alternatives': alternatives,
             'total_routes': len(route_predictions),
+            'geometry_format': geometry_format,
             'note': note,
             'explanation': f"Our ML model analyzed live traffic on {best_route['link_ids_count']} road segments along each route path. The recommended route has the lowest predicted congestion based on current traffic conditions."
         }
         
-        print(f"🎯 BEST: {best_route['route_name']} ({best_route['congestion_prob']:.1%})")
-        if alternatives:
-            for alt in alternatives:
-                print(f"   Alt: {alt['route_name']} ({alt['congestion_prob']:.1%})")
+        log.info("Best: %s (%.1f%%)", best_route['route_name'], best_route['congestion_prob'] * 100)
+        for alt in alternatives:
+            log.debug("Alt: %s (%.1f%%)", alt['route_name'], alt['congestion_prob'] * 100)
         
-        return jsonify(response)
+        with stage('serialise'):
+            return jsonify(response)
     
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Unexpected error: %s", e)
         return jsonify({'error': 'An unexpected error occurred. Please try again later.'}), 500
 
 
 @app.route('/health', methods=['GET'])
 def health():
+    version = model_registry.active()
     return jsonify({
         'status': 'ok',
-        'model_loaded': model is not None,
-        'model_path': MODEL_PATH,
-        'features': FEATS
+        'model_loaded': version is not None,
+        'model_path': version.path if version else None,
+        'features': version.features if version else None,
+        'startup': startup.report(),
+        'speedbands': {**speedband_store.status(), 'ingest': speedband_ingester.stats()},
+        'speed_history': speed_history.stats(),
+        'inference': version.scorer.stats() if version else None,
+        'models': model_registry.stats(),
+        'geocode_cache': geocode_cache.stats(),
+        'route_cache': route_cache.stats(),
+        'logging': log_handler.stats(),
+        'upstreams': {client.config.name: client.stats() for client in (nominatim, osrm, datamall)}
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Request and per-stage latency histograms in Prometheus text format"""
+    return app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/current-congestion', methods=['GET'])
 def get_current_congestion():
-    """Get current top congested roads"""
+    """Get current top congested roads
+    
+    Query params: k (default 5), threshold (minimum congestion %, default 30)
+    and group=road to list each road once instead of every congested link.
+    """
     try:
-        tbl = get_lta_traffic_speedbands()
+        k = max(1, min(request.args.get('k', default=5, type=int), 100))
+        threshold = max(0, min(request.args.get('threshold', default=30, type=int), 100))
+        by_road = request.args.get('group', '').lower() == 'road'
         
-        if tbl.empty:
-            return jsonify({'roads': []}), 200
-        
-        # Calculate congestion percentage for each road
-        congested_roads = []
+        snapshot = get_speedband_snapshot()
         
-        for _, row in tbl.iterrows():
-            speed = row.get('SpeedKMH_Est', 0)
-            max_speed = row.get('MaximumSpeed', 80)
-            road_name = row.get('RoadName', 'Unknown Road')
-            
-            # Calculate congestion (lower speed = higher congestion)
-            if max_speed > 0:
-                congestion_pct = int((1 - (speed / max_speed)) * 100)
-                congestion_pct = max(0, min(100, congestion_pct))  # Clamp 0-100
-                
-                if congestion_pct >= 30:  # Only show roads with >30% congestion
-                    congested_roads.append({
-                        'name': road_name,
-                        'congestion': congestion_pct,
-                        'speed': int(speed)
-                    })
+        if snapshot is None or snapshot.empty:
+            return jsonify({'roads': []}), 200
         
-        # Sort by congestion level (highest first)
-        congested_roads.sort(key=lambda x: x['congestion'], reverse=True)
+        # Precomputed once per speed-band snapshot
+        ranking = snapshot.derived.get('congestion')
+        if ranking is None:
+            ranking = CongestionRanking.from_table(snapshot.table)
         
-        # Return top 5
         return jsonify({
-            'roads': congested_roads[:5],
+            'roads': ranking.top(k=k, threshold=threshold, by_road=by_road),
             'timestamp': datetime.now().isoformat()
         })
         
     except Exception as e:
-        print(f"Error in current-congestion: {e}")
+        log.error("Error in current-congestion: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -462,43 +763,61 @@ def get_forecast():
         from_location = data['from']
         to_location = data['to']
         
-        # Get coordinates
+        # Get coordinates and traffic data concurrently
+        pending_from = upstream.submit(parse_coordinates, from_location)
+        pending_to = upstream.submit(parse_coordinates, to_location)
+        pending_snapshot = upstream.submit(get_speedband_snapshot)
+        
         try:
-            start_lat, start_lon = parse_coordinates(from_location)
-            end_lat, end_lon = parse_coordinates(to_location)
+            start_lat, start_lon = upstream.result(pending_from, GEOCODE_TIMEOUT, 'geocoder')
+            end_lat, end_lon = upstream.result(pending_to, GEOCODE_TIMEOUT, 'geocoder')
         except ValueError as e:
+            upstream.cancel(pending_to, pending_snapshot)
             return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            upstream.cancel(pending_to, pending_snapshot)
+            return upstream_error(e, 'Geocoding service')
         
         # Get route
-        osrm_routes = get_multiple_routes(start_lat, start_lon, end_lat, end_lon)
+        try:
+            pending_routes = upstream.submit(get_cached_routes, start_lat, start_lon, end_lat, end_lon)
+            osrm_routes = upstream.result(pending_routes, ROUTE_TIMEOUT, 'router')
+        except Exception as e:
+            upstream.cancel(pending_snapshot)
+            return upstream_error(e, 'Routing service')
         
         if not osrm_routes or len(osrm_routes) == 0:
+            upstream.cancel(pending_snapshot)
             return jsonify({'error': 'No route found'}), 404
         
         # Get traffic data
-        tbl = get_lta_traffic_speedbands()
+        try:
+            snapshot = upstream.result(pending_snapshot, SPEEDBANDS_TIMEOUT, 'speedbands')
+        except Exception as e:
+            return upstream_error(e, 'Traffic data service')
         
-        if tbl.empty:
+        if snapshot is None or snapshot.empty:
             return jsonify({'error': 'No traffic data available'}), 503
         
-        if model is None:
+        tbl = snapshot.table
+        
+        if model_registry.active() is None:
             return jsonify({'error': 'Model not available'}), 503
         
         # Use the best route
         route = osrm_routes[0]
-        route_linkids = map_route_to_linkids(route['coordinates'], tbl)
+        route_linkids = map_route_to_linkids(route['coordinates'], snapshot.derived.get('link_index'))
         
         if not route_linkids:
             return jsonify({'error': 'Could not map route'}), 400
         
-        features = aggregate_route_features(route_linkids, tbl)
+        avg_speed = route_speed(route_linkids, tbl)
         
-        if features is None:
+        if avg_speed is None:
             return jsonify({'error': 'Could not extract features'}), 400
         
         # Predict for now, +15min, +30min, +60min
         predictions = []
-        base_hour = features['hour']
         
         time_offsets = [
             {'label': 'Now', 'offset': 0},
@@ -507,16 +826,18 @@ def get_forecast():
             {'label': '+60m', 'offset': 60}
         ]
         
-        for time_point in time_offsets:
-            # Adjust hour for time offset
-            adjusted_features = features.copy()
-            minutes_ahead = time_point['offset']
-            adjusted_hour = (base_hour + (minutes_ahead // 60)) % 24
-            adjusted_features['hour'] = adjusted_hour
-            
-            # Predict
-            X = pd.DataFrame([adjusted_features])[FEATS]
-            proba = model.predict_proba(X)[:, 1][0]
+        # Every horizon is precomputed per link for the current snapshot; as in
+        # /predict, the route's links are scored now if it is not ready yet
+        link_scores = current_link_scores(snapshot)
+        if link_scores is None:
+            link_scores = score_route_links(snapshot, [route_linkids])
+        
+        with stage('inference'):
+            route_probas = link_scores.route_probabilities(route_linkids)
+        
+        probas = [route_probas[link_scores.horizons.index(tp['offset'])] for tp in time_offsets]
+        
+        for time_point, proba in zip(time_offsets, probas):
             congestion_pct = int(proba * 100)
             
             # Determine status
@@ -544,32 +865,31 @@ def get_forecast():
         else:
             trend = "Traffic conditions stable"
         
-        return jsonify({
-            'predictions': predictions,
-            'trend': trend,
-            'avg_speed': features.get('SpeedKMH_Est', 0) # added 3 Nov
-        })
+        with stage('serialise'):
+            return jsonify({
+                'predictions': predictions,
+                'trend': trend,
+                'avg_speed': avg_speed # added 3 Nov
+            })
         
     except Exception as e:
-        print(f"Error in forecast: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        log.exception("Error in forecast: %s", e)
+        return jsonify({'error': 'An unexpected error occurred. Please try again later.'}), 500
+
+
+# Module start-up is complete once every route is registered
+startup.ready()
+
 
 if __name__ == '__main__':
-    print("="*60)
-    print("🚗 Traffic Prediction API - Starting...")
-    print("="*60)
-    print(f"Model path: {MODEL_PATH}")
-    print(f"Model loaded: {model is not None}")
-    print(f"Features: {FEATS}")
-    print("="*60)
+    log.info("Traffic Prediction API - Starting...")
+    log.info("Model versions: %s (active: %s)", model_registry.names(), model_registry.active_name)
+    log.info("Model loaded: %s", active_model is not None)
 
     # app.run(host='0.0.0.0', port=5000, debug=True)
     # Get port from environment variable (Render sets this)
     port = int(os.environ.get('PORT', 5000))
-    print(f"🚀 Starting on port: {port}")
-    print("="*60)
+    log.info("Starting on port: %d", port)
     
 
     app.run(host='0.0.0.0', port=port, debug=False)
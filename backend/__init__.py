@@ -0,0 +1,49 @@
+"""Support package for the driver-facing traffic prediction backend."""
+
+from .batching import MicroBatcher
+from .congestion import CongestionRanking
+from .fanout import UpstreamPool, UpstreamTimeout
+from .geocache import GeocodeCache
+from .history import SpeedFeatures, SpeedHistory
+from .inference import CongestionScorer
+from .ingest import SpeedBandIngester
+from .jsonprovider import FastJSONProvider
+from .linkmatch import LinkIndex
+from .linkscores import LinkScoreTable
+from .logs import AsyncQueueHandler
+from .outbound import OutboundClient, UpstreamConfig
+from .registry import ModelRegistry
+from .routecache import RouteCache
+from .speedbands import SpeedBandSnapshot, SpeedBandStore
+from .speedtable import SpeedBandBuilder, SpeedBandTable
+from .startup import StartupProfile
+from .telemetry import MetricsRegistry, RequestTimer
+from .treepredict import CompiledForest
+
+__all__ = [
+    "AsyncQueueHandler",
+    "CompiledForest",
+    "CongestionRanking",
+    "CongestionScorer",
+    "FastJSONProvider",
+    "GeocodeCache",
+    "LinkIndex",
+    "LinkScoreTable",
+    "MetricsRegistry",
+    "MicroBatcher",
+    "ModelRegistry",
+    "OutboundClient",
+    "RequestTimer",
+    "RouteCache",
+    "SpeedBandBuilder",
+    "SpeedBandIngester",
+    "SpeedBandSnapshot",
+    "SpeedBandStore",
+    "SpeedBandTable",
+    "SpeedFeatures",
+    "SpeedHistory",
+    "StartupProfile",
+    "UpstreamConfig",
+    "UpstreamPool",
+    "UpstreamTimeout",
+]
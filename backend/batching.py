@@ -0,0 +1,184 @@
+"""Cross-request micro-batching in front of the congestion model.
+
+Concurrent requests each score a handful of rows, and ``predict_proba`` costs
+about the same for one row as for dozens.  ``MicroBatcher`` queues the feature
+matrices submitted by request threads, waits at most ``max_wait_ms`` (or until
+``max_batch`` rows are queued), scores everything in one vectorised call from
+a single worker thread and hands each caller back its own slice of the result.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ScoreFn = Callable[[np.ndarray], np.ndarray]
+
+# Upper bounds of the batch-size histogram buckets (rows per model call).
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """Coalesces feature matrices from concurrent callers into one model call."""
+
+    def __init__(self, score_fn: ScoreFn, max_batch: int = 64, max_wait_ms: float = 2.0) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self._score_fn = score_fn
+        self.max_batch = int(max_batch)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+
+        self._queue: Deque[Tuple[np.ndarray, Future, float]] = deque()
+        self._queued_rows = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+        self._batches = 0
+        self._rows = 0
+        self._max_rows = 0
+        self._size_buckets = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._requests = 0
+
+    # ------------------------------------------------------------------
+    def submit(self, X: np.ndarray) -> Future:
+        """Queue a feature matrix; the future resolves to its probabilities."""
+
+        future: Future = Future()
+        if len(X) == 0:
+            future.set_result(np.empty(0, dtype=np.float64))
+            return future
+
+        self._ensure_worker()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher has been stopped")
+            self._queue.append((X, future, time.perf_counter()))
+            self._queued_rows += len(X)
+            self._cond.notify()
+        return future
+
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Blocking convenience wrapper around ``submit``."""
+
+        return self.submit(X).result()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Score whatever is still queued, then stop the worker thread."""
+
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, object]:
+        """Batch size and queue wait metrics since start-up."""
+
+        batches = self._batches
+        buckets = {
+            f"le_{bound}": count
+            for bound, count in zip(BATCH_SIZE_BUCKETS, self._size_buckets)
+        }
+        buckets["gt_" + str(BATCH_SIZE_BUCKETS[-1])] = self._size_buckets[-1]
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "requests": self._requests,
+            "batches": batches,
+            "rows": self._rows,
+            "mean_batch_rows": round(self._rows / batches, 2) if batches else 0.0,
+            "max_batch_rows": self._max_rows,
+            "batch_rows_histogram": buckets,
+            "mean_queue_wait_ms": round(self._wait_total / self._requests * 1000.0, 3)
+            if self._requests
+            else 0.0,
+            "max_queue_wait_ms": round(self._wait_max * 1000.0, 3),
+            "queued_rows": self._queued_rows,
+        }
+
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        # Started lazily (and restarted after fork) so each server worker
+        # process owns its batching thread.
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _take_batch(self) -> List[Tuple[np.ndarray, Future, float]]:
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0][2] + self.max_wait
+            while self._queued_rows < self.max_batch and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            rows = 0
+            # Always take at least one entry, even if it alone exceeds max_batch.
+            while self._queue and (not batch or rows + len(self._queue[0][0]) <= self.max_batch):
+                item = self._queue.popleft()
+                batch.append(item)
+                rows += len(item[0])
+            self._queued_rows -= rows
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            sizes = [len(X) for X, _, _ in batch]
+            try:
+                X = batch[0][0] if len(batch) == 1 else np.concatenate([X for X, _, _ in batch])
+                probas = self._score_fn(X)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+            else:
+                offset = 0
+                for (_, future, _), size in zip(batch, sizes):
+                    future.set_result(probas[offset:offset + size])
+                    offset += size
+
+            self._record(batch, sum(sizes), started)
+
+    def _record(self, batch, rows: int, started: float) -> None:
+        self._batches += 1
+        self._rows += rows
+        self._max_rows = max(self._max_rows, rows)
+        bucket = next(
+            (i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if rows <= bound),
+            len(BATCH_SIZE_BUCKETS),
+        )
+        self._size_buckets[bucket] += 1
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self._requests += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+
+__all__ = ["BATCH_SIZE_BUCKETS", "MicroBatcher"]
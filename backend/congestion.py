@@ -0,0 +1,80 @@
+"""Vectorised "top congested roads" ranking for ``/current-congestion``.
+
+The congestion of a link is how far its estimated speed sits below its
+maximum speed band, as a whole percentage clamped to 0-100.  ``CongestionRanking``
+computes that for the whole speed-band table with NumPy and sorts it once per
+snapshot (a stable descending sort, so ties keep table order).  Every query
+is then a prefix slice: rows above any threshold form a prefix of the order.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .speedtable import SpeedBandTable
+
+UNKNOWN_ROAD = "Unknown Road"
+
+
+class CongestionRanking:
+    """Per-snapshot congestion percentages, pre-sorted for top-k queries."""
+
+    def __init__(
+        self,
+        speed: np.ndarray,
+        max_speed: np.ndarray,
+        name_codes: np.ndarray,
+        names: Sequence[str],
+    ) -> None:
+        speed = np.asarray(speed, dtype=np.float64)
+        max_speed = np.asarray(max_speed, dtype=np.float64)
+        valid = (max_speed > 0) & np.isfinite(speed)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Truncate towards zero like int() does, then clamp.
+            pct = np.trunc((1 - speed / max_speed) * 100)
+        pct = np.clip(np.where(valid, pct, -1), -1, 100).astype(np.int16)
+
+        rows = np.flatnonzero(valid)
+        order = rows[np.argsort(-pct[rows], kind="stable")]
+
+        self._pct = pct[order]
+        self._speed = np.trunc(speed[order]).astype(np.int64)
+        # Road names stay dictionary-encoded; code -1 maps to UNKNOWN_ROAD.
+        self._name_codes = np.asarray(name_codes, dtype=np.int64)[order]
+        self._names = np.array(list(names) + [UNKNOWN_ROAD], dtype=object)
+
+        # The first (i.e. most congested) row of every road represents it.
+        # Missing names share a road with any real "Unknown Road".
+        road_keys = self._name_codes
+        known = {name: code for code, name in enumerate(names)}
+        if UNKNOWN_ROAD in known:
+            road_keys = np.where(road_keys < 0, known[UNKNOWN_ROAD], road_keys)
+        _, first = np.unique(road_keys, return_index=True)
+        self._road_rows = np.sort(first)
+
+    @classmethod
+    def from_table(cls, tbl: SpeedBandTable) -> "CongestionRanking":
+        return cls(tbl.speed_est, tbl.max_speed, tbl.road_name_codes, tbl.road_names)
+
+    def top(self, k: int = 5, threshold: int = 30, by_road: bool = False) -> List[Dict[str, object]]:
+        """Most congested links (or roads) at or above ``threshold`` percent."""
+
+        rows = self._road_rows if by_road else None
+        pct = self._pct if rows is None else self._pct[rows]
+        # ``pct`` is sorted descending, so qualifying rows form a prefix.
+        count = min(int(np.searchsorted(-pct, -threshold, side="right")), max(k, 0))
+        picked = np.arange(count) if rows is None else rows[:count]
+
+        return [
+            {"name": name, "congestion": congestion, "speed": speed}
+            for name, congestion, speed in zip(
+                self._names[self._name_codes[picked]].tolist(),
+                self._pct[picked].tolist(),
+                self._speed[picked].tolist(),
+            )
+        ]
+
+
+__all__ = ["CongestionRanking"]
@@ -0,0 +1,69 @@
+"""Concurrent fan-out of a request's upstream calls.
+
+``/predict`` needs two geocodes, an OSRM route and the speed-band snapshot.
+Run one after another, request latency is the sum of those round trips.
+``UpstreamPool`` runs them on a shared thread pool instead, so a request costs
+roughly its slowest dependency.  Each wait has its own timeout, and calls
+that are no longer needed (because a sibling failed) are cancelled.
+
+Calls run in a copy of the submitting thread's context, so the request id
+and stage timer of the request that made them stay current.
+"""
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
+
+
+class UpstreamTimeout(TimeoutError):
+    """Raised when an upstream dependency does not answer within its budget."""
+
+    def __init__(self, name: str, timeout: float) -> None:
+        super().__init__(f"{name} did not respond within {timeout:g}s")
+        self.name = name
+        self.timeout = timeout
+
+
+class UpstreamPool:
+    """Shared executor for blocking upstream calls made on behalf of requests."""
+
+    def __init__(self, max_workers: int = 16) -> None:
+        self.max_workers = max_workers
+        # Worker threads are created on first submit, i.e. inside the serving
+        # process rather than in a pre-fork master.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="upstream"
+        )
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        return self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    @staticmethod
+    def result(future: Future, timeout: Optional[float], name: str = "upstream") -> Any:
+        """Wait for ``future``; on timeout cancel it and raise ``UpstreamTimeout``.
+
+        A call that is already running cannot be interrupted, but its result
+        is discarded and it does not hold up the request any longer.
+        """
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise UpstreamTimeout(name, timeout) from None
+
+    @staticmethod
+    def cancel(*futures: Optional[Future]) -> None:
+        """Cancel calls whose results are no longer needed."""
+
+        for future in futures:
+            if future is not None:
+                future.cancel()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+__all__ = ["UpstreamPool", "UpstreamTimeout"]
@@ -0,0 +1,183 @@
+"""Two-tier cache for Nominatim geocoding results.
+
+Drivers search for the same few hundred places over and over, and every miss
+costs a Nominatim round trip (and counts against its rate limit).  Lookups go
+through an in-memory ``TTLCache`` first and then a small SQLite table that
+survives restarts and is shared by all worker processes on the host.  Keys are
+normalised so that "Orchard Road", "orchard road, Singapore" and
+"ORCHARD RD." style variants collapse onto the same entry where possible.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[Optional[float], Optional[float]]
+Geocoder = Callable[[str], Coordinates]
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+_COUNTRY_SUFFIX = re.compile(r"(?:\s+(?:singapore|sg))+$")
+_ABBREVIATIONS = {
+    "rd": "road",
+    "st": "street",
+    "ave": "avenue",
+    "dr": "drive",
+    "expy": "expressway",
+}
+
+
+def normalise_address(address: str) -> str:
+    """Canonical cache key for a free-text place name."""
+
+    key = _PUNCTUATION.sub(" ", str(address).lower())
+    key = _WHITESPACE.sub(" ", key).strip()
+    key = _COUNTRY_SUFFIX.sub("", key)
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in key.split(" "))
+
+
+class GeocodeCache:
+    """In-memory LRU/TTL cache backed by an on-disk SQLite store."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        maxsize: int = 2048,
+        memory_ttl: float = 24 * 3600.0,
+        disk_ttl: float = 30 * 24 * 3600.0,
+    ) -> None:
+        self.path = path
+        self.disk_ttl = disk_ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=memory_ttl)
+        self._lock = threading.Lock()
+        self._conn_obj: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.disk_hits = 0
+        self.upstream_calls = 0
+
+    # ------------------------------------------------------------------
+    def get(self, address: str) -> Optional[Tuple[float, float]]:
+        """Return cached coordinates for ``address`` without calling upstream."""
+
+        key = normalise_address(address)
+        if not key:
+            return None
+
+        coords = self._memory.get(key)
+        if coords is not None:
+            return coords
+
+        coords = self._disk_get(key)
+        if coords is not None:
+            self.disk_hits += 1
+            self._memory.set(key, coords)
+        return coords
+
+    def put(self, address: str, lat: float, lon: float) -> None:
+        key = normalise_address(address)
+        if not key:
+            return
+        coords = (float(lat), float(lon))
+        self._memory.set(key, coords)
+        self._disk_put(key, coords)
+
+    def lookup(self, address: str, geocoder: Geocoder) -> Coordinates:
+        """Return coordinates for ``address``, geocoding and caching on a miss.
+
+        Failed lookups are not cached so that a transient upstream error does
+        not pin a place as unknown.
+        """
+
+        cached = self.get(address)
+        if cached is not None:
+            return cached
+
+        self.upstream_calls += 1
+        lat, lon = geocoder(address)
+        if lat is not None and lon is not None:
+            self.put(address, lat, lon)
+        return lat, lon
+
+    def prewarm(self, addresses: Iterable[str], geocoder: Geocoder, delay: float = 1.0) -> int:
+        """Resolve a seed list of places; returns how many were newly fetched.
+
+        ``delay`` spaces out upstream calls to respect Nominatim's usage
+        policy of at most one request per second.
+        """
+
+        fetched = 0
+        for address in addresses:
+            address = address.strip()
+            if not address or self.get(address) is not None:
+                continue
+            lat, _ = self.lookup(address, geocoder)
+            if lat is not None:
+                fetched += 1
+            if delay:
+                time.sleep(delay)
+        return fetched
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "memory": self._memory.stats(),
+            "disk_hits": self.disk_hits,
+            "upstream_calls": self.upstream_calls,
+            "persistent": self.path is not None,
+        }
+
+    # ------------------------------------------------------------------
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        # SQLite connections must not be shared across fork; reopen per process.
+        if self._conn_obj is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn_obj, self._conn_pid = conn, os.getpid()
+        return self._conn_obj
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, float]]:
+        try:
+            with self._lock:
+                conn = self._conn()
+                if conn is None:
+                    return None
+                row = conn.execute(
+                    "SELECT lat, lon FROM geocodes WHERE key = ? AND stored_at >= ?",
+                    (key, time.time() - self.disk_ttl),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Geocode cache read failed: %s", exc)
+            return None
+        return (row[0], row[1]) if row else None
+
+    def _disk_put(self, key: str, coords: Tuple[float, float]) -> None:
+        try:
+            with self._lock:
+                conn = self._conn()
+                if conn is None:
+                    return
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocodes (key, lat, lon, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, coords[0], coords[1], time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Geocode cache write failed: %s", exc)
+
+
+__all__ = ["GeocodeCache", "normalise_address"]
@@ -0,0 +1,166 @@
+"""Compact route geometries for API responses.
+
+OSRM's ``overview=full`` returns thousands of ``[lon, lat]`` pairs per
+route.  As JSON, that is most of the bytes of a ``/predict`` response and
+most of its serialisation time.  Two independent reductions are offered:
+
+- ``simplify`` drops points with Douglas-Peucker.  The simplified line stays
+  within ``tolerance_m`` metres of the original; distances are measured on
+  the same local metric plane as link matching.
+- ``encode_polyline`` writes the Google encoded-polyline format: scaled
+  integer deltas, zig-zag and base-64-style varints.  It is one ASCII
+  string, usually 6-8 bytes per point.  ``precision=6`` matches OSRM's
+  ``polyline6``.
+
+``format_geometry`` applies both as a client asks for them.  Simplify only
+for display; link matching must see the full geometry.
+"""
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+
+from .linkmatch import _as_lonlat_array, _project
+
+GEOMETRY_FORMATS = ("geojson", "polyline", "polyline6")
+
+# Enough for |value| < 2**34, i.e. any coordinate at precision 6.
+_MAX_CHUNKS = 7
+
+
+def simplify(coords, tolerance_m: float) -> np.ndarray:
+    """Douglas-Peucker simplification of ``[lon, lat]`` points.
+
+    Always keeps the first and last point.  Returns an ``(n, 2)`` array.
+    """
+
+    pts = _as_lonlat_array(coords)
+    n = len(pts)
+    if n <= 2 or tolerance_m <= 0:
+        return pts
+    x, y = _project(pts[:, 1], pts[:, 0])
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    tol2 = float(tolerance_m) ** 2
+    # Interior points of segments that may still split.
+    pos = np.arange(1, n - 1)
+
+    # Every open segment is split at its farthest point in the same pass,
+    # so there is one pass per recursion level instead of one Python
+    # iteration per split; the result is the same as recursive DP.
+    while len(pos):
+        kept = np.flatnonzero(keep)
+        seg = np.searchsorted(kept, pos, side="right") - 1
+        i, j = kept[seg], kept[seg + 1]
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        seg2 = dx * dx + dy * dy
+        px, py = x[pos], y[pos]
+        # Distance to the segment, not the infinite line, so loops and
+        # U-turns are kept.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.clip(np.where(seg2 > 0, ((px - x[i]) * dx + (py - y[i]) * dy) / seg2, 0.0), 0.0, 1.0)
+        ex, ey = px - (x[i] + t * dx), py - (y[i] + t * dy)
+        d2 = ex * ex + ey * ey
+
+        # pos is sorted, so each segment's points are one contiguous run.
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+        run_max = np.maximum.reduceat(d2, starts)
+        split_run = run_max > tol2
+        if not split_run.any():
+            break
+        run_of = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(pos)]))
+        # First farthest point of each run, as argmax would pick.
+        hit = (d2 == run_max[run_of]) & split_run[run_of]
+        _, first = np.unique(run_of[hit], return_index=True)
+        new = pos[np.flatnonzero(hit)[first]]
+        keep[new] = True
+        pos = pos[split_run[run_of] & ~keep[pos]]
+    return pts[keep]
+
+
+def encode_polyline(coords, precision: int = 5) -> str:
+    """Encode ``[lon, lat]`` points as a Google polyline (lat first)."""
+
+    pts = _as_lonlat_array(coords)
+    if len(pts) == 0:
+        return ""
+    scaled = np.round(pts[:, ::-1] * (10 ** precision)).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1).astype(np.uint64)
+
+    shifts = np.arange(_MAX_CHUNKS, dtype=np.uint64) * np.uint64(5)
+    chunks = (zigzag[:, None] >> shifts) & np.uint64(0x1F)
+    # Number of 5-bit groups each value needs (at least one).
+    n_chunks = 1 + (zigzag[:, None] >= (np.uint64(1) << shifts[1:])).sum(axis=1)
+    col = np.arange(_MAX_CHUNKS)
+    used = col[None, :] < n_chunks[:, None]
+    more = col[None, :] < (n_chunks - 1)[:, None]
+    chars = (chunks | np.where(more, np.uint64(0x20), np.uint64(0))) + np.uint64(63)
+    return chars[used].astype(np.uint8).tobytes().decode("ascii")
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> List[List[float]]:
+    """Inverse of ``encode_polyline``; returns ``[lon, lat]`` pairs."""
+
+    values = []
+    current = shift = 0
+    for byte in encoded.encode("ascii"):
+        b = byte - 63
+        current |= (b & 0x1F) << shift
+        if b & 0x20:
+            shift += 5
+            continue
+        values.append(~(current >> 1) if current & 1 else current >> 1)
+        current = shift = 0
+    latlon = np.cumsum(np.asarray(values, dtype=np.int64).reshape(-1, 2), axis=0) / (10 ** precision)
+    return latlon[:, ::-1].tolist()
+
+
+def format_geometry(coords, fmt: str = "geojson", tolerance_m: Optional[float] = None):
+    """Route geometry for a response, in ``fmt`` after optional simplification.
+
+    ``geojson`` returns a list of ``[lon, lat]`` pairs, as OSRM does.  The
+    polyline formats return a string.  Raises ``ValueError`` for an unknown
+    format.
+    """
+
+    if fmt not in GEOMETRY_FORMATS:
+        raise ValueError(f"geometry_format must be one of {', '.join(GEOMETRY_FORMATS)}")
+    if tolerance_m:
+        coords = simplify(coords, tolerance_m)
+    if fmt == "geojson":
+        return coords.tolist() if isinstance(coords, np.ndarray) else coords
+    return encode_polyline(coords, precision=6 if fmt == "polyline6" else 5)
+
+
+def parse_geometry_options(fmt: Optional[str], tolerance: Optional[object]) -> tuple:
+    """Validate client-supplied ``geometry_format`` / ``simplify_m`` values."""
+
+    fmt = fmt or "geojson"
+    if not isinstance(fmt, str) or fmt.strip().lower() not in GEOMETRY_FORMATS:
+        raise ValueError(f"geometry_format must be one of {', '.join(GEOMETRY_FORMATS)}")
+    fmt = fmt.strip().lower()
+    # JSON bodies may send any type; only numbers and numeric strings are metres.
+    if tolerance is None or tolerance == "":
+        tolerance_m = 0.0
+    elif isinstance(tolerance, bool) or not isinstance(tolerance, (int, float, str)):
+        raise ValueError("simplify_m must be a number of metres")
+    else:
+        try:
+            tolerance_m = float(tolerance)
+        except ValueError:
+            raise ValueError("simplify_m must be a number of metres") from None
+    if not 0.0 <= tolerance_m <= 1000.0:
+        raise ValueError("simplify_m must be between 0 and 1000")
+    return fmt, tolerance_m
+
+
+__all__ = [
+    "GEOMETRY_FORMATS",
+    "decode_polyline",
+    "encode_polyline",
+    "format_geometry",
+    "parse_geometry_options",
+    "simplify",
+]
@@ -0,0 +1,227 @@
+"""Bounded in-memory time series of speed-band snapshots, per LinkID.
+
+Each refresh appends the snapshot's speed estimates as one row of a
+fixed-size ``(capacity, max_links)`` float32 ring buffer.  Appending does not
+depend on how much history is held, and memory never grows past the
+preallocated arrays.  LinkIDs are mapped to stable columns ("slots") the first
+time they are seen.  Links missing from a snapshot get NaN for that sample,
+and every feature ignores NaN.
+
+Lag, delta, rolling-mean and trend features are computed for all links at
+once, with NumPy reductions over the most recent rows.  ``SpeedFeatures``
+bundles them per snapshot, aligned with the table's rows, which is what the
+forecasting path consumes.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from .speedtable import MAX_SPEED_KMH, SpeedBandTable
+
+
+@dataclass(frozen=True)
+class SpeedFeatures:
+    """Temporal speed features for the rows of one snapshot."""
+
+    current: np.ndarray
+    lag_1: np.ndarray
+    delta_1: np.ndarray
+    rolling_mean: np.ndarray
+    # Least-squares speed trend over the rolling window, km/h per minute.
+    slope_per_min: np.ndarray
+    samples: int
+
+    def extrapolate(self, minutes: float) -> np.ndarray:
+        """Speed ``minutes`` ahead along the recent trend, clamped to 0-120.
+
+        Links without a usable trend keep their current speed.
+        """
+
+        slope = np.nan_to_num(self.slope_per_min, nan=0.0)
+        return np.clip(self.current + slope * minutes, 0.0, MAX_SPEED_KMH)
+
+
+class SpeedHistory:
+    """Ring buffer of per-link speed estimates over the last ``capacity`` refreshes."""
+
+    def __init__(self, capacity: int = 36, max_links: int = 100_000, window: int = 6) -> None:
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = int(capacity)
+        self.max_links = int(max_links)
+        self.window = max(2, min(int(window), self.capacity))
+
+        self._speeds = np.full((self.capacity, self.max_links), np.nan, dtype=np.float32)
+        self._times = np.full(self.capacity, np.nan, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
+        # Known LinkIDs, sorted, with the slot each one owns.
+        self._slot_ids = np.empty(0, dtype=np.int64)
+        self._slot_of = np.empty(0, dtype=np.int64)
+        self._dropped_links = 0
+        self._last: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ------------------------------------------------------------------
+    def append(self, tbl: SpeedBandTable, timestamp: Optional[float] = None) -> SpeedFeatures:
+        """Record a snapshot and return its features, aligned with ``tbl`` rows."""
+
+        with self._lock:
+            slots = self._assign_slots(tbl.link_ids)
+            row = self._speeds[self._head]
+            row.fill(np.nan)
+            known = slots >= 0
+            row[slots[known]] = tbl.speed_est[known]
+            self._times[self._head] = time.time() if timestamp is None else timestamp
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            features = self._features(slots)
+            self._last = (tbl, features)
+            return features
+
+    def features_for(self, tbl: SpeedBandTable) -> Optional[SpeedFeatures]:
+        """Features computed when ``tbl`` was appended, if it was the latest."""
+
+        last = self._last
+        return last[1] if last is not None and last[0] is tbl else None
+
+    def lag(self, k: int, link_ids=None) -> np.ndarray:
+        """Speed ``k`` samples before the latest one (NaN if not recorded).
+
+        Without ``link_ids`` this covers every known link, in LinkID order.
+        """
+
+        with self._lock:
+            return self._lag(k, self._slots(link_ids))
+
+    def delta(self, k: int, link_ids=None) -> np.ndarray:
+        """Latest speed minus the speed ``k`` samples earlier."""
+
+        with self._lock:
+            slots = self._slots(link_ids)
+            return self._lag(0, slots) - self._lag(k, slots)
+
+    def rolling_mean(self, window: Optional[int] = None, link_ids=None) -> np.ndarray:
+        """Mean speed over the latest ``window`` samples, ignoring gaps."""
+
+        with self._lock:
+            values, _ = self._recent(window or self.window, self._slots(link_ids))
+            return _nanmean(values)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "samples": self._count,
+            "capacity": self.capacity,
+            "links": len(self._slot_ids),
+            "max_links": self.max_links,
+            "dropped_links": self._dropped_links,
+            "memory_bytes": int(self._speeds.nbytes + self._times.nbytes),
+        }
+
+    # ------------------------------------------------------------------
+    def _assign_slots(self, link_ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(link_ids, dtype=np.int64)
+        slots = self._lookup(ids)
+
+        new = np.unique(ids[slots < 0])
+        free = self.max_links - len(self._slot_ids)
+        if len(new) > free:
+            self._dropped_links += len(new) - free
+            new = new[:free]
+        if len(new):
+            new_slots = np.arange(len(self._slot_ids), len(self._slot_ids) + len(new))
+            ids_all = np.concatenate([self._slot_ids, new])
+            order = np.argsort(ids_all, kind="stable")
+            self._slot_ids = ids_all[order]
+            self._slot_of = np.concatenate([self._slot_of, new_slots])[order]
+            slots = self._lookup(ids)
+        return slots
+
+    def _lookup(self, ids: np.ndarray) -> np.ndarray:
+        if len(self._slot_ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._slot_ids, ids), len(self._slot_ids) - 1)
+        return np.where(self._slot_ids[pos] == ids, self._slot_of[pos], -1)
+
+    def _slots(self, link_ids) -> np.ndarray:
+        if link_ids is None:
+            return self._slot_of
+        return self._lookup(np.asarray(link_ids, dtype=np.int64))
+
+    def _rows(self, n: int) -> np.ndarray:
+        """Ring positions of the latest ``n`` samples, newest first."""
+
+        n = min(n, self._count)
+        return (self._head - 1 - np.arange(n)) % self.capacity
+
+    def _gather(self, rows: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        # Unknown links (slot -1) read as NaN.
+        out = self._speeds[np.ix_(rows, np.maximum(slots, 0))]
+        out[:, slots < 0] = np.nan
+        return out
+
+    def _lag(self, k: int, slots: np.ndarray) -> np.ndarray:
+        if k >= self._count:
+            return np.full(len(slots), np.nan, dtype=np.float32)
+        return self._gather(self._rows(k + 1)[k:], slots)[0]
+
+    def _recent(self, window: int, slots: np.ndarray):
+        rows = self._rows(window)
+        return self._gather(rows, slots), self._times[rows]
+
+    def _features(self, slots: np.ndarray) -> SpeedFeatures:
+        values, times = self._recent(self.window, slots)
+        current, lag_1 = values[0], self._lag(1, slots)
+        return SpeedFeatures(
+            current=current.astype(np.float64),
+            lag_1=lag_1.astype(np.float64),
+            delta_1=(current - lag_1).astype(np.float64),
+            rolling_mean=_nanmean(values),
+            slope_per_min=_nanslope(values, (times - times[0]) / 60.0),
+            samples=self._count,
+        )
+
+
+def _nanmean(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    total = np.where(valid, values, 0.0).sum(axis=0, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _nanslope(values: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+    """Per-column least-squares slope of ``values`` over ``minutes``.
+
+    Columns with fewer than two samples, or all samples at one instant, get NaN.
+    """
+
+    valid = ~np.isnan(values)
+    t = np.where(valid, minutes[:, None], 0.0)
+    y = np.where(valid, values, 0.0).astype(np.float64)
+    n = valid.sum(axis=0)
+    st, sy = t.sum(axis=0), y.sum(axis=0)
+    stt, sty = (t * t).sum(axis=0), (t * y).sum(axis=0)
+    denom = n * stt - st * st
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sty - st * sy) / denom
+    return np.where((n >= 2) & (np.abs(denom) > 1e-9), slope, np.nan)
+
+
+def history_capacity(hours: float, refresh_seconds: float) -> int:
+    """Ring size that holds ``hours`` of snapshots at the refresh cadence."""
+
+    return max(2, math.ceil(hours * 3600.0 / max(refresh_seconds, 1.0)))
+
+
+__all__ = ["SpeedFeatures", "SpeedHistory", "history_capacity"]
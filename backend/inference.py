@@ -0,0 +1,112 @@
+"""Batched scoring of congestion feature rows.
+
+Building a one-row ``DataFrame`` and calling ``predict_proba`` for every
+candidate pays sklearn's input validation and pandas overhead each time.
+``CongestionScorer`` instead packs all rows of a request (routes x forecast
+horizons) into one C-contiguous float64 matrix laid out in the model's
+feature order and scores it with a single ``predict_proba`` call.
+
+With ``enable_batching`` the scorer additionally routes its matrices through
+a ``MicroBatcher`` so rows from concurrent requests share one model call.
+"""
+from __future__ import annotations
+
+import warnings
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .batching import MicroBatcher
+
+# The bundled models were fitted on DataFrames, so sklearn warns when it is
+# handed a bare ndarray.  The column order is enforced by ``matrix`` instead.
+warnings.filterwarnings(
+    "ignore",
+    message="X does not have valid feature names",
+    category=UserWarning,
+)
+
+
+class CongestionScorer:
+    """Scores feature rows with a binary congestion classifier."""
+
+    def __init__(self, model, features: Sequence[str]) -> None:
+        self.model = model
+        self.features = list(features)
+        self.batcher: Optional[MicroBatcher] = None
+        self.compiled = None
+        self.compiled_max_rows = 0
+
+    def enable_batching(self, max_batch: int = 64, max_wait_ms: float = 2.0) -> MicroBatcher:
+        """Coalesce concurrent ``score`` calls into shared model calls."""
+
+        self.batcher = MicroBatcher(self._predict, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        return self.batcher
+
+    def enable_compiled(self, forest, max_rows: int = 512) -> None:
+        """Score matrices of up to ``max_rows`` rows with a ``CompiledForest``.
+
+        Small batches skip sklearn's per-call overhead entirely.  Larger ones
+        still go to ``predict_proba``, whose native, multi-threaded traversal
+        wins once the overhead is amortised.
+        """
+
+        self.compiled = forest
+        self.compiled_max_rows = int(max_rows)
+
+    def stats(self) -> Dict[str, object]:
+        """Inference metrics for health reporting."""
+
+        return {
+            "predictor": "compiled" if self.compiled is not None else "sklearn",
+            "batching": self.batcher is not None,
+            **(self.batcher.stats() if self.batcher is not None else {}),
+        }
+
+    def matrix(self, rows: Iterable[Mapping[str, float]]) -> np.ndarray:
+        """Pack feature dicts into an ``(n_rows, n_features)`` matrix."""
+
+        rows = list(rows)
+        X = np.empty((len(rows), len(self.features)), dtype=np.float64)
+        for i, row in enumerate(rows):
+            X[i] = [row[name] for name in self.features]
+        return X
+
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Return P(congested) for every row of a prepared feature matrix."""
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(
+                f"Expected a matrix with {len(self.features)} feature columns, got shape {X.shape}"
+            )
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+        if self.batcher is not None:
+            return self.batcher.score_matrix(X)
+        return self._predict(X)
+
+    def score_bulk(self, X: np.ndarray) -> np.ndarray:
+        """Score a large matrix directly, bypassing the micro-batcher.
+
+        Used for background work such as per-snapshot precomputation, which
+        would otherwise hold up the batches of interactive requests.
+        """
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+        return self._predict(X)
+
+    def score(self, rows: Iterable[Mapping[str, float]]) -> np.ndarray:
+        """Return P(congested) for every feature dict, in input order."""
+
+        return self.score_matrix(self.matrix(rows))
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if self.compiled is not None and len(X) <= self.compiled_max_rows:
+            return self.compiled.predict_proba(X)
+        return self.model.predict_proba(X)[:, 1]
+
+
+__all__ = ["CongestionScorer"]
@@ -0,0 +1,174 @@
+"""Paginated, streaming ingestion of DataMall TrafficSpeedBands.
+
+The v4 endpoint returns at most 500 records per response and is paged with
+``$skip``.  ``SpeedBandIngester`` keeps a bounded window of page requests in
+flight, parses each page as it arrives and appends its records straight into
+a ``SpeedBandBuilder``.  A page is never held as a list of dicts.  The pages
+are merged in ``$skip`` order once the last (short) page has been seen.
+
+When ``ijson`` is installed, each response body is parsed incrementally from
+the socket.  Otherwise the page is decoded whole, which still bounds the
+peak to a single page per worker.
+
+A page that fails is retried up to ``page_retries`` times.  If it still
+fails, the table is built from the pages that did arrive and ``stats``
+reports it as incomplete, with the missing pages and the share of pages
+covered.  Once ``max_workers`` pages have failed, no further pages are
+requested.  Only when no page arrives at all does ``fetch`` raise.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Mapping, Optional
+
+from .outbound import OutboundClient
+from .speedtable import SpeedBandBuilder, SpeedBandTable
+
+logger = logging.getLogger(__name__)
+
+try:  # optional: incremental parsing straight off the socket
+    import ijson
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+_JSON_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+class IngestError(RuntimeError):
+    """Raised when a page cannot be fetched or decoded."""
+
+
+class SpeedBandIngester:
+    """Fetches every page of TrafficSpeedBands into one columnar table."""
+
+    def __init__(
+        self,
+        client: OutboundClient,
+        headers: Optional[Mapping[str, str]] = None,
+        page_size: int = 500,
+        max_workers: int = 4,
+        max_pages: int = 400,
+        page_retries: int = 2,
+    ) -> None:
+        self.client = client
+        self.headers = dict(headers or {})
+        self.page_size = int(page_size)
+        self.max_workers = max(1, int(max_workers))
+        self.max_pages = int(max_pages)
+        self.page_retries = max(0, int(page_retries))
+        self.streaming = ijson is not None
+        self._lock = threading.Lock()
+        self._last: Dict[str, object] = {}
+
+    def fetch(self, constants: Optional[Mapping[str, float]] = None) -> SpeedBandTable:
+        """Download all pages concurrently and build one ``SpeedBandTable``."""
+
+        pages: Dict[int, SpeedBandBuilder] = {}
+        attempts: Dict[int, int] = {}
+        failed: Dict[int, str] = {}
+        last_page: Optional[int] = None
+        next_page = 0
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="speedband-page") as pool:
+            inflight = {}
+
+            def schedule() -> None:
+                nonlocal next_page
+                while (
+                    len(inflight) < self.max_workers
+                    and next_page < self.max_pages
+                    and (last_page is None or next_page <= last_page)
+                    # Several pages failing for good means an outage; stop.
+                    and len(failed) < self.max_workers
+                ):
+                    inflight[pool.submit(self._fetch_page, next_page)] = next_page
+                    next_page += 1
+
+            schedule()
+            try:
+                while inflight:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page = inflight.pop(future)
+                        try:
+                            builder = future.result()
+                        except Exception as exc:
+                            attempts[page] = attempts.get(page, 0) + 1
+                            if attempts[page] <= self.page_retries:
+                                logger.info("Retrying speed-band page %d: %s", page, exc)
+                                inflight[pool.submit(self._fetch_page, page)] = page
+                            else:
+                                failed[page] = str(exc)
+                            continue
+                        pages[page] = builder
+                        if len(builder) + builder.skipped < self.page_size:
+                            last_page = page if last_page is None else min(last_page, page)
+                    schedule()
+            except BaseException:
+                for future in inflight:
+                    future.cancel()
+                raise
+
+        if not pages:
+            raise IngestError(f"no speed-band page could be fetched: {failed.get(0, 'no pages requested')}")
+        if last_page is None:
+            # No short page arrived: the page limit was reached, or requests
+            # stopped after failures.
+            last_page = max([*pages, *failed])
+            if not failed:
+                logger.warning("Speed-band ingestion stopped at the %d-page limit", self.max_pages)
+
+        table = SpeedBandBuilder()
+        missing = []
+        for page in range(last_page + 1):
+            if page in pages:
+                table.merge(pages[page])
+            else:
+                missing.append(page)
+        if missing:
+            logger.warning(
+                "Speed-band snapshot is incomplete: page(s) %s failed (%s)",
+                missing, failed.get(missing[0], "not fetched"),
+            )
+
+        with self._lock:
+            self._last = {
+                "pages": last_page + 1,
+                "records": len(table),
+                "skipped": table.skipped,
+                "streaming": self.streaming,
+                "complete": not missing,
+                "missing_pages": missing,
+                "coverage": round(1 - len(missing) / (last_page + 1), 4),
+                "retried_pages": len(attempts),
+            }
+        return table.build(constants)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return dict(self._last)
+
+    # ------------------------------------------------------------------
+    def _fetch_page(self, page: int) -> SpeedBandBuilder:
+        params = {"$skip": page * self.page_size}
+        response = self.client.get(headers=self.headers, params=params, stream=self.streaming)
+        try:
+            if response.status_code != 200:
+                raise IngestError(f"page {page} returned HTTP {response.status_code}")
+
+            builder = SpeedBandBuilder()
+            if self.streaming:
+                response.raw.decode_content = True
+                builder.extend(ijson.items(response.raw, "value.item"))
+            else:
+                builder.extend(response.json().get("value", []))
+            return builder
+        except _JSON_ERRORS as exc:
+            raise IngestError(f"page {page} is not valid JSON: {exc}") from exc
+        finally:
+            response.close()
+
+
+__all__ = ["IngestError", "SpeedBandIngester"]
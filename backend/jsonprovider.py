@@ -0,0 +1,76 @@
+"""Flask JSON provider backed by orjson when it is installed.
+
+``jsonify`` normally goes through the stdlib encoder, which walks every
+dict, list and float of a response in Python.  A ``/predict`` response
+carries thousands of coordinate pairs, so that walk is a noticeable share
+of request time.  ``FastJSONProvider`` encodes with orjson instead, and
+writes the bytes straight into the response.
+
+NumPy scalars and arrays are encoded natively, so handlers can return
+``np.float64``, ``np.int64`` or arrays without coercing them first.  Other
+types follow Flask's defaults on both paths: dates become HTTP dates,
+dataclasses become dicts, and UUIDs and Decimals become strings.  Without
+orjson, the provider is Flask's default provider plus NumPy support.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:  # optional: much faster encoding and decoding
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # NumPy scalars and arrays (anything with a dtype) know how to become
+    # Python numbers and lists.
+    if hasattr(obj, "dtype") and hasattr(obj, "tolist"):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """``DefaultJSONProvider`` with orjson encoding and NumPy support."""
+
+    default = staticmethod(_default)
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if orjson is not None else "json"
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        # Dates go through ``default`` so they match Flask's stdlib output.
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode("utf-8")
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+__all__ = ["FastJSONProvider"]
@@ -0,0 +1,225 @@
+"""Geometric matching of route polylines onto LTA speed-band links.
+
+Each TrafficSpeedBands record describes a directed road link by its start and
+end coordinates.  ``LinkIndex`` projects those segments onto a local metric
+plane and buckets them into a uniform grid (a flat, CSR-style hash of cell ->
+segments) so a route can be matched with a handful of vectorised NumPy
+operations instead of a scan over every link.
+
+A link is considered traversed when a (resampled) route point projects onto
+it within ``tolerance_m`` and the route heading at that point agrees with the
+link direction, which keeps the opposite carriageway and crossing roads out
+of the match.
+"""
+from __future__ import annotations
+
+import math
+from itertools import chain
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .speedtable import SpeedBandTable
+
+# Equirectangular projection centred on Singapore; the distortion over the
+# island is far below the matching tolerance.
+_ORIGIN_LAT = 1.35
+_ORIGIN_LON = 103.82
+_M_PER_DEG_LAT = 110_574.0
+_M_PER_DEG_LON = 111_320.0 * math.cos(math.radians(_ORIGIN_LAT))
+
+
+def _project(lat: np.ndarray, lon: np.ndarray):
+    x = (np.asarray(lon, dtype=np.float64) - _ORIGIN_LON) * _M_PER_DEG_LON
+    y = (np.asarray(lat, dtype=np.float64) - _ORIGIN_LAT) * _M_PER_DEG_LAT
+    return x, y
+
+
+def _as_lonlat_array(coords) -> np.ndarray:
+    if isinstance(coords, np.ndarray):
+        return coords.astype(np.float64, copy=False).reshape(-1, 2)
+    # fromiter over a flattened list is several times faster than
+    # np.asarray on a list of [lon, lat] pairs.
+    flat = np.fromiter(chain.from_iterable(coords), dtype=np.float64, count=2 * len(coords))
+    return flat.reshape(-1, 2)
+
+
+class LinkIndex:
+    """Uniform-grid spatial index over directed speed-band link segments."""
+
+    def __init__(
+        self,
+        link_ids: Sequence,
+        start_lat: np.ndarray,
+        start_lon: np.ndarray,
+        end_lat: np.ndarray,
+        end_lon: np.ndarray,
+        cell_size_m: float = 100.0,
+        tolerance_m: float = 25.0,
+    ) -> None:
+        self.cell_size_m = float(cell_size_m)
+        self.tolerance_m = float(tolerance_m)
+
+        x0, y0 = _project(start_lat, start_lon)
+        x1, y1 = _project(end_lat, end_lon)
+        valid = np.isfinite(x0) & np.isfinite(y0) & np.isfinite(x1) & np.isfinite(y1)
+
+        self.link_ids = np.asarray(link_ids)[valid]
+        self._x0, self._y0 = x0[valid], y0[valid]
+        self._dx, self._dy = x1[valid] - self._x0, y1[valid] - self._y0
+        self._len2 = self._dx * self._dx + self._dy * self._dy
+
+        self._build_grid(x1[valid], y1[valid])
+
+    @classmethod
+    def from_table(cls, tbl: SpeedBandTable, **kwargs) -> "LinkIndex":
+        """Build an index from a columnar speed-band snapshot."""
+
+        return cls(tbl.link_ids, tbl.start_lat, tbl.start_lon, tbl.end_lat, tbl.end_lon, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.link_ids)
+
+    # ------------------------------------------------------------------
+    def _build_grid(self, x1: np.ndarray, y1: np.ndarray) -> None:
+        cell, tol = self.cell_size_m, self.tolerance_m
+        n = len(self._x0)
+
+        if n == 0:
+            self._origin = (0.0, 0.0)
+            self._nx = 1
+            self._cell_keys = np.empty(0, dtype=np.int64)
+            self._cell_start = np.empty(0, dtype=np.int64)
+            self._cell_end = np.empty(0, dtype=np.int64)
+            self._cell_segs = np.empty(0, dtype=np.int64)
+            return
+
+        # Inflate every segment's bounding box by the tolerance so a query only
+        # has to look at the single cell its point falls into.
+        min_x = np.minimum(self._x0, x1) - tol
+        max_x = np.maximum(self._x0, x1) + tol
+        min_y = np.minimum(self._y0, y1) - tol
+        max_y = np.maximum(self._y0, y1) + tol
+
+        self._origin = (float(min_x.min()), float(min_y.min()))
+        cx0 = ((min_x - self._origin[0]) // cell).astype(np.int64)
+        cx1 = ((max_x - self._origin[0]) // cell).astype(np.int64)
+        cy0 = ((min_y - self._origin[1]) // cell).astype(np.int64)
+        cy1 = ((max_y - self._origin[1]) // cell).astype(np.int64)
+        self._nx = int(cx1.max()) + 1
+
+        width = cx1 - cx0 + 1
+        counts = width * (cy1 - cy0 + 1)
+        seg = np.repeat(np.arange(n, dtype=np.int64), counts)
+        local = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        cx = cx0[seg] + local % width[seg]
+        cy = cy0[seg] + local // width[seg]
+        keys = cy * self._nx + cx
+
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        self._cell_segs = seg[order]
+        self._cell_keys, self._cell_start = np.unique(keys, return_index=True)
+        self._cell_start = self._cell_start.astype(np.int64)
+        self._cell_end = np.append(self._cell_start[1:], len(self._cell_segs))
+
+    def _cell_ranges(self, px: np.ndarray, py: np.ndarray):
+        cx = ((px - self._origin[0]) // self.cell_size_m).astype(np.int64)
+        cy = ((py - self._origin[1]) // self.cell_size_m).astype(np.int64)
+        inside = (cx >= 0) & (cx < self._nx) & (cy >= 0)
+        keys = np.where(inside, cy * self._nx + cx, -1)
+
+        pos = np.searchsorted(self._cell_keys, keys)
+        pos_clipped = np.minimum(pos, len(self._cell_keys) - 1)
+        found = inside & (self._cell_keys[pos_clipped] == keys)
+
+        start = self._cell_start[pos_clipped]
+        end = self._cell_end[pos_clipped]
+        counts = np.where(found, end - start, 0)
+        return start, counts
+
+    # ------------------------------------------------------------------
+    def match(
+        self,
+        route_coords: Sequence[Sequence[float]],
+        tolerance_m: Optional[float] = None,
+        max_heading_deg: float = 45.0,
+    ) -> List:
+        """Return the LinkIDs traversed by a GeoJSON ``[lon, lat]`` polyline.
+
+        LinkIDs are returned once each, in the order the route reaches them.
+        ``tolerance_m`` may only be tightened below the tolerance the index
+        was built with, since larger values would need a wider cell search.
+        """
+
+        if len(self.link_ids) == 0 or len(route_coords) < 2:
+            return []
+
+        tol = self.tolerance_m if tolerance_m is None else min(tolerance_m, self.tolerance_m)
+        coords = _as_lonlat_array(route_coords)
+        px, py, hx, hy = self._resample(*_project(coords[:, 1], coords[:, 0]), step=tol / 2)
+        if len(self._cell_keys) == 0 or len(px) == 0:
+            return []
+
+        start, counts = self._cell_ranges(px, py)
+        total = int(counts.sum())
+        if total == 0:
+            return []
+
+        point = np.repeat(np.arange(len(px)), counts)
+        offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        cand = self._cell_segs[np.repeat(start, counts) + offset]
+
+        # Point-to-segment distance for every (point, candidate link) pair.
+        sx, sy = self._dx[cand], self._dy[cand]
+        rx, ry = px[point] - self._x0[cand], py[point] - self._y0[cand]
+        len2 = self._len2[cand]
+        t = np.divide(rx * sx + ry * sy, len2, out=np.zeros_like(len2), where=len2 > 0)
+        ex, ey = rx - t * sx, ry - t * sy
+        # Only projections onto the link itself count; points merely near
+        # an endpoint (e.g. just before a turn) are not evidence of traversal.
+        close = (ex * ex + ey * ey <= tol * tol) & (t >= 0.0) & (t <= 1.0)
+
+        # Route heading must agree with the link direction.
+        cos_limit = math.cos(math.radians(max_heading_deg))
+        dot = hx[point] * sx + hy[point] * sy
+        aligned = (len2 == 0) | (dot >= cos_limit * np.sqrt(len2))
+
+        hits = cand[close & aligned]
+        if len(hits) == 0:
+            return []
+
+        # ``point`` is non-decreasing, so the first occurrence of each link is
+        # where the route first reaches it.
+        uniq, first = np.unique(hits, return_index=True)
+        return self.link_ids[uniq[np.argsort(first)]].tolist()
+
+    @staticmethod
+    def _resample(x: np.ndarray, y: np.ndarray, step: float):
+        """Resample a projected polyline at a uniform arc-length ``step``.
+
+        OSRM geometries are very dense in built-up areas and sparse along
+        expressways; resampling makes the matching cost proportional to the
+        route length rather than to the number of GeoJSON points.  Returns the
+        samples together with the unit heading of the leg each one lies on.
+        """
+
+        dx, dy = np.diff(x), np.diff(y)
+        length = np.hypot(dx, dy)
+        keep = length > 0
+        if not keep.any():
+            return (np.empty(0),) * 4
+
+        x0, y0, dx, dy, length = x[:-1][keep], y[:-1][keep], dx[keep], dy[keep], length[keep]
+        along = np.concatenate(([0.0], np.cumsum(length)))
+        samples = np.append(np.arange(0.0, along[-1], max(step, 1e-6)), along[-1])
+        leg = np.clip(np.searchsorted(along, samples, side="right") - 1, 0, len(length) - 1)
+        frac = (samples - along[leg]) / length[leg]
+
+        ux, uy = dx / length, dy / length
+        return x0[leg] + frac * dx[leg], y0[leg] + frac * dy[leg], ux[leg], uy[leg]
+
+
+__all__ = ["LinkIndex"]
@@ -0,0 +1,170 @@
+"""Per-LinkID congestion probabilities, precomputed once per snapshot.
+
+Every request used to aggregate its route's segments and call the model, so
+concurrent users repeated the same work against the same snapshot.
+``LinkScoreTable`` instead scores every link of the speed-band table for every
+forecast horizon in one batched pass right after a refresh.  The result is a
+compact ``(n_links, n_horizons)`` float32 array indexed by LinkID, and scoring
+a route becomes an index gather plus a mean.
+
+A route's probability is the mean of its links' probabilities, each link
+scored on its own feature row.  When a snapshot has no precomputed table, a
+table is built for just the links of the routes being scored, so both paths
+give a route the same value.
+"""
+from __future__ import annotations
+
+from typing import Callable, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .history import SpeedFeatures
+from .speedtable import MAX_SPEED_KMH, SpeedBandTable
+
+# Minutes ahead scored for /forecast; horizon 0 is also what /predict uses.
+FORECAST_HORIZONS_MIN: Tuple[int, ...] = (0, 15, 30, 60)
+
+# Speed features moved together when a trend is extrapolated.
+_SPEED_FEATURES = ("SpeedKMH_Est", "MinimumSpeed", "MaximumSpeed")
+
+
+class LinkScoreTable:
+    """P(congested) per link (rows) and forecast horizon (columns).
+
+    ``model`` identifies the model version the probabilities came from, so
+    a table built before a model swap can be recognised and rebuilt.
+    """
+
+    def __init__(
+        self,
+        link_ids: Sequence,
+        probs: np.ndarray,
+        horizons: Sequence[int],
+        model: Optional[Hashable] = None,
+    ) -> None:
+        ids = np.asarray(link_ids)
+        self.horizons = tuple(horizons)
+        self.model = model
+        self.probs = np.ascontiguousarray(probs, dtype=np.float32)
+        if self.probs.shape != (len(ids), len(self.horizons)):
+            raise ValueError("probs must have one row per link and one column per horizon")
+
+        self._order = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._order]
+
+    @classmethod
+    def build(
+        cls,
+        tbl: SpeedBandTable,
+        features: Sequence[str],
+        score: Callable[[np.ndarray], np.ndarray],
+        horizons: Sequence[int] = FORECAST_HORIZONS_MIN,
+        speed_features: Optional[SpeedFeatures] = None,
+        rows: Optional[np.ndarray] = None,
+        model: Optional[Hashable] = None,
+    ) -> "LinkScoreTable":
+        """Score every link of ``tbl`` for every horizon in one model call.
+
+        ``score`` maps a feature matrix, in ``features`` order, to
+        P(congested) per row.  ``rows`` limits the table to those rows of
+        ``tbl``.
+
+        A horizon advances the clock features: ``hour`` rolls over using the
+        snapshot's ``minute``, and ``dow`` moves to the next day when a
+        horizon crosses midnight.  Horizons on the same day and hour share one block of
+        rows.  Given ``speed_features``, a horizon also moves each link's
+        speed band along its recent trend; only links whose speed actually
+        moves are scored again for it.
+        """
+
+        features = list(features)
+        base = tbl.feature_matrix(features, rows)
+        hour_col = features.index("hour")
+        dow_col = features.index("dow") if "dow" in features else None
+        base_hour = int(tbl.constants["hour"])
+        base_dow = int(tbl.constants.get("dow", 0))
+        base_minute = int(tbl.constants.get("minute", 0))
+        speed_cols = [features.index(c) for c in _SPEED_FEATURES if c in features]
+
+        # (dow, hour) of every horizon.
+        clocks = []
+        for minutes in horizons:
+            days, minute_of_day = divmod(base_hour * 60 + base_minute + minutes, 24 * 60)
+            clocks.append(((base_dow + days) % 7, minute_of_day // 60))
+        unique_clocks = sorted(set(clocks))
+
+        def set_clock(block: np.ndarray, clock: Tuple[int, int]) -> None:
+            if dow_col is not None:
+                block[:, dow_col] = clock[0]
+            block[:, hour_col] = clock[1]
+
+        blocks = []
+        for clock in unique_clocks:
+            block = base.copy()
+            set_clock(block, clock)
+            blocks.append(block)
+
+        trending = speed_features is not None and speed_features.samples >= 2
+        moved = []
+        for i, minutes in enumerate(horizons):
+            if not (trending and minutes):
+                continue
+            shift = np.nan_to_num(speed_features.extrapolate(minutes) - speed_features.current, nan=0.0)
+            if rows is not None:
+                shift = shift[rows]
+            changed = np.flatnonzero(shift)
+            if len(changed) == 0:
+                continue
+            # Shift the whole band (estimate and limits) by the trend.
+            block = base[changed]
+            set_clock(block, clocks[i])
+            for col in speed_cols:
+                block[:, col] = np.clip(block[:, col] + shift[changed], 0.0, MAX_SPEED_KMH)
+            moved.append((i, changed))
+            blocks.append(block)
+
+        n = len(base)
+        scores = np.asarray(score(np.concatenate(blocks)))
+        by_clock = scores[: n * len(unique_clocks)].reshape(len(unique_clocks), n)
+        probs = by_clock[[unique_clocks.index(clock) for clock in clocks]].T.copy()
+        offset = n * len(unique_clocks)
+        for i, changed in moved:
+            probs[changed, i] = scores[offset: offset + len(changed)]
+            offset += len(changed)
+        link_ids = tbl.link_ids if rows is None else tbl.link_ids[rows]
+        return cls(link_ids, probs, horizons, model)
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids)
+
+    def rows(self, link_ids: Sequence) -> np.ndarray:
+        """Row positions of the given LinkIDs; unknown IDs are dropped."""
+
+        query = np.asarray(link_ids, dtype=self._sorted_ids.dtype)
+        if len(query) == 0 or len(self._sorted_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._sorted_ids, query), len(self._sorted_ids) - 1)
+        found = self._sorted_ids[pos] == query
+        return self._order[pos[found]]
+
+    def route_probabilities(self, link_ids: Sequence) -> np.ndarray:
+        """Mean link probability along a route, one value per horizon.
+
+        Returns an empty array when none of the LinkIDs are in the table.
+        """
+
+        rows = self.rows(link_ids)
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float64)
+        return self.probs[rows].mean(axis=0, dtype=np.float64)
+
+    def route_probability(self, link_ids: Sequence, horizon: int = 0):
+        """Mean link probability along a route for one horizon (in minutes)."""
+
+        probs = self.route_probabilities(link_ids)
+        if len(probs) == 0:
+            return None
+        return float(probs[self.horizons.index(horizon)])
+
+
+__all__ = ["FORECAST_HORIZONS_MIN", "LinkScoreTable"]
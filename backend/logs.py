@@ -0,0 +1,130 @@
+"""Leveled, non-blocking logging for the backend.
+
+Request handlers only put log records on a bounded in-memory queue.  One
+listener thread formats them and writes them to stderr, so console I/O is
+kept off the request path.  If the queue is full, records are dropped and
+counted rather than blocking the request.
+
+Each record carries the id of the request it was logged for (see
+``backend.telemetry``).  The id is read when the record is queued, in the
+thread that logged it.
+
+The listener thread is started lazily and re-started after a fork.  A
+preloading gunicorn master therefore hands its workers a handler that still
+works; the listener thread itself would not survive the fork.  ``flush``
+waits for the queued records to be written; only ``close`` (also run at
+exit) stops the listener.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from .telemetry import request_id_var
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` that drops on overflow and survives ``fork``."""
+
+    def __init__(self, target: logging.Handler, maxsize: int = 10_000) -> None:
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = target
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self.addFilter(RequestIdFilter())
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._closed:
+            self.dropped += 1
+            return
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Records queued before a fork belong to the parent's listener.
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            self._listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait up to ``timeout`` seconds for the queued records to be written."""
+
+        if self._listener is None or self._pid != os.getpid():
+            return
+        # ``Queue.join`` with a deadline: the listener marks each record done.
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.queue.all_tasks_done.wait(remaining)
+        self.target.flush()
+
+    def close(self) -> None:
+        """Write out everything queued, then stop the listener."""
+
+        with self._start_lock:
+            self._closed = True
+            listener = self._listener
+            if listener is not None and self._pid == os.getpid():
+                listener.stop()
+            self._listener = None
+        super().close()
+
+    def stats(self) -> Dict[str, object]:
+        return {"queued": self.queue.qsize(), "dropped": self.dropped, "maxsize": self.maxsize}
+
+
+def configure_logging(level: str = "INFO", maxsize: int = 10_000, logger_name: str = "") -> AsyncQueueHandler:
+    """Route ``logger_name`` (root by default) through an ``AsyncQueueHandler``.
+
+    Calling it again replaces the previous handler instead of adding a second
+    one.
+    """
+
+    target = logging.StreamHandler(sys.stderr)
+    target.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler = AsyncQueueHandler(target, maxsize=maxsize)
+
+    logger = logging.getLogger(logger_name)
+    for existing in list(logger.handlers):
+        if isinstance(existing, AsyncQueueHandler):
+            logger.removeHandler(existing)
+            existing.close()
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    atexit.register(handler.close)
+    return handler
+
+
+__all__ = ["AsyncQueueHandler", "RequestIdFilter", "configure_logging"]
@@ -0,0 +1,263 @@
+"""Shared outbound HTTP clients for the backend's upstream services.
+
+Each upstream (Nominatim, OSRM, DataMall) gets its own ``OutboundClient``
+with its own policy, since their SLAs differ widely:
+
+* a pooled ``requests.Session`` with keep-alive, so repeat calls skip the
+  TCP/TLS handshake;
+* a per-host concurrency limit, which also covers reading streamed
+  bodies: a ``stream=True`` call holds its slot until the response is
+  closed;
+* bounded retries with full-jitter exponential backoff, further capped by a
+  retry budget so retries cannot multiply load during an outage;
+* a circuit breaker that fails fast after repeated upstream failures and
+  lets a single probe through once the reset period has passed.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class ConcurrencyLimitError(requests.exceptions.RequestException):
+    """Raised when no concurrency slot frees up within the call timeout."""
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    """Connection, retry and breaker policy for one upstream host."""
+
+    name: str
+    base_url: str
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    retries: int = 1
+    backoff: float = 0.25
+    max_backoff: float = 2.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    pool_size: int = 10
+    max_concurrency: int = 10
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    # Each request earns this fraction of a retry; bursts capped at max_tokens.
+    retry_budget_ratio: float = 0.2
+    retry_budget_max_tokens: float = 10.0
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe."""
+
+    def __init__(self, threshold: int, reset_after: float) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of overall traffic."""
+
+    def __init__(self, ratio: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class OutboundClient:
+    """Pooled, retrying, circuit-broken GET client for a single upstream."""
+
+    def __init__(self, config: UpstreamConfig) -> None:
+        self.config = config
+        self._breaker = CircuitBreaker(config.breaker_threshold, config.breaker_reset)
+        self._budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_max_tokens)
+        self._slots = threading.BoundedSemaphore(config.max_concurrency)
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+        self._session_lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+        self._counters_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def get(self, path: str = "", **kwargs) -> requests.Response:
+        """GET ``base_url + path``; returns the final response like ``requests``.
+
+        Responses with a retryable status are returned once retries are
+        exhausted, so callers keep their usual ``status_code`` checks.
+        Connection errors and timeouts are raised.
+        """
+
+        cfg = self.config
+        url = cfg.base_url + path
+        kwargs.setdefault("timeout", (cfg.connect_timeout, cfg.read_timeout))
+
+        self._count("requests")
+        self._budget.deposit()
+        if not self._breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"{cfg.name} circuit is open")
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(url, kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if not self._should_retry(attempt):
+                    self._fail()
+                    raise
+                error: Optional[Exception] = exc
+            except Exception:
+                self._fail()
+                raise
+            else:
+                if response.status_code not in cfg.retry_statuses:
+                    self._breaker.record_success()
+                    return response
+                if not self._should_retry(attempt):
+                    self._fail()
+                    return response
+                error = None
+                response.close()
+
+            attempt += 1
+            self._count("retries")
+            delay = random.uniform(0.0, min(cfg.max_backoff, cfg.backoff * (2 ** (attempt - 1))))
+            logger.info("Retrying %s in %.2fs (attempt %d): %s", cfg.name, delay, attempt, error or "retryable status")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, object]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {**counters, "circuit": self._breaker.state}
+
+    # ------------------------------------------------------------------
+    def _send(self, url: str, kwargs) -> requests.Response:
+        cfg = self.config
+        if not self._slots.acquire(timeout=cfg.connect_timeout + cfg.read_timeout):
+            raise ConcurrencyLimitError(f"{cfg.name} concurrency limit reached")
+        try:
+            response = self._get_session().get(url, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        if kwargs.get("stream"):
+            # The body is still being read off the connection.
+            self._hold_slot(response)
+        else:
+            self._slots.release()
+        return response
+
+    def _hold_slot(self, response: requests.Response) -> None:
+        """Keep the concurrency slot until ``response`` is closed or collected."""
+
+        once = threading.Lock()
+
+        def release() -> None:
+            if once.acquire(blocking=False):
+                self._slots.release()
+
+        close = response.close
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        weakref.finalize(response, release)
+
+    def _should_retry(self, attempt: int) -> bool:
+        return attempt < self.config.retries and self._budget.withdraw()
+
+    def _fail(self) -> None:
+        self._count("failures")
+        self._breaker.record_failure()
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self._counters[name] += 1
+
+    def _get_session(self) -> requests.Session:
+        # Pooled sockets must not be shared with forked children.
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.config.pool_size,
+                        max_retries=0,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ConcurrencyLimitError",
+    "OutboundClient",
+    "RetryBudget",
+    "UpstreamConfig",
+]
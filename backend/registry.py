@@ -0,0 +1,396 @@
+"""In-process registry of congestion model versions.
+
+Model bundles are registered by name and loaded on first use.  The active
+version serves requests.  A second version can shadow-score a sample of
+request traffic on a background thread, so its latency and outputs can be
+compared on live inputs without touching the response.  Bulk scoring (the
+per-snapshot link tables) goes through the registry too: it is counted in
+the per-model metrics, and a sample of its rows is shadow-scored.
+
+Every ``check_interval`` seconds, a lookup compares the bundle file's
+mtime and size with what was loaded.  When the file has changed, the new
+version is loaded on a background thread and swapped in with a single
+reference assignment.  Requests already holding the old version finish on
+it.  A reload that fails keeps the old version and is not retried until the
+file changes again.  Replace bundle files atomically (write elsewhere,
+then rename), especially when they are memory-mapped.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .inference import CongestionScorer
+from .startup import StartupProfile, load_model_bundle
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the per-call latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+PROBABILITY_BINS = 10
+
+ScorerFactory = Callable[[Any, Sequence[str]], CongestionScorer]
+
+
+class ModelMetrics:
+    """Latency and output distribution of one model's scoring calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self._latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._latency_total = 0.0
+        self._prob_bins = np.zeros(PROBABILITY_BINS, dtype=np.int64)
+        self._prob_total = 0.0
+
+    def observe(self, seconds: float, probs: np.ndarray) -> None:
+        ms = seconds * 1000.0
+        bucket = int(np.searchsorted(LATENCY_BUCKETS_MS, ms))
+        bins = np.bincount(
+            np.minimum((np.asarray(probs) * PROBABILITY_BINS).astype(np.intp), PROBABILITY_BINS - 1),
+            minlength=PROBABILITY_BINS,
+        )
+        with self._lock:
+            self.calls += 1
+            self.rows += len(probs)
+            self._latency_buckets[bucket] += 1
+            self._latency_total += ms
+            self._prob_bins += bins
+            self._prob_total += float(np.sum(probs))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            latency = {f"le_{b}ms": n for b, n in zip(LATENCY_BUCKETS_MS, self._latency_buckets)}
+            latency[f"gt_{LATENCY_BUCKETS_MS[-1]}ms"] = self._latency_buckets[-1]
+            return {
+                "calls": self.calls,
+                "rows": self.rows,
+                "latency_ms_mean": round(self._latency_total / self.calls, 3) if self.calls else None,
+                "latency_ms_buckets": latency,
+                "probability_mean": round(self._prob_total / self.rows, 4) if self.rows else None,
+                "probability_histogram": self._prob_bins.tolist(),
+            }
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """One loaded model bundle."""
+
+    name: str
+    path: str
+    scorer: CongestionScorer
+    file_stamp: Tuple[float, int]
+    loaded_at: float
+    generation: int
+
+    @property
+    def model(self):
+        return self.scorer.model
+
+    @property
+    def features(self) -> List[str]:
+        return self.scorer.features
+
+
+class _Entry:
+    def __init__(self, name: str, path: str, features_path: Optional[str]) -> None:
+        self.name = name
+        self.path = path
+        self.features_path = features_path
+        self.version: Optional[ModelVersion] = None
+        self.lock = threading.Lock()
+        self.last_check = 0.0
+        self.reloading = False
+        self.failed_stamp: Optional[Tuple[float, int]] = None
+        self.last_error: Optional[str] = None
+        self.generation = 0
+
+
+def _file_stamp(path: str) -> Tuple[float, int]:
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+
+class ModelRegistry:
+    """Named model versions with lazy loading, hot swap and shadow scoring."""
+
+    def __init__(
+        self,
+        factory: ScorerFactory,
+        mmap: bool = False,
+        check_interval: float = 30.0,
+        retire_after: float = 60.0,
+        shadow_queue: int = 256,
+        profile: Optional[StartupProfile] = None,
+    ) -> None:
+        self._factory = factory
+        self.mmap = mmap
+        # Model loads before ``profile.ready()`` are timed as start-up phases.
+        self.profile = profile
+        self.check_interval = float(check_interval)
+        self.retire_after = float(retire_after)
+        self._entries: Dict[str, _Entry] = {}
+        self._metrics: Dict[str, ModelMetrics] = {}
+        self._active: Optional[str] = None
+
+        self._shadow: Optional[str] = None
+        self._shadow_fraction = 0.0
+        self._shadow_queue: "queue.Queue" = queue.Queue(maxsize=shadow_queue)
+        self._shadow_thread: Optional[threading.Thread] = None
+        self._shadow_pid: Optional[int] = None
+        self._shadow_lock = threading.Lock()
+        self._shadow_counts = {"scored": 0, "dropped": 0, "failed": 0}
+        self._shadow_agree = 0
+        self._shadow_abs_diff = 0.0
+        self._shadow_rows = 0
+
+    # ------------------------------------------------------------------
+    def register(self, name: str, path: str, features_path: Optional[str] = None) -> None:
+        """Declare a version; it is loaded the first time it is used.
+
+        ``features_path`` is for bare estimators saved next to a separate
+        feature-list file, rather than as a ``{"model", "features"}`` bundle.
+        """
+
+        self._entries[name] = _Entry(name, path, features_path)
+        self._metrics.setdefault(name, ModelMetrics())
+        if self._active is None:
+            self._active = name
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    @property
+    def active_name(self) -> Optional[str]:
+        return self._active
+
+    def set_active(self, name: str) -> None:
+        if name not in self._entries:
+            raise KeyError(f"unknown model version {name!r}")
+        self._active = name
+
+    def set_shadow(self, name: Optional[str], percent: float = 0.0) -> None:
+        """Shadow-score ``percent`` of request traffic on ``name`` (``None`` disables)."""
+
+        if name is not None and name not in self._entries:
+            raise KeyError(f"unknown model version {name!r}")
+        self._shadow = name
+        self._shadow_fraction = min(max(float(percent), 0.0), 100.0) / 100.0
+
+    def get(self, name: str) -> Optional[ModelVersion]:
+        """Return the loaded version, loading it now if it never was.
+
+        Returns ``None`` if the version cannot be loaded.
+        """
+
+        entry = self._entries[name]
+        version = entry.version
+        now = time.monotonic()
+        if version is None:
+            with entry.lock:
+                # A version that failed to load is retried once per interval.
+                if entry.version is None and (
+                    entry.last_error is None or now - entry.last_check >= self.check_interval
+                ):
+                    entry.last_check = now
+                    self._load(entry)
+                return entry.version
+
+        if now - entry.last_check >= self.check_interval:
+            entry.last_check = now
+            self._maybe_reload(entry)
+        return version
+
+    def active(self) -> Optional[ModelVersion]:
+        return self.get(self._active) if self._active is not None else None
+
+    # ------------------------------------------------------------------
+    def score(self, rows: Iterable[Mapping[str, float]]) -> np.ndarray:
+        """Score request rows on the active version (raises if none is loaded)."""
+
+        version = self._require_active()
+        return self._score_request(version, version.scorer.matrix(rows))
+
+    def score_matrix(self, X: np.ndarray, version: Optional[ModelVersion] = None) -> np.ndarray:
+        """Score a request's feature matrix on ``version`` (default: active)."""
+
+        return self._score_request(version or self._require_active(), X)
+
+    def score_bulk(self, X: np.ndarray, version: Optional[ModelVersion] = None) -> np.ndarray:
+        """Score a large matrix on ``version`` (default: active), bypassing the batcher.
+
+        Each call stands for many requests' rows, so the shadow model scores
+        a ``percent`` sample of its rows rather than all or none of them.
+        """
+
+        return self._score_request(version or self._require_active(), X, bulk=True)
+
+    def stats(self) -> Dict[str, object]:
+        versions = {}
+        for name, entry in self._entries.items():
+            version = entry.version
+            versions[name] = {
+                "path": entry.path,
+                "loaded": version is not None,
+                "generation": version.generation if version is not None else 0,
+                "loaded_at": version.loaded_at if version is not None else None,
+                "predictor": version.scorer.stats().get("predictor") if version is not None else None,
+                "last_error": entry.last_error,
+                "metrics": self._metrics[name].snapshot(),
+            }
+        shadow_rows = self._shadow_rows
+        return {
+            "active": self._active,
+            "versions": versions,
+            "shadow": {
+                "model": self._shadow,
+                "percent": self._shadow_fraction * 100.0,
+                **self._shadow_counts,
+                "mean_abs_diff": round(self._shadow_abs_diff / shadow_rows, 5) if shadow_rows else None,
+                # Share of rows on the same side of 0.5 as the active model.
+                "agreement": round(self._shadow_agree / shadow_rows, 4) if shadow_rows else None,
+            },
+        }
+
+    # ------------------------------------------------------------------
+    def _require_active(self) -> ModelVersion:
+        version = self.active()
+        if version is None:
+            raise RuntimeError("no model version is loaded")
+        return version
+
+    def _score_request(self, version: ModelVersion, X: np.ndarray, bulk: bool = False) -> np.ndarray:
+        t0 = time.perf_counter()
+        probs = version.scorer.score_bulk(X) if bulk else version.scorer.score_matrix(X)
+        self._metrics[version.name].observe(time.perf_counter() - t0, probs)
+
+        shadow = self._shadow
+        if shadow is None or shadow == version.name or not self._shadow_fraction:
+            return probs
+        if bulk:
+            sample = np.flatnonzero(np.random.random(len(probs)) < self._shadow_fraction)
+            if len(sample):
+                self._enqueue_shadow(shadow, version.features, np.asarray(X)[sample], probs[sample])
+        elif random.random() < self._shadow_fraction:
+            self._enqueue_shadow(shadow, version.features, X, probs)
+        return probs
+
+    def _load(self, entry: _Entry) -> None:
+        stamp = None
+        try:
+            stamp = _file_stamp(entry.path)
+            profile = self.profile if self.profile is not None and not self.profile.finished else None
+            bundle = load_model_bundle(entry.path, mmap=self.mmap, profile=profile)
+            if entry.features_path is not None:
+                import joblib
+
+                model, features = bundle, list(joblib.load(entry.features_path))
+            else:
+                model, features = bundle["model"], list(bundle["features"])
+            scorer = self._factory(model, features)
+        except Exception as exc:
+            entry.failed_stamp = stamp
+            entry.last_error = f"{type(exc).__name__}: {exc}"
+            logger.error("Could not load model %s from %s: %s", entry.name, entry.path, exc)
+            return
+
+        entry.generation += 1
+        old = entry.version
+        entry.version = ModelVersion(
+            name=entry.name,
+            path=entry.path,
+            scorer=scorer,
+            file_stamp=stamp,
+            loaded_at=time.time(),
+            generation=entry.generation,
+        )
+        entry.failed_stamp = None
+        entry.last_error = None
+        entry.last_check = time.monotonic()
+        if old is not None:
+            logger.info("Model %s reloaded (generation %d)", entry.name, entry.generation)
+            self._retire(old)
+
+    def _maybe_reload(self, entry: _Entry) -> None:
+        try:
+            stamp = _file_stamp(entry.path)
+        except OSError:
+            return
+        version = entry.version
+        if version is None or stamp == version.file_stamp or stamp == entry.failed_stamp:
+            return
+        with entry.lock:
+            if entry.reloading:
+                return
+            entry.reloading = True
+
+        def reload() -> None:
+            # ``reloading`` admits one reloader; readers never wait on it.
+            try:
+                self._load(entry)
+            finally:
+                entry.reloading = False
+
+        threading.Thread(target=reload, name=f"model-reload-{entry.name}", daemon=True).start()
+
+    def _retire(self, version: ModelVersion) -> None:
+        # Requests that picked up the old version may still submit to its
+        # micro-batcher for a moment; stop it once they have drained.
+        batcher = version.scorer.batcher
+        if batcher is not None:
+            timer = threading.Timer(self.retire_after, batcher.stop)
+            timer.daemon = True
+            timer.start()
+
+    # ------------------------------------------------------------------
+    def _enqueue_shadow(self, name: str, features: List[str], X: np.ndarray, probs: np.ndarray) -> None:
+        self._ensure_shadow_worker()
+        try:
+            self._shadow_queue.put_nowait((name, features, X, probs))
+        except queue.Full:
+            self._shadow_counts["dropped"] += 1
+
+    def _ensure_shadow_worker(self) -> None:
+        pid = os.getpid()
+        if self._shadow_thread is not None and self._shadow_thread.is_alive() and self._shadow_pid == pid:
+            return
+        with self._shadow_lock:
+            if self._shadow_thread is not None and self._shadow_thread.is_alive() and self._shadow_pid == pid:
+                return
+            self._shadow_thread = threading.Thread(target=self._shadow_loop, name="model-shadow", daemon=True)
+            self._shadow_pid = pid
+            self._shadow_thread.start()
+
+    def _shadow_loop(self) -> None:
+        while True:
+            name, features, X, primary = self._shadow_queue.get()
+            try:
+                version = self.get(name)
+                if version is None:
+                    raise RuntimeError(f"shadow model {name} is not loaded")
+                if version.features != features:
+                    X = X[:, [features.index(f) for f in version.features]]
+                t0 = time.perf_counter()
+                # Straight to the model: the shadow must not share a batcher
+                # with request traffic.
+                probs = version.scorer.score_bulk(X)
+                self._metrics[name].observe(time.perf_counter() - t0, probs)
+                self._shadow_counts["scored"] += 1
+                self._shadow_rows += len(probs)
+                self._shadow_abs_diff += float(np.sum(np.abs(probs - primary)))
+                self._shadow_agree += int(np.sum((probs >= 0.5) == (primary >= 0.5)))
+            except Exception as exc:
+                self._shadow_counts["failed"] += 1
+                logger.warning("Shadow scoring on %s failed: %s", name, exc)
+
+
+__all__ = ["ModelMetrics", "ModelRegistry", "ModelVersion"]
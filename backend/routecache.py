@@ -0,0 +1,113 @@
+"""OSRM route cache keyed on grid-snapped origin/destination cells.
+
+Routes between popular places are stable for hours, yet every request made a
+blocking call to the public OSRM server.  ``RouteCache`` snaps the origin and
+destination onto a grid of ``cell_m`` metre cells and caches the routes found
+for that cell pair with LRU eviction and a TTL.  Concurrent misses for the same
+key are collapsed into a single upstream call.
+
+Geometries are stored as compact float64 coordinate arrays rather than nested
+Python lists, and expanded back into GeoJSON-style lists on the way out.
+"""
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import SingleFlight, TTLCache
+
+Route = Dict[str, object]
+RouteFetcher = Callable[[float, float, float, float], Optional[List[Route]]]
+
+_M_PER_DEG_LAT = 110_574.0
+_M_PER_DEG_LON = 111_320.0 * math.cos(math.radians(1.35))
+
+
+class RouteCache:
+    """LRU/TTL cache of OSRM results with single-flight deduplication."""
+
+    def __init__(self, cell_m: float = 50.0, maxsize: int = 512, ttl: float = 6 * 3600.0) -> None:
+        self.cell_m = float(cell_m)
+        self._lat_step = self.cell_m / _M_PER_DEG_LAT
+        self._lon_step = self.cell_m / _M_PER_DEG_LON
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._flights = SingleFlight()
+        self.upstream_calls = 0
+
+    def key(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> Tuple[int, int, int, int]:
+        """Grid cells of the origin and destination."""
+
+        return (
+            math.floor(start_lat / self._lat_step),
+            math.floor(start_lon / self._lon_step),
+            math.floor(end_lat / self._lat_step),
+            math.floor(end_lon / self._lon_step),
+        )
+
+    def get_routes(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float,
+        fetch: RouteFetcher,
+    ) -> Optional[List[Route]]:
+        """Return cached routes for the cell pair, calling ``fetch`` on a miss.
+
+        Empty or failed results are not cached.
+        """
+
+        key = self.key(start_lat, start_lon, end_lat, end_lon)
+        compact = self._cache.get(key)
+        if compact is None:
+            compact = self._flights.do(
+                key, lambda: self._fetch(key, fetch, start_lat, start_lon, end_lat, end_lon)
+            )
+        if compact is None:
+            return None
+        return [self._expand(route) for route in compact]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self._cache.stats(),
+            "cell_m": self.cell_m,
+            "upstream_calls": self.upstream_calls,
+            "deduplicated": self._flights.shared,
+        }
+
+    # ------------------------------------------------------------------
+    def _fetch(self, key, fetch: RouteFetcher, *coords: float):
+        # A previous leader may have filled the entry just before we started.
+        compact = self._cache.get(key)
+        if compact is not None:
+            return compact
+
+        self.upstream_calls += 1
+        routes = fetch(*coords)
+        if not routes:
+            return None
+
+        compact = tuple(
+            (
+                np.asarray(route["coordinates"], dtype=np.float64),
+                float(route["distance"]),
+                float(route["duration"]),
+            )
+            for route in routes
+        )
+        self._cache.set(key, compact)
+        return compact
+
+    @staticmethod
+    def _expand(route) -> Route:
+        coords, distance, duration = route
+        return {
+            "coordinates": coords.tolist(),
+            "distance": distance,
+            "duration": duration,
+        }
+
+
+__all__ = ["RouteCache"]
@@ -0,0 +1,244 @@
+"""Process-wide cache of the LTA TrafficSpeedBands table.
+
+DataMall only republishes speed bands roughly every five minutes, so there is
+no point downloading and rebuilding the table on every request.  The
+``SpeedBandStore`` keeps the most recent snapshot in memory, refreshes it from
+a background thread on the LTA cadence and swaps new snapshots in atomically.
+When a refresh fails the previous snapshot keeps being served
+(stale-while-revalidate) until it exceeds ``max_stale`` seconds.
+
+Artefacts that only depend on the table (spatial indexes, precomputed
+aggregates) can be registered with ``register_derived``; they are built once
+per snapshot by whichever thread performs the refresh, before the swap.
+``rebuild_derived`` builds one of them again for the current snapshot when
+something else it depends on (such as the model) has changed.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from .speedtable import SpeedBandTable
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[], Optional[SpeedBandTable]]
+Deriver = Callable[[SpeedBandTable], Any]
+
+
+@dataclass(frozen=True)
+class SpeedBandSnapshot:
+    """An immutable speed-band table together with the time it was fetched."""
+
+    table: SpeedBandTable
+    fetched_at: float
+    derived: Mapping[str, Any] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        """Seconds elapsed since the snapshot was fetched."""
+
+        return max(time.time() - self.fetched_at, 0.0)
+
+    @property
+    def empty(self) -> bool:
+        return self.table.empty
+
+
+class SpeedBandStore:
+    """Background-refreshed holder for the latest speed-band snapshot."""
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        refresh_interval: float = 300.0,
+        retry_interval: float = 30.0,
+        max_stale: float = 1800.0,
+    ) -> None:
+        self._fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.max_stale = max_stale
+
+        self._snapshot: Optional[SpeedBandSnapshot] = None
+        self._derivers: Dict[str, Deriver] = {}
+        self._fetch_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+        self._last_attempt: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._consecutive_failures = 0
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start the refresher thread if it is not running in this process.
+
+        The thread is (re)started lazily so that forked server workers each get
+        their own refresher instead of inheriting a dead thread handle.
+        """
+
+        with self._start_lock:
+            pid = os.getpid()
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == pid:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="speedband-refresher", daemon=True
+            )
+            self._thread_pid = pid
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Signal the refresher thread to exit and wait for it."""
+
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def register_derived(self, name: str, builder: Deriver) -> None:
+        """Build ``builder(table)`` for every new snapshot as ``derived[name]``.
+
+        A builder that raises is logged and simply left out of ``derived``;
+        it never prevents the snapshot itself from being published.
+        """
+
+        self._derivers[name] = builder
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Optional[SpeedBandSnapshot]:
+        """Return the current snapshot, fetching synchronously on first use.
+
+        Returns ``None`` when no usable snapshot exists, either because nothing
+        has been fetched yet or because the last good one is older than
+        ``max_stale``.
+        """
+
+        self.start()
+        if self._snapshot is None:
+            with self._fetch_lock:
+                # Another request may have completed the first fetch while we
+                # were waiting for the lock.
+                if self._snapshot is None:
+                    self._refresh_locked()
+
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age > self.max_stale:
+            return None
+        return snapshot
+
+    def table(self) -> Optional[SpeedBandTable]:
+        """Return the current speed-band table, or ``None``."""
+
+        snapshot = self.snapshot()
+        return snapshot.table if snapshot is not None else None
+
+    def refresh(self) -> bool:
+        """Fetch a fresh table now; returns ``True`` if it was swapped in."""
+
+        with self._fetch_lock:
+            return self._refresh_locked()
+
+    def rebuild_derived(self, name: str) -> bool:
+        """Build ``derived[name]`` again for the current snapshot.
+
+        The snapshot is swapped for a copy carrying the new value, so readers
+        never see it change.  Returns ``False`` if there is no snapshot or
+        the builder raised; the old value is then kept.
+        """
+
+        with self._fetch_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return False
+            try:
+                value = self._derivers[name](snapshot.table)
+            except Exception as exc:
+                logger.warning("Could not rebuild %s for speed-band snapshot: %s", name, exc)
+                return False
+            self._snapshot = replace(snapshot, derived={**snapshot.derived, name: value})
+            return True
+
+    def status(self) -> Dict[str, object]:
+        """Describe the cache state for health reporting."""
+
+        snapshot = self._snapshot
+        age = snapshot.age if snapshot is not None else None
+        return {
+            "rows": len(snapshot.table) if snapshot is not None else 0,
+            "memory_bytes": snapshot.table.memory_report()["total_bytes"] if snapshot is not None else 0,
+            "age_seconds": round(age, 1) if age is not None else None,
+            # Also stale once a refresh has failed: newer data exists upstream.
+            "stale": (
+                age is None
+                or self._consecutive_failures > 0
+                or age > self.refresh_interval + self.retry_interval
+            ),
+            "refresher_alive": self._thread is not None and self._thread.is_alive(),
+            "consecutive_failures": self._consecutive_failures,
+            "last_error": self._last_error,
+        }
+
+    # ------------------------------------------------------------------
+    def _refresh_locked(self) -> bool:
+        self._last_attempt = time.time()
+        try:
+            table = self._fetcher()
+        except Exception as exc:  # keep serving the previous snapshot
+            self._record_failure(str(exc))
+            return False
+
+        if table is None or table.empty:
+            self._record_failure("empty speed-band response")
+            return False
+
+        fetched_at = time.time()
+        derived: Dict[str, Any] = {}
+        for name, builder in self._derivers.items():
+            try:
+                derived[name] = builder(table)
+            except Exception as exc:
+                logger.warning("Could not build %s for speed-band snapshot: %s", name, exc)
+
+        # Single reference assignment, so readers see either the old or the
+        # new snapshot and never a partially built one.
+        self._snapshot = SpeedBandSnapshot(
+            table=table, fetched_at=fetched_at, derived=derived
+        )
+        self._consecutive_failures = 0
+        self._last_error = None
+        return True
+
+    def _record_failure(self, message: str) -> None:
+        self._consecutive_failures += 1
+        self._last_error = message
+        logger.warning("Speed-band refresh failed (%dx): %s", self._consecutive_failures, message)
+
+    def _due_in(self) -> float:
+        """Seconds until the next refresh attempt should happen."""
+
+        snapshot = self._snapshot
+        if snapshot is None or self._consecutive_failures:
+            if self._last_attempt is None:
+                return 0.0
+            return max(self.retry_interval - (time.time() - self._last_attempt), 0.0)
+        return max(self.refresh_interval - snapshot.age, 0.0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._stop.wait(self._due_in()):
+                break
+            with self._fetch_lock:
+                # A request thread may have refreshed while we were sleeping.
+                if self._due_in() <= 0:
+                    self._refresh_locked()
+
+
+__all__ = ["SpeedBandSnapshot", "SpeedBandStore"]
@@ -0,0 +1,307 @@
+"""Compact columnar representation of one TrafficSpeedBands snapshot.
+
+Building a DataFrame straight from the DataMall JSON keeps every string field
+(``RoadName``, ``RoadCategory``, ``Location``) as a Python object per row.
+It also broadcasts constant feature columns (``incident_count`` and friends)
+onto every link.
+``SpeedBandTable`` stores a snapshot as typed NumPy arrays instead:
+
+* int32 LinkIDs, float32 speeds and coordinates, int8 speed bands;
+* road names and categories dictionary-encoded (int codes plus one copy of
+  each distinct string);
+* snapshot-wide constants stored once, in ``constants``.
+
+``SpeedBandBuilder`` accumulates records one at a time into typed buffers, so
+a payload can be converted without holding an intermediate DataFrame.
+"""
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Feature columns backed by a per-link array; every other feature must be a
+# snapshot constant.
+_FEATURE_COLUMNS = {
+    "SpeedKMH_Est": "speed_est",
+    "MinimumSpeed": "min_speed",
+    "MaximumSpeed": "max_speed",
+}
+
+_ARRAY_FIELDS = (
+    "link_ids",
+    "speed_est",
+    "min_speed",
+    "max_speed",
+    "speed_band",
+    "start_lat",
+    "start_lon",
+    "end_lat",
+    "end_lon",
+    "road_name_codes",
+    "road_category_codes",
+)
+
+# DataMall reports speeds up to 999 for the open-ended top band.
+MAX_SPEED_KMH = 120.0
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class _Dictionary:
+    """Incremental string -> code encoder; ``None`` is encoded as -1."""
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SpeedBandTable:
+    """Typed, array-backed speed-band snapshot.
+
+    Missing road names and categories have code ``-1``.  Missing numbers are
+    NaN, or ``-1`` for ``speed_band``.
+    """
+
+    def __init__(
+        self,
+        link_ids: np.ndarray,
+        speed_est: np.ndarray,
+        min_speed: np.ndarray,
+        max_speed: np.ndarray,
+        speed_band: np.ndarray,
+        start_lat: np.ndarray,
+        start_lon: np.ndarray,
+        end_lat: np.ndarray,
+        end_lon: np.ndarray,
+        road_name_codes: np.ndarray,
+        road_names: Sequence[str],
+        road_category_codes: np.ndarray,
+        road_categories: Sequence[str],
+        constants: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        ids = np.asarray(link_ids, dtype=np.int64)
+        fits = len(ids) == 0 or (ids.min() >= 0 and ids.max() <= _INT32_MAX)
+        self.link_ids = ids.astype(np.int32) if fits else ids
+        self.speed_est = np.asarray(speed_est, dtype=np.float32)
+        self.min_speed = np.asarray(min_speed, dtype=np.float32)
+        self.max_speed = np.asarray(max_speed, dtype=np.float32)
+        self.speed_band = np.asarray(speed_band, dtype=np.int8)
+        self.start_lat = np.asarray(start_lat, dtype=np.float32)
+        self.start_lon = np.asarray(start_lon, dtype=np.float32)
+        self.end_lat = np.asarray(end_lat, dtype=np.float32)
+        self.end_lon = np.asarray(end_lon, dtype=np.float32)
+        self.road_name_codes = np.asarray(road_name_codes, dtype=np.int32)
+        self.road_names = tuple(road_names)
+        self.road_category_codes = np.asarray(road_category_codes, dtype=np.int16)
+        self.road_categories = tuple(road_categories)
+        self.constants: Dict[str, float] = dict(constants or {})
+
+        n = len(self.link_ids)
+        for name in _ARRAY_FIELDS:
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"column {name} has {len(getattr(self, name))} rows, expected {n}")
+
+        self._order = np.argsort(self.link_ids, kind="stable")
+        self._sorted_ids = self.link_ids[self._order]
+
+    def __len__(self) -> int:
+        return len(self.link_ids)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.link_ids) == 0
+
+    # ------------------------------------------------------------------
+    def rows(self, link_ids: Sequence) -> np.ndarray:
+        """Row positions of the given LinkIDs; unknown IDs are dropped."""
+
+        if len(link_ids) == 0 or self.empty:
+            return np.empty(0, dtype=np.int64)
+        query = np.asarray(link_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._sorted_ids, query), len(self._sorted_ids) - 1)
+        found = self._sorted_ids[pos] == query
+        return self._order[pos[found]]
+
+    def feature_matrix(self, features: Sequence[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """``(n_rows, n_features)`` float64 model input in ``features`` order."""
+
+        n = len(self) if rows is None else len(rows)
+        X = np.empty((n, len(features)), dtype=np.float64)
+        for j, name in enumerate(features):
+            attr = _FEATURE_COLUMNS.get(name)
+            if attr is not None:
+                values = getattr(self, attr)
+                X[:, j] = values if rows is None else values[rows]
+            elif name in self.constants:
+                X[:, j] = self.constants[name]
+            else:
+                raise KeyError(f"unknown feature {name!r}")
+        return X
+
+    @staticmethod
+    def _decode(codes: np.ndarray, values: Tuple[str, ...], missing) -> np.ndarray:
+        lookup = np.array(values + (missing,), dtype=object)
+        # Code -1 picks the trailing ``missing`` entry.
+        return lookup[codes]
+
+    def road_name_array(self, missing=None) -> np.ndarray:
+        return self._decode(self.road_name_codes, self.road_names, missing)
+
+    def road_category_array(self, missing=None) -> np.ndarray:
+        return self._decode(self.road_category_codes, self.road_categories, missing)
+
+    def to_frame(self) -> "pd.DataFrame":
+        """Expand into the original DataFrame layout (debugging and export)."""
+
+        import pandas as pd
+
+        n = len(self)
+        frame = pd.DataFrame({
+            "LinkID": self.link_ids,
+            "RoadName": pd.Categorical.from_codes(self.road_name_codes, list(self.road_names)),
+            "RoadCategory": pd.Categorical.from_codes(self.road_category_codes, list(self.road_categories)),
+            "SpeedBand": self.speed_band,
+            "MinimumSpeed": self.min_speed,
+            "MaximumSpeed": self.max_speed,
+            "StartLat": self.start_lat,
+            "StartLon": self.start_lon,
+            "EndLat": self.end_lat,
+            "EndLon": self.end_lon,
+            "SpeedKMH_Est": self.speed_est,
+        })
+        for name, value in self.constants.items():
+            frame[name] = np.full(n, value)
+        return frame
+
+    def memory_report(self) -> Dict[str, object]:
+        """Bytes held by the snapshot, per column and in total."""
+
+        columns = {name: int(getattr(self, name).nbytes) for name in _ARRAY_FIELDS}
+        dictionaries = {
+            "road_names": sum(sys.getsizeof(v) for v in self.road_names),
+            "road_categories": sum(sys.getsizeof(v) for v in self.road_categories),
+        }
+        index_bytes = int(self._order.nbytes + self._sorted_ids.nbytes)
+        return {
+            "rows": len(self),
+            "columns": columns,
+            "dictionaries": dictionaries,
+            "index_bytes": index_bytes,
+            "total_bytes": sum(columns.values()) + sum(dictionaries.values()) + index_bytes,
+        }
+
+
+class SpeedBandBuilder:
+    """Accumulates DataMall speed-band records into typed column buffers."""
+
+    def __init__(self) -> None:
+        self._ids = array("q")
+        self._min = array("f")
+        self._max = array("f")
+        self._band = array("f")
+        self._coords = tuple(array("f") for _ in range(4))
+        self._name_codes = array("i")
+        self._cat_codes = array("h")
+        self._names = _Dictionary()
+        self._cats = _Dictionary()
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, record: Mapping) -> None:
+        """Append one record; records without a numeric LinkID are skipped."""
+
+        try:
+            link_id = int(record["LinkID"])
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            return
+
+        get = record.get
+        if "StartLat" in record:
+            coords = (get("StartLat"), get("StartLon"), get("EndLat"), get("EndLon"))
+        else:
+            # Older payloads carry a single space-separated ``Location``.
+            coords = (str(get("Location") or "").split() + [None] * 4)[:4]
+
+        self._ids.append(link_id)
+        # Raw band limits; clamping and the estimate are vectorised in build().
+        self._min.append(_to_float(get("MinimumSpeed")))
+        self._max.append(_to_float(get("MaximumSpeed")))
+        self._band.append(_to_float(get("SpeedBand")))
+        for column, value in zip(self._coords, coords):
+            column.append(_to_float(value))
+        self._name_codes.append(self._names.encode(get("RoadName")))
+        self._cat_codes.append(self._cats.encode(get("RoadCategory")))
+
+    def extend(self, records: Iterable[Mapping]) -> None:
+        for record in records:
+            self.add(record)
+
+    def merge(self, other: "SpeedBandBuilder") -> None:
+        """Append every row of ``other``, re-encoding its dictionaries."""
+
+        self._ids.extend(other._ids)
+        self._min.extend(other._min)
+        self._max.extend(other._max)
+        self._band.extend(other._band)
+        for mine, theirs in zip(self._coords, other._coords):
+            mine.extend(theirs)
+        for codes, encoder, other_codes, other_encoder in (
+            (self._name_codes, self._names, other._name_codes, other._names),
+            (self._cat_codes, self._cats, other._cat_codes, other._cats),
+        ):
+            remap = [encoder.encode(value) for value in other_encoder.values]
+            codes.extend(remap[c] if c >= 0 else -1 for c in other_codes)
+        self.skipped += other.skipped
+
+    def build(self, constants: Optional[Mapping[str, float]] = None) -> SpeedBandTable:
+        def arr(buf, dtype):
+            return np.frombuffer(buf, dtype=dtype).copy() if len(buf) else np.empty(0, dtype=dtype)
+
+        start_lat, start_lon, end_lat, end_lon = (arr(c, np.float32) for c in self._coords)
+        lo, hi = arr(self._min, np.float32), arr(self._max, np.float32)
+        band = arr(self._band, np.float32)
+        band_ok = np.isfinite(band) & (band >= -128) & (band <= 127)
+        return SpeedBandTable(
+            link_ids=arr(self._ids, np.int64),
+            # The estimate uses the raw band limits; each is clamped separately.
+            speed_est=np.clip((lo + hi) / 2, 0.0, MAX_SPEED_KMH),
+            min_speed=np.clip(lo, 0.0, MAX_SPEED_KMH),
+            max_speed=np.clip(hi, 0.0, MAX_SPEED_KMH),
+            speed_band=np.where(band_ok, band, -1).astype(np.int8),
+            start_lat=start_lat,
+            start_lon=start_lon,
+            end_lat=end_lat,
+            end_lon=end_lon,
+            road_name_codes=arr(self._name_codes, np.int32),
+            road_names=self._names.values,
+            road_category_codes=arr(self._cat_codes, np.int16),
+            road_categories=self._cats.values,
+            constants=constants,
+        )
+
+
+__all__ = ["MAX_SPEED_KMH", "SpeedBandBuilder", "SpeedBandTable"]
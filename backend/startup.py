@@ -0,0 +1,96 @@
+"""Start-up instrumentation, model loading and warm-up for the backend.
+
+Under gunicorn with ``preload_app`` (see ``gunicorn.conf.py``), the app module,
+and so the model, is imported once in the master process.  Forked workers
+then share those pages copy-on-write instead of each unpickling the bundle
+again.  ``load_model_bundle`` can additionally memory-map the model's NumPy
+arrays (the tree node tables), so even the master only pages in what
+prediction touches.
+
+``StartupProfile`` records how long each phase took (imports, model load,
+warm-up) and which process did the work, for ``/health``.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+
+class StartupProfile:
+    """Wall-clock timings of the start-up phases of this process."""
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.pid = os.getpid()
+        self._phases: Dict[str, float] = {}
+        self._ready: Optional[float] = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self._phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def ready(self) -> None:
+        """Mark the end of module start-up (the app can take requests)."""
+
+        self._ready = time.perf_counter()
+
+    @property
+    def finished(self) -> bool:
+        """Whether :meth:`ready` was called; later work is not start-up."""
+
+        return self._ready is not None
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "phases": {name: round(seconds, 4) for name, seconds in self._phases.items()},
+            "ready_seconds": round(self._ready - self.started, 4) if self._ready is not None else None,
+            "loaded_in_pid": self.pid,
+            # True in a worker forked from a preloaded master.
+            "inherited": self.pid != os.getpid(),
+        }
+
+
+def load_model_bundle(path: str, mmap: bool = False, profile: Optional[StartupProfile] = None) -> dict:
+    """Load a ``{"model": ..., "features": [...]}`` joblib bundle.
+
+    With ``mmap`` the arrays inside the pickle are mapped read-only from the
+    file rather than copied into the heap.  The file must then not be
+    rewritten in place while the process runs; replace it atomically instead.
+    Given a ``profile``, importing the model's libraries and unpickling are
+    timed as separate phases.
+    """
+
+    profile = profile or StartupProfile()
+    with profile.phase("model_imports"):
+        import joblib
+        import sklearn.ensemble  # noqa: F401  (unpickling needs it anyway)
+    with profile.phase("model_unpickle"):
+        return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def warm_up(scorer, batch_sizes=(1, 64)) -> float:
+    """Run throwaway predictions so the first request skips lazy init.
+
+    Goes through ``score_bulk``, so no micro-batcher (or any other) thread is
+    started; that keeps it safe to call in a pre-fork master.  Returns the
+    seconds spent.
+    """
+
+    t0 = time.perf_counter()
+    for n in batch_sizes:
+        scorer.score_bulk(np.zeros((n, len(scorer.features)), dtype=np.float64))
+    return time.perf_counter() - t0
+
+
+__all__ = ["StartupProfile", "load_model_bundle", "warm_up"]
@@ -0,0 +1,231 @@
+"""Request ids, per-stage timings and Prometheus metrics for the backend.
+
+Each request gets an id, taken from an incoming ``X-Request-ID`` header or
+generated, and a ``RequestTimer``.  Both live in context variables.
+``UpstreamPool`` copies the context into its worker threads, so geocoding,
+routing and the speed-band fetch are attributed to the request that started
+them, and log records from those threads carry its id.
+
+``stage(name)`` times a block against the current request.  Every timed
+stage is observed into a histogram labelled by endpoint and stage; the
+request's totals are also returned in a ``Server-Timing`` header.
+``MetricsRegistry.render`` writes all histograms and counters in the
+Prometheus text exposition format for ``/metrics``.
+"""
+from __future__ import annotations
+
+import contextvars
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+_REQUEST_ID_OK = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+request_id_var: "contextvars.ContextVar[str]" = contextvars.ContextVar("request_id", default="-")
+_timer_var: "contextvars.ContextVar[Optional[RequestTimer]]" = contextvars.ContextVar("request_timer", default=None)
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Reuse a well-formed incoming id, otherwise generate one."""
+
+    if incoming and _REQUEST_ID_OK.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [
+        '%s="%s"' % (name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, like a Prometheus client's."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._lock = threading.Lock()
+        # Per label set: [count per bucket (non-cumulative) + overflow, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together for ``/metrics``."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimer:
+    """Stage timings of one request; safe to use from its upstream threads."""
+
+    def __init__(self, endpoint: str, histogram: Optional[Histogram] = None) -> None:
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self._histogram = histogram
+        self._lock = threading.Lock()
+        self._totals: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[stage] = self._totals.get(stage, 0.0) + seconds
+        if self._histogram is not None:
+            self._histogram.observe(seconds, endpoint=self.endpoint, stage=stage)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
+
+    def server_timing(self) -> str:
+        """Header value, e.g. ``geocode;dur=12.3, total;dur=80.1`` (milliseconds)."""
+
+        parts = [f"{name};dur={seconds * 1e3:.1f}" for name, seconds in self.totals().items()]
+        parts.append(f"total;dur={self.elapsed() * 1e3:.1f}")
+        return ", ".join(parts)
+
+
+def begin_request(timer: RequestTimer, request_id: str) -> Tuple[contextvars.Token, contextvars.Token]:
+    """Make ``timer`` and ``request_id`` current; returns tokens for ``end_request``."""
+
+    return _timer_var.set(timer), request_id_var.set(request_id)
+
+
+def end_request(tokens: Tuple[contextvars.Token, contextvars.Token]) -> None:
+    timer_token, id_token = tokens
+    _timer_var.reset(timer_token)
+    request_id_var.reset(id_token)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _timer_var.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block against the current request (no-op outside one)."""
+
+    timer = _timer_var.get()
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - t0)
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "RequestTimer",
+    "begin_request",
+    "current_timer",
+    "end_request",
+    "new_request_id",
+    "request_id_var",
+    "stage",
+]
@@ -0,0 +1,212 @@
+"""Compiled NumPy predictor for the bundled gradient-boosted congestion models.
+
+``HistGradientBoostingClassifier.predict_proba`` validates its input, sets up
+thread pools and dispatches per tree on every call.  For the handful of rows
+a request scores, that overhead is most of the latency.  ``CompiledForest``
+flattens the fitted trees once into contiguous node arrays:
+feature, threshold, left, right, value and missing-goes-left.  It then walks
+all trees for all rows together, one vectorised step per tree level.
+
+Leaves point back at themselves, so every lane can take exactly ``max_depth``
+steps without branching.  Leaf values are summed in the same order sklearn
+uses, which makes the probabilities identical to ``predict_proba``, not
+merely close.  ``verify`` checks this against the source model at start-up.
+
+Only numeric splits of binary classifiers are supported, which covers both
+bundled models.  ``from_sklearn`` raises ``ValueError`` for anything else.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from scipy.special import expit
+
+
+class CompiledForest:
+    """Flattened tree ensemble with a vectorised traversal."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        baseline: float,
+        max_depth: int,
+        n_features: int,
+    ) -> None:
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.baseline = float(baseline)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        # children[2 * i] / children[2 * i + 1] are the left / right child.
+        self._children = np.column_stack([self.left, self.right]).ravel()
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """Flatten a fitted binary ``HistGradientBoostingClassifier``."""
+
+        predictors = getattr(model, "_predictors", None)
+        if predictors is None or getattr(model, "n_trees_per_iteration_", None) != 1:
+            raise ValueError("only binary HistGradientBoostingClassifier models can be compiled")
+        if getattr(model, "_preprocessor", None) is not None:
+            raise ValueError("models with categorical preprocessing cannot be compiled")
+
+        parts: Dict[str, list] = {k: [] for k in ("feature", "threshold", "left", "right", "missing_left", "value")}
+        roots = []
+        offset = 0
+        max_depth = 0
+        for (predictor,) in predictors:
+            nodes = predictor.nodes
+            if nodes["is_categorical"].any():
+                raise ValueError("categorical splits cannot be compiled")
+            leaf = nodes["is_leaf"].astype(bool)
+            own = np.arange(offset, offset + len(nodes))
+            # Leaves loop onto themselves so extra steps are harmless.
+            parts["left"].append(np.where(leaf, own, nodes["left"].astype(np.intp) + offset))
+            parts["right"].append(np.where(leaf, own, nodes["right"].astype(np.intp) + offset))
+            parts["feature"].append(np.where(leaf, 0, nodes["feature_idx"]))
+            parts["threshold"].append(nodes["num_threshold"])
+            parts["missing_left"].append(nodes["missing_go_to_left"].astype(bool))
+            parts["value"].append(np.where(leaf, nodes["value"], 0.0))
+            roots.append(offset)
+            offset += len(nodes)
+            max_depth = max(max_depth, int(nodes["depth"].max()))
+
+        return cls(
+            roots=np.asarray(roots),
+            baseline=float(np.ravel(model._baseline_prediction)[0]),
+            max_depth=max_depth,
+            n_features=int(model.n_features_in_),
+            **{k: np.concatenate(v) for k, v in parts.items()},
+        )
+
+    # ------------------------------------------------------------------
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape ``(n_rows, n_trees)``."""
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} feature columns, got shape {X.shape}")
+        flat = X.ravel()
+        row_base = (np.arange(len(X), dtype=np.intp) * self.n_features)[:, None]
+
+        has_nan = bool(np.isnan(flat).any())
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = flat[row_base + self.feature[node]]
+            # NaN compares False, so it only needs fixing up when present.
+            go_right = x > self.threshold[node]
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.missing_left[node], go_right)
+            node = self._children[2 * node + go_right]
+        return node
+
+    def raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """Raw (log-odds) scores, summed tree by tree like sklearn does."""
+
+        values = self.value[self.leaves(X)]
+        # Cumulative sum along the trees is a strictly sequential addition,
+        # starting from the baseline, i.e. the order of sklearn's loop.
+        stacked = np.empty((values.shape[1] + 1, values.shape[0]), dtype=np.float64)
+        stacked[0] = self.baseline
+        stacked[1:] = values.T
+        return np.cumsum(stacked, axis=0)[-1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """P(class 1) per row."""
+
+        return expit(self.raw_predict(X))
+
+    def verify(self, model, X: Optional[np.ndarray] = None, atol: float = 1e-12, n_random: int = 512) -> float:
+        """Compare against ``model.predict_proba``; raise if they disagree.
+
+        Uses ``X`` when given, plus random rows drawn around the split
+        thresholds, with some NaNs so both missing-value paths are exercised.
+        Returns the largest absolute difference seen.
+        """
+
+        rng = np.random.default_rng(0)
+        lo = np.zeros(self.n_features)
+        hi = np.ones(self.n_features)
+        for j in range(self.n_features):
+            used = self.threshold[(self.feature == j) & (self.left != np.arange(self.n_nodes))]
+            used = used[np.isfinite(used)]
+            if len(used):
+                span = max(used.max() - used.min(), 1.0)
+                lo[j], hi[j] = used.min() - 0.1 * span, used.max() + 0.1 * span
+        sample = rng.uniform(lo, hi, size=(n_random, self.n_features))
+        sample[rng.random(sample.shape) < 0.02] = np.nan
+        if X is not None:
+            sample = np.vstack([np.asarray(X, dtype=np.float64), sample])
+
+        expected = model.predict_proba(sample)[:, 1]
+        got = self.predict_proba(sample)
+        diff = float(np.max(np.abs(expected - got))) if len(sample) else 0.0
+        if not diff <= atol:
+            raise AssertionError(f"compiled predictor differs from sklearn by {diff:g}")
+        return diff
+
+    # ------------------------------------------------------------------
+    def export(self, path: str) -> None:
+        """Write the node arrays to an ``.npz`` file."""
+
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            missing_left=self.missing_left,
+            value=self.value,
+            roots=self.roots,
+            meta=np.array([self.baseline, self.max_depth, self.n_features], dtype=np.float64),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path) as data:
+            baseline, max_depth, n_features = data["meta"]
+            return cls(
+                feature=data["feature"],
+                threshold=data["threshold"],
+                left=data["left"],
+                right=data["right"],
+                missing_left=data["missing_left"],
+                value=data["value"],
+                roots=data["roots"],
+                baseline=baseline,
+                max_depth=int(max_depth),
+                n_features=int(n_features),
+            )
+
+
+def compile_for(model, features: Sequence[str]) -> CompiledForest:
+    """Compile ``model`` and check it against sklearn for the ``features`` schema."""
+
+    forest = CompiledForest.from_sklearn(model)
+    if forest.n_features != len(features):
+        raise ValueError(f"model has {forest.n_features} features, schema has {len(features)}")
+    forest.verify(model)
+    return forest
+
+
+__all__ = ["CompiledForest", "compile_for"]
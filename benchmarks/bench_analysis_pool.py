@@ -0,0 +1,78 @@
+"""Benchmark batch incident analysis across worker counts.
+
+Scores the same synthetic incidents inline and with ``AnalysisPool`` at
+several worker counts and chunk sizes.  It reports incidents per second and
+the speed-up over inline analysis, and checks every result against inline.
+Scaling is bounded by the cores available; ``os.cpu_count()`` is printed.
+
+Run from the repository root::
+
+    python benchmarks/bench_analysis_pool.py [--incidents 50000]
+        [--workers 1,2,4] [--chunk-sizes 64,256,1024]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "admin-frontend"))
+
+from server.workers import AnalysisPool  # noqa: E402
+
+WORDS = (
+    "accident on pie towards changi exit 12 lane 2 blocked maybe see photo attached heavy slow "
+    "traffic jam near junction road lorry stalled i think km video"
+).split()
+
+
+def incidents(n, seed):
+    rnd = random.Random(seed)
+    return [
+        {
+            "description": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 80))),
+            "severity": rnd.choice(("low", "medium", "high")),
+            "tags": rnd.choice(("", "accident", "accident,verified")),
+            "reporter_reputation": round(rnd.random(), 2),
+        }
+        for _ in range(n)
+    ]
+
+
+def run(pool, items):
+    t0 = time.perf_counter()
+    results = list(pool.analyse_batch(items))
+    return results, len(items) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=50_000)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--chunk-sizes", default="64,256,1024")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    items = incidents(args.incidents, args.seed)
+    print(f"cpu_count={os.cpu_count()}  incidents={len(items)}")
+    reference, inline_rate = run(AnalysisPool(workers=0), items)
+    print(f"inline                     {inline_rate:9.0f} incidents/s")
+
+    for workers in (int(w) for w in args.workers.split(",") if w.strip()):
+        for chunk_size in (int(c) for c in args.chunk_sizes.split(",") if c.strip()):
+            pool = AnalysisPool(workers=workers, chunk_size=chunk_size)
+            try:
+                run(pool, items[: workers * chunk_size])  # start the workers
+                results, rate = run(pool, items)
+            finally:
+                pool.shutdown()
+            if results != reference:
+                raise AssertionError(f"workers={workers} chunk={chunk_size}: results differ from inline")
+            print(f"workers={workers:<2} chunk={chunk_size:<5}    {rate:9.0f} incidents/s  ({rate / inline_rate:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
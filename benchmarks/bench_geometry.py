@@ -0,0 +1,117 @@
+"""Benchmark compact route geometries in ``/predict`` responses.
+
+Builds OSRM-like routes: dense points along straight stretches and curves,
+with float noise.  For each ``geometry_format`` and ``simplify_m`` setting,
+it reports the JSON body size and the time to produce the geometries and
+serialise a three-route response.  It also reports the largest deviation
+of decoded points from the original route.
+
+Run from the repository root::
+
+    python benchmarks/bench_geometry.py [--points 3000] [--repeat 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.geometry import decode_polyline, format_geometry  # noqa: E402
+from backend.linkmatch import _project  # noqa: E402
+
+SETTINGS = [
+    ("geojson", 0.0),
+    ("geojson", 2.0),
+    ("geojson", 10.0),
+    ("polyline", 0.0),
+    ("polyline", 2.0),
+    ("polyline", 10.0),
+    ("polyline6", 2.0),
+]
+
+
+def synthetic_route(n_points, seed):
+    """Piecewise route of straights and gentle curves, ~10 m between points."""
+
+    rng = np.random.default_rng(seed)
+    heading = rng.uniform(0, 2 * np.pi)
+    turn = np.zeros(n_points)
+    i = 0
+    while i < n_points:
+        length = int(rng.integers(20, 200))
+        if rng.random() < 0.4:
+            turn[i:i + length] = rng.normal(0, 0.03)
+        i += length
+    headings = heading + np.cumsum(turn)
+    step_deg = 10.0 / 111_000
+    lon = 103.8 + np.cumsum(np.cos(headings)) * step_deg
+    lat = 1.33 + np.cumsum(np.sin(headings)) * step_deg
+    return np.column_stack([lon, lat]).round(6).tolist()
+
+
+def max_deviation_m(original, decoded):
+    """Largest distance from an original point to the nearest decoded vertex-to-vertex segment."""
+
+    o = np.asarray(original)
+    d = np.asarray(decoded)
+    ox, oy = _project(o[:, 1], o[:, 0])
+    dx, dy = _project(d[:, 1], d[:, 0])
+    worst = 0.0
+    for k in range(len(d) - 1):
+        ax, ay, bx, by = dx[k], dy[k], dx[k + 1], dy[k + 1]
+        sx, sy = bx - ax, by - ay
+        seg2 = sx * sx + sy * sy
+        # Points between the two vertices' nearest original indices.
+        lo = int(np.argmin((ox - ax) ** 2 + (oy - ay) ** 2))
+        hi = int(np.argmin((ox - bx) ** 2 + (oy - by) ** 2))
+        px, py = ox[lo:hi + 1], oy[lo:hi + 1]
+        t = np.clip(((px - ax) * sx + (py - ay) * sy) / seg2, 0, 1) if seg2 else 0.0
+        dist = np.hypot(px - (ax + t * sx), py - (ay + t * sy))
+        if len(dist):
+            worst = max(worst, float(dist.max()))
+    return worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    routes = [synthetic_route(args.points, seed) for seed in range(3)]
+    baseline_bytes = baseline_us = None
+    for fmt, tol in SETTINGS:
+        def build():
+            return json.dumps({
+                "best": {"route_coordinates": format_geometry(routes[0], fmt, tol)},
+                "alternatives": [{"route_coordinates": format_geometry(r, fmt, tol)} for r in routes[1:]],
+            })
+
+        body = build()
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            build()
+        us = (time.perf_counter() - t0) / args.repeat * 1e6
+
+        geometry = format_geometry(routes[0], fmt, tol)
+        if fmt == "geojson":
+            decoded = geometry
+        else:
+            decoded = decode_polyline(geometry, precision=6 if fmt == "polyline6" else 5)
+        if baseline_bytes is None:
+            baseline_bytes, baseline_us = len(body), us
+        print(
+            f"{fmt:<9} simplify={tol:>4g} m  points={len(decoded):>5}  bytes={len(body):>8}"
+            f" ({baseline_bytes / len(body):5.1f}x smaller)  build+dumps={us:9.1f} us"
+            f" ({baseline_us / us:5.1f}x faster)  max_dev={max_deviation_m(routes[0], decoded):.2f} m"
+        )
+
+
+if __name__ == "__main__":
+    main()
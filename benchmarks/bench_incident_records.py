@@ -0,0 +1,135 @@
+"""Benchmark the memory and throughput of the analyser's incident records.
+
+Builds synthetic incidents (100k by default) and measures:
+
+- the memory held by their ``NormalisedIncident`` and ``IncidentFeatures``
+  records, which use ``__slots__``, against the same values held as dicts
+  (how features were kept before), using ``tracemalloc``;
+- the time of each analysis stage per incident: normalising, feature
+  extraction, time-independent scoring, and assembling the response (where
+  features become a dict);
+- end-to-end ``analyse_batch`` throughput.
+
+Run from the repository root::
+
+    python benchmarks/bench_incident_records.py [--incidents 100000] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "admin-frontend"))
+
+from server.analyzer import AIReportAnalyzer, IncidentFeatures, NormalisedIncident  # noqa: E402
+
+WORDS = (
+    "accident on pie towards changi exit 12 lane 2 blocked maybe see photo attached heavy slow "
+    "traffic jam near junction road lorry stalled i think km video broad"
+).split()
+
+
+def incidents(n, seed):
+    rnd = random.Random(seed)
+    base = datetime.utcnow()
+    out = []
+    for _ in range(n):
+        incident = {
+            "description": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 60))),
+            "incidentType": rnd.choice(("accident", "roadwork", "breakdown")),
+            "severity": rnd.choice(("low", "medium", "high", "critical")),
+            "location": rnd.choice(("PIE", "CTE", "AYE", "")),
+            "tags": rnd.choice(("", "accident", "accident,verified")),
+            "photo_url": rnd.choice((None, "https://example.invalid/p.jpg")),
+        }
+        if rnd.random() < 0.7:
+            incident["reporter_reputation"] = round(rnd.random(), 2)
+        if rnd.random() < 0.8:
+            created = base - timedelta(minutes=rnd.randint(0, 3000))
+            incident["createdAt"] = created.strftime("%Y-%m-%dT%H:%M:%SZ")
+        out.append(incident)
+    return out
+
+
+def held_bytes(build):
+    """Bytes still allocated after ``build()``, while its result is alive."""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def best_us(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = incidents(args.incidents, args.seed)
+    analyzer = AIReportAnalyzer()
+    normalised = [analyzer._normalise(item) for item in raw]
+    features = [analyzer._extract_features(item) for item in normalised]
+    n = len(raw)
+
+    # Values are shared with the records above, so this measures only the
+    # containers: slots against per-record dicts.
+    incident_fields = NormalisedIncident.__slots__
+    rows = [
+        ("NormalisedIncident", lambda: [NormalisedIncident(*(getattr(r, f) for f in incident_fields)) for r in normalised],
+         lambda: [{f: getattr(r, f) for f in incident_fields} for r in normalised]),
+        ("IncidentFeatures", lambda: [IncidentFeatures(*(getattr(r, f) for f in IncidentFeatures.__slots__)) for r in features],
+         lambda: [r.as_dict() for r in features]),
+    ]
+    print(f"{n} incidents")
+    for name, as_records, as_dicts in rows:
+        slotted, dicts = held_bytes(as_records), held_bytes(as_dicts)
+        print(
+            f"  {name:<19} slots {slotted / n:6.0f} B/record   dict {dicts / n:6.0f} B/record"
+            f"   ({dicts / slotted:4.2f}x)   {slotted / 2**20:6.1f} MiB vs {dicts / 2**20:6.1f} MiB"
+        )
+
+    statics = [analyzer._score_static(f) for f in features]
+    stages = [
+        ("normalise", analyzer._normalise, raw),
+        ("extract features", analyzer._extract_features, normalised),
+        ("score (static)", analyzer._score_static, features),
+        ("assemble response", lambda s: analyzer._assemble(s, 2.5), statics),
+        ("feature_summary dict", lambda f: f.as_dict(2.5), features),
+    ]
+    for name, fn, items in stages:
+        print(f"  {name:<21} {best_us(fn, items, args.repeat):7.2f} us/incident")
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        for _ in analyzer.analyse_batch(raw):
+            pass
+        best = min(best, time.perf_counter() - t0)
+    print(f"  analyse_batch         {n / best:9.0f} incidents/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Microbenchmark JSON response encoding for both Flask apps.
+
+Times ``jsonify``-equivalent response building on representative payloads:
+- a ``/predict`` response with three full OSRM geometries;
+- a ``/forecast`` response;
+- a ``/current-congestion`` list;
+- an admin ``/ai-analysis`` result.
+
+Three encoders are compared: Flask's default provider (with payloads
+pre-coerced to Python types, as the handlers used to do), ``FastJSONProvider``
+on its stdlib fallback, and ``FastJSONProvider`` with orjson.  Outputs are
+checked to decode to the same value.
+
+Run from the repository root::
+
+    python benchmarks/bench_json.py [--points 3000] [--repeat 200]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "admin-frontend"))
+
+import backend.jsonprovider as jsonprovider  # noqa: E402
+from backend.jsonprovider import FastJSONProvider  # noqa: E402
+from server.analyzer import AIReportAnalyzer  # noqa: E402
+
+
+def predict_payload(points, rng):
+    def route(i):
+        lon = 103.8 + np.cumsum(rng.normal(0, 1e-4, points))
+        lat = 1.33 + np.cumsum(rng.normal(0, 1e-4, points))
+        return {
+            "route_id": f"route_{i}",
+            "route_name": f"Orchard Road → Marina Bay (Route {i + 1})",
+            "label": "🟡 Moderate Traffic",
+            "congestion_prob": np.round(rng.random(), 3),
+            "status": "clear",
+            "confidence": 0.835,
+            "duration_min": 14,
+            "distance_km": 6.2,
+            "link_ids_count": np.int64(rng.integers(20, 80)),
+            # OSRM geometry arrives as parsed JSON, i.e. Python floats.
+            "route_coordinates": np.column_stack([lon, lat]).round(6).tolist(),
+        }
+
+    routes = [route(i) for i in range(3)]
+    return {"best": routes[0], "alternatives": routes[1:], "total_routes": 3, "note": "Routes have similar congestion"}
+
+
+def forecast_payload(rng):
+    return {
+        "predictions": [
+            {"label": label, "congestion": int(c), "status": "Moderate"}
+            for label, c in zip(("Now", "+15m", "+30m", "+60m"), rng.integers(20, 80, 4))
+        ],
+        "trend": "Traffic conditions stable",
+        "avg_speed": np.nanmean(rng.uniform(10, 70, 40)),
+    }
+
+
+def congestion_payload(rng, k=50):
+    pct = np.sort(rng.integers(30, 100, k))[::-1]
+    return {
+        "roads": [{"name": f"ROAD {i}", "congestion": c, "speed": s}
+                  for i, (c, s) in enumerate(zip(pct.tolist(), rng.integers(5, 60, k).tolist()))],
+        "timestamp": "2026-10-17T08:00:00",
+    }
+
+
+def analysis_payload():
+    analysis = AIReportAnalyzer().analyse({
+        "description": "Accident on PIE towards Changi exit 12, lane 2 blocked, see photo attached",
+        "severity": "high",
+        "photo_url": "https://example.invalid/p.jpg",
+        "tags": "accident,verified",
+        "createdAt": "2026-10-17T07:30:00Z",
+        "reporter_reputation": 0.8,
+    })
+    return {"status": "success", "analysis": analysis}
+
+
+def coerce(obj):
+    """What handlers had to do for the default provider: NumPy -> Python."""
+
+    if isinstance(obj, dict):
+        return {k: coerce(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [coerce(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def time_us(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    payloads = {
+        "predict": predict_payload(args.points, rng),
+        "forecast": forecast_payload(rng),
+        "current-congestion": congestion_payload(rng),
+        "ai-analysis": analysis_payload(),
+    }
+
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    orjson_module = jsonprovider.orjson
+    print(f"orjson: {'installed' if orjson_module is not None else 'not installed'}")
+
+    with app.app_context():
+        for name, payload in payloads.items():
+            repeat = max(args.repeat // 20, 5) if name == "predict" else args.repeat
+            base = time_us(lambda: default.response(coerce(payload)), repeat)
+
+            jsonprovider.orjson = None
+            stdlib_body = fast.response(payload).get_data()
+            stdlib = time_us(lambda: fast.response(payload), repeat)
+            jsonprovider.orjson = orjson_module
+
+            line = (
+                f"{name:<19} bytes={len(stdlib_body):>8}  flask default+coerce={base:9.1f} us"
+                f"  fast(stdlib)={stdlib:9.1f} us"
+            )
+            if orjson_module is not None:
+                fast_body = fast.response(payload).get_data()
+                if fast.loads(fast_body) != fast.loads(stdlib_body):
+                    raise AssertionError(f"{name}: orjson and stdlib outputs differ")
+                fast_us = time_us(lambda: fast.response(payload), repeat)
+                line += f"  fast(orjson)={fast_us:9.1f} us  speedup={base / fast_us:5.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
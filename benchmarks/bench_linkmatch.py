@@ -0,0 +1,112 @@
+"""Benchmark route-to-LinkID matching against a synthetic island-sized network.
+
+Builds a directed grid road network of roughly 60k speed-band links over the
+Singapore bounding box, then times ``LinkIndex`` construction and matching of
+routes with different numbers of GeoJSON points.
+
+Run from the repository root::
+
+    python benchmarks/bench_linkmatch.py [--links 60000] [--repeat 200]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.linkmatch import LinkIndex  # noqa: E402
+
+LAT_MIN, LAT_MAX = 1.24, 1.46
+LON_MIN, LON_MAX = 103.62, 104.0
+
+
+def synthetic_network(target_links: int):
+    """Grid of two-way roads cut into equal links, ~``target_links`` in total."""
+
+    # Each grid line of n_cuts links contributes 2 * n_cuts directed links.
+    n_lines = max(int(np.sqrt(target_links / 8)), 2)
+    n_cuts = max(target_links // (4 * n_lines), 1)
+    lats = np.linspace(LAT_MIN, LAT_MAX, n_lines)
+    lons = np.linspace(LON_MIN, LON_MAX, n_lines)
+
+    starts, ends = [], []
+    t = np.linspace(0.0, 1.0, n_cuts + 1)
+    for lat in lats:  # east-west roads
+        lon_pts = LON_MIN + t * (LON_MAX - LON_MIN)
+        a = np.column_stack([np.full(n_cuts, lat), lon_pts[:-1]])
+        b = np.column_stack([np.full(n_cuts, lat), lon_pts[1:]])
+        starts += [a, b]
+        ends += [b, a]
+    for lon in lons:  # north-south roads
+        lat_pts = LAT_MIN + t * (LAT_MAX - LAT_MIN)
+        a = np.column_stack([lat_pts[:-1], np.full(n_cuts, lon)])
+        b = np.column_stack([lat_pts[1:], np.full(n_cuts, lon)])
+        starts += [a, b]
+        ends += [b, a]
+
+    start = np.vstack(starts)
+    end = np.vstack(ends)
+    link_ids = np.arange(100_000_000, 100_000_000 + len(start))
+    return link_ids, start, end, lats, lons
+
+
+def staircase_route(lats, lons, n_points: int, rng: np.random.Generator):
+    """A route alternating east and north legs along the grid, as [lon, lat]."""
+
+    i, j = rng.integers(0, len(lats) // 2), rng.integers(0, len(lons) // 2)
+    corners = [(lats[i], lons[j])]
+    while len(corners) < 6 and i + 1 < len(lats) and j + 1 < len(lons):
+        j += 1
+        corners.append((lats[i], lons[j]))
+        i += 1
+        corners.append((lats[i], lons[j]))
+
+    corners = np.array(corners)
+    per_leg = max(n_points // (len(corners) - 1), 2)
+    legs = [
+        np.linspace(corners[k], corners[k + 1], per_leg, endpoint=False)
+        for k in range(len(corners) - 1)
+    ]
+    pts = np.vstack(legs + [corners[-1:]])
+    return pts[:, ::-1].tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=60_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    link_ids, start, end, lats, lons = synthetic_network(args.links)
+    t0 = time.perf_counter()
+    index = LinkIndex(link_ids, start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+    build_ms = (time.perf_counter() - t0) * 1e3
+    print(f"links={len(index):,}  build={build_ms:.1f} ms")
+
+    rng = np.random.default_rng(7)
+    for n_points in (50, 500, 2_000, 5_000):
+        routes = [staircase_route(lats, lons, n_points, rng) for _ in range(args.repeat)]
+        index.match(routes[0])  # warm-up
+
+        timings = []
+        matched = 0
+        for route in routes:
+            t0 = time.perf_counter()
+            matched += len(index.match(route))
+            timings.append(time.perf_counter() - t0)
+
+        timings_us = np.array(timings) * 1e6
+        print(
+            f"points={n_points:>5}  p50={np.percentile(timings_us, 50):8.1f} us  "
+            f"p95={np.percentile(timings_us, 95):8.1f} us  "
+            f"avg_links={matched / len(routes):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Load-test the backend offline against local upstream stand-ins.
+
+Starts fake Nominatim, OSRM and DataMall servers (see ``upstreams.py``),
+launches the backend in a separate process pointed at them, and replays a
+weighted request mix at one or more concurrency levels.  Throughput and
+p50/p95/p99 latency are reported per endpoint and per mix entry, with the
+mean time of each backend stage scraped from ``/metrics``.
+
+The mix is JSONL, one request per line::
+
+    {"request_id": "...", "method": "POST", "path": "/predict", "weight": 4,
+     "body": {"from": "Orchard Road", "to": "Marina Bay"}}
+
+``{n}`` in a string is replaced by a random number on every request, to
+produce cache misses.  ``--output`` writes the results as JSON, and
+``--compare`` prints the change against an earlier results file.
+
+Run from the repository root::
+
+    python benchmarks/bench_load.py [--concurrency 1,8,32] [--duration 20]
+        [--server gunicorn --workers 2] [--upstream-latency nominatim=80,osrm=120,datamall=150]
+        [--output results.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from upstreams import FakeUpstreams, FixtureSet  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "request_mix.jsonl")
+STAGE_SAMPLE = re.compile(r'^backend_stage_duration_seconds_(sum|count)\{endpoint="([^"]*)",stage="([^"]*)"\} (\S+)$')
+
+
+def load_mix(path):
+    with open(path, encoding="utf-8") as fh:
+        entries = [json.loads(line) for line in fh if line.strip()]
+    if not entries:
+        raise SystemExit(f"{path} has no requests")
+    return entries
+
+
+def fill(value, rnd):
+    if isinstance(value, str):
+        return value.replace("{n}", str(rnd.randrange(1_000_000)))
+    if isinstance(value, dict):
+        return {k: fill(v, rnd) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill(v, rnd) for v in value]
+    return value
+
+
+def parse_latency(spec):
+    latency = {}
+    for part in filter(None, (spec or "").split(",")):
+        name, _, ms = part.partition("=")
+        latency[name.strip()] = float(ms)
+    return latency
+
+
+def start_backend(args, fakes, tmpdir):
+    port = args.port
+    env = dict(os.environ, **fakes.env())
+    env.update(
+        PORT=str(port),
+        GEOCODE_CACHE_PATH=os.path.join(tmpdir, "geocode.sqlite3"),
+        LOG_LEVEL=args.log_level,
+        WEB_CONCURRENCY=str(args.workers),
+    )
+    env.pop("GEOCODE_PREWARM_FILE", None)
+    if args.server == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "backend-app:app"]
+    else:
+        cmd = [sys.executable, "backend-app.py"]
+    log = open(os.path.join(tmpdir, "backend.log"), "wb")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"backend exited with {proc.returncode}; see {log.name}")
+        try:
+            if requests.get(base + "/health", timeout=1).status_code == 200:
+                return proc, base
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"backend did not become healthy within {args.startup_timeout:g}s")
+
+
+def run_level(base, mix, concurrency, duration, max_requests, seed):
+    weights = [float(e.get("weight", 1)) for e in mix]
+    samples = []  # (request_id, path, status, seconds)
+    lock = threading.Lock()
+    issued = [0]
+    stop_at = time.perf_counter() + duration
+
+    def worker(wid):
+        rnd = random.Random(seed * 1000 + wid)
+        session = requests.Session()
+        local = []
+        while time.perf_counter() < stop_at:
+            if max_requests:
+                with lock:
+                    if issued[0] >= max_requests:
+                        break
+                    issued[0] += 1
+            entry = rnd.choices(mix, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                resp = session.request(
+                    entry.get("method", "GET"), base + entry["path"],
+                    json=fill(entry.get("body"), rnd), params=fill(entry.get("query"), rnd), timeout=60,
+                )
+                status = resp.status_code
+            except requests.RequestException:
+                status = 0
+            local.append((entry.get("request_id", entry["path"]), entry["path"], status, time.perf_counter() - t0))
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples, elapsed):
+    if not samples:
+        return {"count": 0}
+    lat = np.array([s[3] for s in samples]) * 1e3
+    errors = sum(1 for s in samples if not 200 <= s[2] < 300)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "mean_ms": round(float(lat.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(lat.max()), 2),
+    }
+
+
+def scrape_stages(base):
+    """Per endpoint and stage: (sum, count) from the backend's /metrics."""
+
+    totals = defaultdict(lambda: [0.0, 0.0])
+    try:
+        text = requests.get(base + "/metrics", timeout=5).text
+    except requests.RequestException:
+        return totals
+    for line in text.splitlines():
+        m = STAGE_SAMPLE.match(line)
+        if m:
+            kind, endpoint, stage, value = m.groups()
+            totals[(endpoint, stage)][0 if kind == "sum" else 1] += float(value)
+    return totals
+
+
+def stage_means(before, after):
+    out = defaultdict(dict)
+    for key, (total, count) in after.items():
+        prev_total, prev_count = before.get(key, (0.0, 0.0))
+        if count > prev_count:
+            out[key[0]][key[1]] = round((total - prev_total) / (count - prev_count) * 1e3, 3)
+    return dict(out)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    old_levels = {lvl["concurrency"]: lvl for lvl in baseline.get("levels", [])}
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')})")
+    for level in results["levels"]:
+        old = old_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        for endpoint, new_stats in level["endpoints"].items():
+            old_stats = old["endpoints"].get(endpoint)
+            if not old_stats or not old_stats.get("count"):
+                continue
+            cells = []
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                a, b = old_stats[key], new_stats[key]
+                change = (b - a) / a * 100 if a else 0.0
+                cells.append(f"{key} {a:g}->{b:g} ({change:+.1f}%)")
+            print(f"  c={level['concurrency']:<3} {endpoint:<20} " + "  ".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per level")
+    parser.add_argument("--requests", type=int, default=0, help="cap on requests per level")
+    parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    parser.add_argument("--server", choices=("flask", "gunicorn"), default="flask")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--fixtures", help="directory with speedbands.json / places.json")
+    parser.add_argument("--links", type=int, default=20_000, help="size of the synthetic network")
+    parser.add_argument("--save-fixtures", help="write the fixtures used to this directory")
+    parser.add_argument("--upstream-latency", default="", help="e.g. nominatim=80,osrm=120,datamall=150 (ms)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    mix = load_mix(args.mix)
+    fixtures = FixtureSet.load(args.fixtures) if args.fixtures else FixtureSet.synthetic(args.links, args.seed)
+    if args.save_fixtures:
+        fixtures.save(args.save_fixtures)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "mix": os.path.relpath(args.mix, ROOT),
+            "server": args.server,
+            "workers": args.workers,
+            "duration_s": args.duration,
+            "links": len(fixtures.speedbands),
+            "upstream_latency_ms": parse_latency(args.upstream_latency),
+            "seed": args.seed,
+        },
+        "levels": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir, FakeUpstreams(fixtures, parse_latency(args.upstream_latency)) as fakes:
+        proc, base = start_backend(args, fakes, tmpdir)
+        try:
+            if args.warmup:
+                run_level(base, mix, 1, 3600.0, args.warmup, args.seed)
+            for concurrency in levels:
+                before = scrape_stages(base)
+                samples, elapsed = run_level(base, mix, concurrency, args.duration, args.requests, args.seed)
+                by_endpoint, by_entry = defaultdict(list), defaultdict(list)
+                for s in samples:
+                    by_endpoint[s[1]].append(s)
+                    by_entry[s[0]].append(s)
+                level = {
+                    "concurrency": concurrency,
+                    "elapsed_s": round(elapsed, 3),
+                    "overall": summarise(samples, elapsed),
+                    "endpoints": {k: summarise(v, elapsed) for k, v in sorted(by_endpoint.items())},
+                    "requests": {k: summarise(v, elapsed) for k, v in sorted(by_entry.items())},
+                    "stages_mean_ms": stage_means(before, scrape_stages(base)),
+                }
+                results["levels"].append(level)
+
+                o = level["overall"]
+                print(
+                    f"c={concurrency:<3} {o['count']:>6} req  {o['throughput_rps']:>8.1f} req/s  "
+                    f"p50 {o['p50_ms']:.1f} ms  p95 {o['p95_ms']:.1f} ms  p99 {o['p99_ms']:.1f} ms  errors {o['errors']}"
+                )
+                for endpoint, st in level["endpoints"].items():
+                    print(
+                        f"      {endpoint:<20} {st['count']:>6} req  p50 {st['p50_ms']:.1f}  "
+                        f"p95 {st['p95_ms']:.1f}  p99 {st['p99_ms']:.1f} ms  errors {st['errors']}"
+                    )
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        results["upstream_hits"] = dict(fakes.hits)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"wrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
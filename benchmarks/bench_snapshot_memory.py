@@ -0,0 +1,92 @@
+"""Compare speed-band snapshot memory: pandas DataFrame vs ``SpeedBandTable``.
+
+Generates DataMall-shaped records (string-typed numbers and coordinates,
+road names shared by runs of links), then reports the deep memory of the
+DataFrame the backend used to build and that of the columnar snapshot, plus
+the time to build each.
+
+Run from the repository root::
+
+    python benchmarks/bench_snapshot_memory.py [--links 60000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.speedtable import SpeedBandBuilder  # noqa: E402
+
+CONSTANTS = {"dow": 2, "hour": 8, "incident_count": 0, "vms_count": 0, "cctv_count": 36000, "ett_mean": 1.75}
+
+
+def synthetic_records(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    records = []
+    for i in range(n):
+        band = rnd.randint(1, 8)
+        lat, lon = 1.24 + rnd.random() * 0.22, 103.62 + rnd.random() * 0.38
+        records.append({
+            "LinkID": str(103_000_000 + i),
+            "RoadName": f"ROAD {i // 25}",
+            "RoadCategory": rnd.choice("ABCDEF"),
+            "SpeedBand": band,
+            "MinimumSpeed": str(band * 10 - 9),
+            "MaximumSpeed": str(band * 10 if band < 8 else 999),
+            "StartLon": f"{lon:.6f}",
+            "StartLat": f"{lat:.6f}",
+            "EndLon": f"{lon + 0.001:.6f}",
+            "EndLat": f"{lat + 0.001:.6f}",
+        })
+    return records
+
+
+def legacy_frame(records) -> pd.DataFrame:
+    """The DataFrame ``get_lta_traffic_speedbands`` used to return."""
+
+    df = pd.DataFrame(records)
+    for c in ["SpeedBand", "MinimumSpeed", "MaximumSpeed"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df["SpeedKMH_Est"] = ((df["MinimumSpeed"] + df["MaximumSpeed"]) / 2).clip(0, 120)
+    for name, value in CONSTANTS.items():
+        df[name] = value
+    df["MinimumSpeed"] = df["MinimumSpeed"].clip(0, 120)
+    df["MaximumSpeed"] = df["MaximumSpeed"].clip(0, 120)
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=60_000)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.links)
+
+    t0 = time.perf_counter()
+    frame = legacy_frame(records)
+    frame_s = time.perf_counter() - t0
+    frame_bytes = int(frame.memory_usage(deep=True).sum())
+
+    t0 = time.perf_counter()
+    builder = SpeedBandBuilder()
+    builder.extend(records)
+    table = builder.build(constants=CONSTANTS)
+    table_s = time.perf_counter() - t0
+    report = table.memory_report()
+
+    print(f"links={len(table)}")
+    print(f"DataFrame       {frame_bytes / 1e6:8.2f} MB  built in {frame_s * 1e3:7.1f} ms")
+    print(f"SpeedBandTable  {report['total_bytes'] / 1e6:8.2f} MB  built in {table_s * 1e3:7.1f} ms")
+    print(f"reduction       {frame_bytes / report['total_bytes']:8.1f}x")
+    for name, nbytes in sorted(report["columns"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<20} {nbytes / 1e3:9.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
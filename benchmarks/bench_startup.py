@@ -0,0 +1,90 @@
+"""Measure backend start-up: time from process spawn to the first prediction.
+
+Each run starts a fresh interpreter that imports ``backend-app.py`` (without
+serving), then scores one feature row the way ``/predict`` does.  Runs
+compare the default start-up against a memory-mapped model and against
+skipping the warm-up inference.  No upstream service is contacted.
+
+Run from the repository root::
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import importlib, json, os, sys, time
+sys.path.insert(0, os.getcwd())
+spawned = float(os.environ["BENCH_SPAWNED_AT"])
+interpreter_up = time.time()
+
+app = importlib.import_module("backend-app")
+imported = time.time()
+
+row = {name: 0.0 for name in app.model_registry.active().features}
+row.update(SpeedKMH_Est=45.0, MinimumSpeed=40.0, MaximumSpeed=49.0, hour=8, cctv_count=36000, ett_mean=1.75)
+t0 = time.perf_counter()
+app.model_registry.score([row])
+first_ms = (time.perf_counter() - t0) * 1e3
+done = time.time()
+
+print(json.dumps({
+    "interpreter_s": interpreter_up - spawned,
+    "import_app_s": imported - interpreter_up,
+    "first_predict_ms": first_ms,
+    "time_to_first_prediction_s": done - spawned,
+    "startup": app.startup.report(),
+}))
+"""
+
+CONFIGS = {
+    "default": {},
+    "mmap": {"MODEL_MMAP": "1"},
+    "no-warmup": {"STARTUP_WARMUP": "0"},
+}
+
+
+def run_once(extra_env, cache_dir):
+    env = dict(os.environ, **extra_env)
+    env["GEOCODE_CACHE_PATH"] = os.path.join(cache_dir, "geocode.sqlite3")
+    env.pop("GEOCODE_PREWARM_FILE", None)
+    env["BENCH_SPAWNED_AT"] = repr(time.time())
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, extra_env in CONFIGS.items():
+            results = [run_once(extra_env, cache_dir) for _ in range(args.runs)]
+            med = {
+                key: statistics.median(r[key] for r in results)
+                for key in ("interpreter_s", "import_app_s", "first_predict_ms", "time_to_first_prediction_s")
+            }
+            phases = results[-1]["startup"]["phases"]
+            print(
+                f"{name:<10} first prediction after {med['time_to_first_prediction_s']:.3f} s  "
+                f"(import app {med['import_app_s']:.3f} s, first predict {med['first_predict_ms']:.2f} ms)  "
+                + "  ".join(f"{k}={v:.3f}s" for k, v in phases.items())
+            )
+
+
+if __name__ == "__main__":
+    main()
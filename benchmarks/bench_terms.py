@@ -0,0 +1,134 @@
+"""Benchmark keyword counting in the admin incident analyser.
+
+Compares three ways of counting the analyser's uncertainty, media and
+concrete-detail terms:
+
+- the previous method, which lower-cases the text once per family and calls
+  ``str.count`` once per term;
+- ``TermMatcher()``, the substring matcher the analyser uses, which lowers
+  the text once and counts each distinct term once;
+- ``TermMatcher(whole_words=True)``, the optional whole-word matcher.
+
+The texts are synthetic descriptions, short and long, that mix terms with
+words containing them (``broad``, ``lanes``, ``imagery``).  The script reports
+the time per text, how often whole-word counts differ from substring counts,
+and ``analyse_batch`` throughput with each counter plugged in.
+
+Run from the repository root::
+
+    python benchmarks/bench_terms.py [--texts 2000] [--short-words 25]
+        [--long-words 1000] [--batch 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "admin-frontend"))
+
+import server.analyzer as analyzer  # noqa: E402
+from server.termmatch import TermMatcher  # noqa: E402
+
+FAMILIES = {
+    "uncertainty_terms": analyzer.UNCERTAINTY_TERMS,
+    "evidence_terms": analyzer.MEDIA_HINT_TERMS,
+    "concrete_terms": analyzer.CONCRETE_DETAIL_TERMS,
+}
+FILLER = (
+    "traffic jam near the accident on pie cte ecp heavy slow stalled vehicle car lorry bus motorcycle "
+    "broad roadside lanes exiting imagery kilometre streetlight bridges junctions at after before "
+    "left right shoulder police ambulance tow truck queue moving stopped since minutes ago"
+).split()
+TERMS = sorted(set().union(*FAMILIES.values()))
+
+
+class StrCountCounter:
+    """The analyser's previous term counting, behind ``TermMatcher.count``."""
+
+    @staticmethod
+    def _count_terms(text, terms):
+        lowered = text.lower()
+        return sum(lowered.count(term) for term in terms)
+
+    def count(self, text):
+        return tuple(self._count_terms(text, terms) for terms in FAMILIES.values())
+
+
+def description(rnd, n_words, term_rate=0.05):
+    words = [rnd.choice(TERMS) if rnd.random() < term_rate else rnd.choice(FILLER) for _ in range(n_words)]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + f", {rnd.randint(1, 40)} km."
+
+
+def time_per_text_us(counter, texts, repeat=5):
+    """Best of ``repeat`` passes over ``texts``, per text."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in texts:
+            counter.count(text)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(texts) * 1e6
+
+
+def batch_rate(counter, incidents):
+    original = analyzer.TERM_MATCHER
+    analyzer.TERM_MATCHER = counter
+    try:
+        engine = analyzer.AIReportAnalyzer()
+        t0 = time.perf_counter()
+        for _ in engine.analyse_batch(incidents):
+            pass
+        return len(incidents) / (time.perf_counter() - t0)
+    finally:
+        analyzer.TERM_MATCHER = original
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--short-words", type=int, default=25)
+    parser.add_argument("--long-words", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    counters = {
+        "str.count": StrCountCounter(),
+        "substring": TermMatcher(FAMILIES),
+        "whole-word": TermMatcher(FAMILIES, whole_words=True),
+    }
+
+    for label, n_words, n_texts in (
+        ("short", args.short_words, args.texts),
+        ("long", args.long_words, max(args.texts // 10, 20)),
+    ):
+        texts = [description(rnd, n_words) for _ in range(n_texts)]
+        substring = counters["substring"]
+        if any(substring.count(t) != counters["str.count"].count(t) for t in texts):
+            raise AssertionError("substring matcher disagrees with str.count")
+        differ = sum(counters["whole-word"].count(t) != substring.count(t) for t in texts)
+        base = None
+        cells = []
+        for name, counter in counters.items():
+            us = time_per_text_us(counter, texts)
+            base = base or us
+            cells.append(f"{name}={us:8.1f} us ({base / us:4.2f}x)")
+        print(f"{label:<5} {n_words:>5} words  " + "  ".join(cells) + f"  whole-word differs on {differ / len(texts):.0%}")
+
+    incidents = [
+        {"description": description(rnd, rnd.randint(5, 80)), "severity": rnd.choice(("low", "high"))}
+        for _ in range(args.batch)
+    ]
+    for name, counter in counters.items():
+        print(f"analyse_batch x{args.batch} with {name:<10} {batch_rate(counter, incidents):9.0f} incidents/s")
+
+
+if __name__ == "__main__":
+    main()
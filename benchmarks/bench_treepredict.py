@@ -0,0 +1,73 @@
+"""Benchmark the compiled tree predictor against sklearn's ``predict_proba``.
+
+Compiles a bundled model, checks parity on a large random sample (including
+missing values), then times single-row, 64-row and 1k-row batches for both
+predictors.  ``--export`` also writes the flattened node arrays to ``.npz``.
+
+Run from the repository root::
+
+    python benchmarks/bench_treepredict.py [--model congestion_model_2.pkl] [--export trees.npz]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.startup import load_model_bundle  # noqa: E402
+from backend.treepredict import CompiledForest  # noqa: E402
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def per_call_us(fn, X, repeat):
+    fn(X)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="congestion_model_2.pkl")
+    parser.add_argument("--parity-rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--export", help="write the compiled node arrays to this .npz path")
+    args = parser.parse_args()
+
+    model = load_model_bundle(args.model)["model"]
+    t0 = time.perf_counter()
+    forest = CompiledForest.from_sklearn(model)
+    compile_ms = (time.perf_counter() - t0) * 1e3
+    print(
+        f"{args.model}: {forest.n_trees} trees, {forest.n_nodes} nodes, depth {forest.max_depth}, "
+        f"compiled in {compile_ms:.1f} ms"
+    )
+
+    diff = forest.verify(model, n_random=args.parity_rows)
+    print(f"parity: max |sklearn - compiled| = {diff:g} over {args.parity_rows} rows")
+
+    if args.export:
+        forest.export(args.export)
+        reloaded = CompiledForest.load(args.export)
+        print(f"exported to {args.export} (reload parity: {reloaded.verify(model) == 0.0})")
+
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 100, size=(1000, forest.n_features))
+    sk = lambda A: model.predict_proba(A)[:, 1]  # noqa: E731
+    for n in (1, 64, 1000):
+        repeat = max(args.repeat // (1 + n // 64), 10)
+        a = per_call_us(sk, X[:n], repeat)
+        b = per_call_us(forest.predict_proba, X[:n], repeat)
+        print(f"rows={n:>5}  sklearn={a:9.1f} us  compiled={b:9.1f} us  speedup={a / b:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Local stand-ins for Nominatim, OSRM and DataMall, for offline benchmarks.
+
+``FixtureSet`` holds what the fakes serve:
+- the speed-band records DataMall returns, paged by ``$skip`` like the real API;
+- a place-name to coordinate table for Nominatim.
+
+OSRM answers with two routes between the grid points nearest to the
+endpoints, one going east-west first and the other north-south first.
+Both follow links from the speed-band fixture, so route matching in the
+backend finds real LinkIDs.
+
+Fixtures are synthetic by default: a grid of two-way roads over central
+Singapore, generated from a seed.  ``FixtureSet.save`` writes
+``speedbands.json`` and ``places.json``, and ``FixtureSet.load`` reads them
+back.  Captured DataMall pages (the concatenated ``value`` arrays) can be
+dropped into such a directory to replay real data instead.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+LAT_MIN, LAT_MAX = 1.27, 1.45
+LON_MIN, LON_MAX = 103.68, 103.98
+PAGE_SIZE = 500
+
+DEFAULT_PLACES = {
+    "Orchard Road": (1.3048, 103.8318),
+    "Marina Bay": (1.2834, 103.8607),
+    "Changi Business Park": (1.3345, 103.9633),
+    "Jurong East": (1.3331, 103.7422),
+    "Woodlands": (1.4360, 103.7865),
+    "Tampines": (1.3540, 103.9450),
+    "Bishan": (1.3508, 103.8485),
+    "Raffles Place": (1.2840, 103.8514),
+}
+
+
+class FixtureSet:
+    """Speed-band records and geocodes served by ``FakeUpstreams``."""
+
+    def __init__(self, speedbands: List[dict], places: Dict[str, Tuple[float, float]]) -> None:
+        self.speedbands = speedbands
+        self.places = {name.lower(): (float(lat), float(lon)) for name, (lat, lon) in places.items()}
+        self._grid = self._grid_axes(speedbands)
+
+    @classmethod
+    def synthetic(cls, links: int = 20_000, seed: int = 1) -> "FixtureSet":
+        """Grid network of about ``links`` directed links with random speed bands."""
+
+        n = max(int((links / 4) ** 0.5), 2)
+        lats = [LAT_MIN + (LAT_MAX - LAT_MIN) * i / (n - 1) for i in range(n)]
+        lons = [LON_MIN + (LON_MAX - LON_MIN) * j / (n - 1) for j in range(n)]
+        segments = []
+        for lat in lats:
+            for a, b in zip(lons, lons[1:]):
+                segments += [((lat, a), (lat, b)), ((lat, b), (lat, a))]
+        for lon in lons:
+            for a, b in zip(lats, lats[1:]):
+                segments += [((a, lon), (b, lon)), ((b, lon), (a, lon))]
+
+        rnd = random.Random(seed)
+        records = []
+        for i, (start, end) in enumerate(segments):
+            band = rnd.randint(1, 8)
+            records.append({
+                "LinkID": str(100000000 + i),
+                "RoadName": f"ROAD {i // 40}",
+                "RoadCategory": rnd.choice("ABCDE"),
+                "SpeedBand": band,
+                "MinimumSpeed": str(band * 10 - 9),
+                "MaximumSpeed": str(band * 10 if band < 8 else 999),
+                "StartLat": f"{start[0]:.6f}",
+                "StartLon": f"{start[1]:.6f}",
+                "EndLat": f"{end[0]:.6f}",
+                "EndLon": f"{end[1]:.6f}",
+            })
+        return cls(records, DEFAULT_PLACES)
+
+    @classmethod
+    def load(cls, directory: str) -> "FixtureSet":
+        with open(os.path.join(directory, "speedbands.json"), encoding="utf-8") as fh:
+            speedbands = json.load(fh)
+        places: Dict[str, Tuple[float, float]] = dict(DEFAULT_PLACES)
+        places_path = os.path.join(directory, "places.json")
+        if os.path.exists(places_path):
+            with open(places_path, encoding="utf-8") as fh:
+                places.update({name: tuple(latlon) for name, latlon in json.load(fh).items()})
+        return cls(speedbands, places)
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "speedbands.json"), "w", encoding="utf-8") as fh:
+            json.dump(self.speedbands, fh)
+        with open(os.path.join(directory, "places.json"), "w", encoding="utf-8") as fh:
+            json.dump({name: list(latlon) for name, latlon in self.places.items()}, fh, indent=1)
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _grid_axes(speedbands: List[dict]) -> Tuple[List[float], List[float]]:
+        lats, lons = set(), set()
+        for rec in speedbands:
+            try:
+                lats.update((round(float(rec["StartLat"]), 6), round(float(rec["EndLat"]), 6)))
+                lons.update((round(float(rec["StartLon"]), 6), round(float(rec["EndLon"]), 6)))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return sorted(lats), sorted(lons)
+
+    def geocode(self, query: str) -> Optional[Tuple[float, float]]:
+        """Known places by name; anything else hashes to a stable point."""
+
+        name = query.split(",")[0].strip().lower()
+        if name in self.places:
+            return self.places[name]
+        if "nowhere" in name:
+            return None
+        digest = hashlib.sha1(name.encode("utf-8")).digest()
+        return (
+            LAT_MIN + (LAT_MAX - LAT_MIN) * digest[0] / 255,
+            LON_MIN + (LON_MAX - LON_MIN) * digest[1] / 255,
+        )
+
+    def routes(self, start: Tuple[float, float], end: Tuple[float, float], points_per_leg: int = 100) -> List[dict]:
+        """Two L-shaped routes along the grid; coordinates are ``[lon, lat]``."""
+
+        lats, lons = self._grid
+        if not lats or not lons:
+            return []
+        snap = lambda axis, v: min(axis, key=lambda a: abs(a - v))  # noqa: E731
+        la1, lo1 = snap(lats, start[0]), snap(lons, start[1])
+        la2, lo2 = snap(lats, end[0]), snap(lons, end[1])
+
+        def path(corners):
+            pts = []
+            for (ya, xa), (yb, xb) in zip(corners, corners[1:]):
+                pts += [[xa + (xb - xa) * t / points_per_leg, ya + (yb - ya) * t / points_per_leg]
+                        for t in range(points_per_leg)]
+            return pts + [[corners[-1][1], corners[-1][0]]]
+
+        # Rough metres along the grid, at about 111 km per degree.
+        length = (abs(la2 - la1) + abs(lo2 - lo1)) * 111_000
+        return [
+            {"geometry": {"coordinates": path([(la1, lo1), (la1, lo2), (la2, lo2)])},
+             "distance": length, "duration": length / 9.0},
+            {"geometry": {"coordinates": path([(la1, lo1), (la2, lo1), (la2, lo2)])},
+             "distance": length * 1.05, "duration": length / 8.5},
+        ]
+
+
+class FakeUpstreams:
+    """One local HTTP server answering as all three upstream services.
+
+    ``latency_ms`` adds a fixed delay per upstream name (``nominatim``,
+    ``osrm``, ``datamall``) to approximate real round trips.  An upstream
+    named in ``failing`` answers every call with that HTTP status instead.
+    """
+
+    def __init__(self, fixtures: FixtureSet, latency_ms: Optional[Dict[str, float]] = None) -> None:
+        self.fixtures = fixtures
+        self.latency_ms = dict(latency_ms or {})
+        self.hits = {"nominatim": 0, "osrm": 0, "datamall": 0}
+        self.failing: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("fake upstreams are not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the backend at these fakes."""
+
+        return {
+            "LTA_SPEEDBANDS_URL": self.base_url + "/ltaodataservice/v4/TrafficSpeedBands",
+            "NOMINATIM_URL": self.base_url + "/search",
+            "OSRM_URL": self.base_url + "/route/v1/driving",
+        }
+
+    def start(self) -> "FakeUpstreams":
+        fakes = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                status, body = fakes._answer(self.path)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-upstreams", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeUpstreams":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    def _answer(self, raw_path: str) -> Tuple[int, object]:
+        url = urlsplit(raw_path)
+        query = parse_qs(url.query)
+        if "TrafficSpeedBands" in url.path:
+            name = "datamall"
+            skip = int(query.get("$skip", ["0"])[0])
+            result = 200, {"value": self.fixtures.speedbands[skip:skip + PAGE_SIZE]}
+        elif url.path.startswith("/search"):
+            name = "nominatim"
+            point = self.fixtures.geocode(query.get("q", [""])[0])
+            result = 200, ([{"lat": f"{point[0]:.6f}", "lon": f"{point[1]:.6f}"}] if point else [])
+        elif url.path.startswith("/route"):
+            name = "osrm"
+            try:
+                a, b = unquote(url.path.rsplit("/", 1)[-1]).split(";")
+                lon1, lat1 = map(float, a.split(","))
+                lon2, lat2 = map(float, b.split(","))
+            except ValueError:
+                return 400, {"code": "InvalidQuery"}
+            result = 200, {"code": "Ok", "routes": self.fixtures.routes((lat1, lon1), (lat2, lon2))}
+        else:
+            return 404, {"error": "not found"}
+
+        with self._lock:
+            self.hits[name] += 1
+        if name in self.failing:
+            return self.failing[name], {"error": f"{name} unavailable"}
+        delay = self.latency_ms.get(name, 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return result
+
+
+__all__ = ["FakeUpstreams", "FixtureSet"]
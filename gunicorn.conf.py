@@ -0,0 +1,29 @@
+"""Gunicorn settings for the driver backend.
+
+Run from the repository root::
+
+    gunicorn backend-app:app
+
+The app (and with it the congestion model) is imported once in the master
+process and shared copy-on-write with the forked workers.  Background
+threads (speed-band refresher, micro-batcher, upstream pools) are started
+lazily per process, so none of them is forked in a broken state.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+# Import the app and load the model before forking.
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the preload, just before workers are forked.
+    # Move everything allocated so far out of the collector's reach, so its
+    # passes never write to (and un-share) the preloaded pages in workers.
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,25 @@
+"""Shared fixtures for the backend test suite.
+
+Run from the repository root::
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The benchmarks' fake upstream servers double as test stand-ins.
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from upstreams import FakeUpstreams, FixtureSet  # noqa: E402
+
+
+@pytest.fixture
+def fake_upstreams():
+    """Fake Nominatim, OSRM and DataMall on a local port, three pages of speed bands."""
+
+    with FakeUpstreams(FixtureSet.synthetic(links=1200, seed=3)) as fakes:
+        yield fakes
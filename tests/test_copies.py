@@ -0,0 +1,47 @@
+"""Code the admin server copies from the backend must stay identical.
+
+``admin-frontend/server`` is deployed without the driver backend, so it keeps
+its own copies of a few backend modules instead of importing them.
+"""
+import ast
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        source = f.read()
+    return source, ast.parse(source)
+
+
+def top_level(path, name):
+    """Source of the top-level class, function or assignment named ``name``."""
+
+    source, tree = parse(path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+        else:
+            names = [getattr(node, "name", None)]
+        if name in names:
+            return ast.get_source_segment(source, node)
+    raise AssertionError(f"{name} not found in {path}")
+
+
+def code_after_docstring(path):
+    source, tree = parse(path)
+    docstring = tree.body[0]
+    assert isinstance(docstring, ast.Expr) and isinstance(docstring.value, ast.Constant)
+    return source.splitlines()[docstring.end_lineno:]
+
+
+def test_ttl_cache_copy_matches_backend():
+    for name in ("_MISSING", "TTLCache"):
+        assert top_level("admin-frontend/server/cache.py", name) == top_level("backend/cache.py", name)
+
+
+def test_json_provider_copy_matches_backend():
+    assert code_after_docstring("admin-frontend/server/jsonprovider.py") == code_after_docstring(
+        "backend/jsonprovider.py"
+    )
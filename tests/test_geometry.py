@@ -0,0 +1,31 @@
+"""Validation of the client-supplied geometry options."""
+import pytest
+
+from backend.geometry import parse_geometry_options
+
+
+@pytest.mark.parametrize("fmt, tolerance, expected", [
+    (None, None, ("geojson", 0.0)),
+    (" Polyline6 ", "5", ("polyline6", 5.0)),
+    ("polyline", 12.5, ("polyline", 12.5)),
+    ("", "", ("geojson", 0.0)),
+])
+def test_valid_options(fmt, tolerance, expected):
+    assert parse_geometry_options(fmt, tolerance) == expected
+
+
+@pytest.mark.parametrize("fmt, tolerance", [
+    (5, None),
+    (["geojson"], None),
+    ("wkt", None),
+    ("geojson", True),
+    ("geojson", [10]),
+    ("geojson", {"m": 10}),
+    ("geojson", "ten"),
+    ("geojson", "nan"),
+    ("geojson", 5000),
+])
+def test_invalid_options_raise_value_error(fmt, tolerance):
+    # ValueError is what the endpoints turn into a 400.
+    with pytest.raises(ValueError):
+        parse_geometry_options(fmt, tolerance)
@@ -0,0 +1,70 @@
+"""``SpeedBandIngester`` paging against the fake DataMall server."""
+import pytest
+
+from backend.ingest import IngestError, SpeedBandIngester
+from backend.outbound import OutboundClient, UpstreamConfig
+
+
+def make_ingester(fakes, fail_pages=None, **kwargs):
+    """Ingester whose listed pages fail that many times before succeeding."""
+
+    client = OutboundClient(UpstreamConfig(
+        name="datamall", base_url=fakes.env()["LTA_SPEEDBANDS_URL"],
+        read_timeout=5, retries=0, breaker_threshold=100,
+    ))
+    ingester = SpeedBandIngester(client, **kwargs)
+    fail_pages = dict(fail_pages or {})
+    fetch_page = ingester._fetch_page
+
+    def flaky_fetch_page(page):
+        if fail_pages.get(page, 0) > 0:
+            fail_pages[page] -= 1
+            raise IngestError(f"page {page} returned HTTP 503")
+        return fetch_page(page)
+
+    ingester._fetch_page = flaky_fetch_page
+    return ingester
+
+
+def test_all_pages_are_merged_in_order(fake_upstreams):
+    ingester = make_ingester(fake_upstreams, max_workers=3)
+    table = ingester.fetch()
+
+    expected = [int(rec["LinkID"]) for rec in fake_upstreams.fixtures.speedbands]
+    assert table.link_ids.tolist() == expected
+    assert ingester.stats()["complete"] is True
+    assert ingester.stats()["pages"] == 3
+
+
+def test_failing_page_is_retried(fake_upstreams):
+    ingester = make_ingester(fake_upstreams, fail_pages={1: 2}, max_workers=2, page_retries=2)
+    table = ingester.fetch()
+
+    assert len(table) == len(fake_upstreams.fixtures.speedbands)
+    stats = ingester.stats()
+    assert stats["complete"] is True
+    assert stats["missing_pages"] == []
+    assert stats["retried_pages"] == 1
+
+
+def test_page_failing_for_good_leaves_an_incomplete_table(fake_upstreams):
+    ingester = make_ingester(fake_upstreams, fail_pages={1: 3}, max_workers=2, page_retries=2)
+    table = ingester.fetch()
+
+    records = fake_upstreams.fixtures.speedbands
+    expected = [int(rec["LinkID"]) for rec in records[:500] + records[1000:]]
+    assert table.link_ids.tolist() == expected
+    stats = ingester.stats()
+    assert stats["complete"] is False
+    assert stats["missing_pages"] == [1]
+    assert stats["pages"] == 3
+    assert stats["coverage"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_no_page_at_all_raises(fake_upstreams):
+    fake_upstreams.failing["datamall"] = 503
+    ingester = make_ingester(fake_upstreams, max_workers=2, page_retries=1)
+    with pytest.raises(IngestError, match="no speed-band page"):
+        ingester.fetch()
+    # Requests stop once max_workers pages have failed for good.
+    assert fake_upstreams.hits["datamall"] <= 2 * 2 * 2
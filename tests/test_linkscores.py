@@ -0,0 +1,36 @@
+"""``LinkScoreTable`` clock handling across forecast horizons."""
+import numpy as np
+import pytest
+
+from backend.linkscores import LinkScoreTable
+from backend.speedtable import SpeedBandBuilder
+
+FEATURES = ["SpeedKMH_Est", "dow", "hour"]
+
+
+def make_table(**constants):
+    builder = SpeedBandBuilder()
+    builder.extend([
+        {"LinkID": 101, "MinimumSpeed": "20", "MaximumSpeed": "29", "SpeedBand": 3},
+        {"LinkID": 102, "MinimumSpeed": "40", "MaximumSpeed": "49", "SpeedBand": 5},
+    ])
+    return builder.build(constants=constants)
+
+
+def clock_score(X):
+    # Encode (dow, hour) in the probability so the test can read it back.
+    return (X[:, 1] * 100 + X[:, 2]) / 1000
+
+
+def test_horizons_within_the_day_keep_dow():
+    table = LinkScoreTable.build(make_table(dow=2, hour=8, minute=20), FEATURES, clock_score)
+
+    assert np.allclose(table.route_probabilities([101]) * 1000, [208, 208, 208, 209])
+
+
+def test_horizon_crossing_midnight_advances_dow():
+    table = LinkScoreTable.build(make_table(dow=6, hour=23, minute=50), FEATURES, clock_score)
+
+    # +15, +30 and +60 minutes fall on Monday (dow 0) after Sunday 23:50.
+    assert np.allclose(table.route_probabilities([101, 102]) * 1000, [623, 0, 0, 0])
+    assert table.route_probability([101], horizon=0) == pytest.approx(0.623)
@@ -0,0 +1,56 @@
+"""``AsyncQueueHandler`` flushing and shutdown."""
+import logging
+
+from backend.logs import AsyncQueueHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name):
+    target = ListHandler()
+    handler = AsyncQueueHandler(target)
+    logger = logging.getLogger(f"tests.logs.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger, handler, target
+
+
+def test_flush_drains_without_stopping_the_listener():
+    logger, handler, target = make_logger("flush")
+    try:
+        for i in range(100):
+            logger.info("record %d", i)
+        listener = handler._listener
+        handler.flush()
+        assert len(target.messages) == 100
+        assert handler._listener is listener
+        assert listener._thread is not None and listener._thread.is_alive()
+
+        logger.info("after flush")
+        handler.flush()
+        assert target.messages[-1] == "after flush"
+        assert handler._listener is listener
+    finally:
+        handler.close()
+
+
+def test_close_writes_out_queued_records_and_stops():
+    logger, handler, target = make_logger("close")
+    for i in range(50):
+        logger.info("record %d", i)
+    handler.close()
+
+    assert len(target.messages) == 50
+    assert handler._listener is None
+    logger.info("after close")
+    assert handler.dropped == 1
+    assert len(target.messages) == 50
+    handler.close()  # closing again is harmless
@@ -0,0 +1,129 @@
+"""``OutboundClient`` policies against the fake upstreams."""
+import gc
+import threading
+import time
+
+import pytest
+
+from backend.outbound import (
+    CircuitOpenError,
+    ConcurrencyLimitError,
+    OutboundClient,
+    RetryBudget,
+    UpstreamConfig,
+)
+
+
+def make_client(fakes, **kwargs):
+    kwargs = {"connect_timeout": 0.1, "read_timeout": 0.2, "retries": 0, "max_concurrency": 1, **kwargs}
+    return OutboundClient(UpstreamConfig(
+        name="datamall", base_url=fakes.env()["LTA_SPEEDBANDS_URL"], backoff=0.001, **kwargs,
+    ))
+
+
+def test_streamed_response_holds_its_slot_until_closed(fake_upstreams):
+    client = make_client(fake_upstreams)
+    response = client.get(stream=True)
+
+    with pytest.raises(ConcurrencyLimitError):
+        client.get()
+
+    response.json()
+    response.close()
+    response.close()  # closing twice releases the slot once
+    assert client.get().status_code == 200
+    assert client._slots.acquire(blocking=False)
+    assert not client._slots.acquire(blocking=False)
+
+
+def test_streamed_response_used_as_context_manager_releases_slot(fake_upstreams):
+    client = make_client(fake_upstreams)
+    with client.get(stream=True) as response:
+        assert response.status_code == 200
+    assert client.get(stream=True).status_code == 200
+
+
+def test_unclosed_streamed_response_releases_slot_when_collected(fake_upstreams):
+    client = make_client(fake_upstreams)
+    client.get(stream=True)
+    gc.collect()
+    assert client.get().status_code == 200
+
+
+def test_buffered_responses_release_their_slot_on_return(fake_upstreams):
+    client = make_client(fake_upstreams)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get().status_code)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200] * 4
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once_reset(fake_upstreams):
+    client = make_client(fake_upstreams, breaker_threshold=2, breaker_reset=0.2)
+    fake_upstreams.failing["datamall"] = 503
+
+    assert client.get().status_code == 503
+    assert client.get().status_code == 503
+    assert client.stats()["circuit"] == "open"
+    hits = fake_upstreams.hits["datamall"]
+    with pytest.raises(CircuitOpenError):
+        client.get()
+    assert fake_upstreams.hits["datamall"] == hits
+
+    # Half-open: one probe goes through; its failure reopens the circuit.
+    time.sleep(0.25)
+    assert client.stats()["circuit"] == "half-open"
+    assert client.get().status_code == 503
+    assert client.stats()["circuit"] == "open"
+
+    time.sleep(0.25)
+    del fake_upstreams.failing["datamall"]
+    assert client.get().status_code == 200
+    assert client.stats()["circuit"] == "closed"
+    stats = client.stats()
+    assert (stats["requests"], stats["failures"], stats["short_circuited"]) == (5, 3, 1)
+
+
+def test_retries_are_capped_by_the_retry_budget(fake_upstreams):
+    client = make_client(
+        fake_upstreams, retries=3, breaker_threshold=100,
+        retry_budget_ratio=0.0, retry_budget_max_tokens=1.0,
+    )
+    fake_upstreams.failing["datamall"] = 503
+
+    assert client.get().status_code == 503
+    # Budget of one retry: two attempts, then the 503 is returned.
+    assert fake_upstreams.hits["datamall"] == 2
+    assert client.get().status_code == 503
+    assert fake_upstreams.hits["datamall"] == 3
+    assert client.stats()["retries"] == 1
+
+    del fake_upstreams.failing["datamall"]
+    assert client.get().status_code == 200
+
+
+def test_retry_budget_earns_a_fraction_of_a_retry_per_request():
+    budget = RetryBudget(ratio=0.5, max_tokens=1.0)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_counters_are_exact_under_concurrency(fake_upstreams):
+    client = make_client(fake_upstreams, max_concurrency=8, read_timeout=5)
+    threads = [threading.Thread(target=lambda: [client.get().close() for _ in range(25)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.stats()["requests"] == 200
@@ -0,0 +1,133 @@
+"""``SpeedBandStore`` against the fake DataMall server."""
+import time
+
+import pytest
+
+from backend.ingest import SpeedBandIngester
+from backend.outbound import OutboundClient, UpstreamConfig
+from backend.speedbands import SpeedBandStore
+
+
+def make_store(fakes, **kwargs):
+    client = OutboundClient(UpstreamConfig(
+        name="datamall", base_url=fakes.env()["LTA_SPEEDBANDS_URL"],
+        read_timeout=5, retries=0, breaker_threshold=100,
+    ))
+    ingester = SpeedBandIngester(client, max_workers=2)
+    return SpeedBandStore(lambda: ingester.fetch(constants={"hour": 8}), **kwargs)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_first_snapshot_is_fetched_synchronously(fake_upstreams):
+    store = make_store(fake_upstreams, refresh_interval=3600)
+    try:
+        assert store.status()["rows"] == 0
+
+        snapshot = store.snapshot()
+
+        assert snapshot is not None
+        assert len(snapshot.table) == len(fake_upstreams.fixtures.speedbands)
+        assert snapshot.table.constants["hour"] == 8
+        # Served from memory until the refresh interval passes.
+        hits = fake_upstreams.hits["datamall"]
+        assert store.snapshot() is snapshot
+        assert fake_upstreams.hits["datamall"] == hits
+        assert store.status()["stale"] is False
+    finally:
+        store.stop(timeout=1)
+
+
+def test_background_refresh_replaces_snapshot(fake_upstreams):
+    store = make_store(fake_upstreams, refresh_interval=0.2)
+    try:
+        first = store.snapshot()
+        fake_upstreams.fixtures.speedbands[0]["SpeedBand"] = 8
+        fake_upstreams.fixtures.speedbands[0]["MinimumSpeed"] = "71"
+
+        assert wait_for(lambda: store.snapshot() is not first)
+        second = store.snapshot()
+        assert second.fetched_at > first.fetched_at
+        row = second.table.rows([fake_upstreams.fixtures.speedbands[0]["LinkID"]])
+        assert second.table.speed_band[row][0] == 8
+    finally:
+        store.stop(timeout=1)
+
+
+def test_failed_refresh_keeps_previous_snapshot_and_marks_it_stale(fake_upstreams):
+    store = make_store(fake_upstreams, refresh_interval=3600, max_stale=3600)
+    try:
+        first = store.snapshot()
+        fake_upstreams.failing["datamall"] = 503
+
+        assert store.refresh() is False
+        assert store.snapshot() is first
+        status = store.status()
+        assert status["stale"] is True
+        assert status["consecutive_failures"] == 1
+        assert "503" in status["last_error"]
+
+        del fake_upstreams.failing["datamall"]
+        assert store.refresh() is True
+        assert store.snapshot() is not first
+        assert store.status()["stale"] is False
+    finally:
+        store.stop(timeout=1)
+
+
+def test_snapshot_past_max_stale_is_not_served(fake_upstreams):
+    store = make_store(fake_upstreams, refresh_interval=3600, max_stale=0.1)
+    try:
+        assert store.snapshot() is not None
+        fake_upstreams.failing["datamall"] = 503
+        time.sleep(0.15)
+        assert store.refresh() is False
+        assert store.snapshot() is None
+    finally:
+        store.stop(timeout=1)
+
+
+def test_derivers_run_once_per_snapshot(fake_upstreams):
+    store = make_store(fake_upstreams, refresh_interval=3600)
+    built = []
+
+    def rows(table):
+        built.append(table)
+        return len(table)
+
+    def broken(table):
+        raise RuntimeError("cannot build")
+
+    store.register_derived("rows", rows)
+    store.register_derived("broken", broken)
+    try:
+        first = store.snapshot()
+        store.snapshot()
+        assert built == [first.table]
+        assert first.derived == {"rows": len(first.table)}
+
+        assert store.refresh() is True
+        second = store.snapshot()
+        assert built == [first.table, second.table]
+        assert second.derived["rows"] == len(second.table)
+        assert "broken" not in second.derived
+    finally:
+        store.stop(timeout=1)
+
+
+@pytest.mark.parametrize("status", [500, 404])
+def test_first_fetch_failure_returns_none(fake_upstreams, status):
+    fake_upstreams.failing["datamall"] = status
+    store = make_store(fake_upstreams, refresh_interval=3600)
+    try:
+        assert store.snapshot() is None
+        assert store.status()["consecutive_failures"] >= 1
+    finally:
+        store.stop(timeout=1)
@@ -0,0 +1,72 @@
+"""``TermMatcher`` against one regular expression (or ``str.count``) per term."""
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "admin-frontend"))
+
+import server.analyzer as analyzer  # noqa: E402
+from server.termmatch import TermMatcher  # noqa: E402
+
+FAMILIES = {
+    "uncertainty_terms": analyzer.UNCERTAINTY_TERMS,
+    "evidence_terms": analyzer.MEDIA_HINT_TERMS,
+    "concrete_terms": analyzer.CONCRETE_DETAIL_TERMS,
+}
+TERMS = sorted(set().union(*FAMILIES.values()))
+FILLER = [
+    "traffic", "jam", "broad", "roads", "lanes", "imagery", "kilometre", "12km", "Not", "sure,",
+    "PHOTO", "video-clip", "café", "naïve", "exit_3", "(cctv)", "…", "near", "the", "at",
+]
+
+
+def whole_word_pattern(term):
+    # Words are runs of letters; anything else between them is a separator.
+    words = re.findall(r"[^\W\d_]+", term)
+    return re.compile(r"(?<![^\W\d_])" + r"[\W\d_]+".join(map(re.escape, words)) + r"(?![^\W\d_])", re.IGNORECASE)
+
+
+def baseline_whole_words(text):
+    return tuple(
+        sum(len(whole_word_pattern(term).findall(text)) for term in terms)
+        for terms in FAMILIES.values()
+    )
+
+
+def baseline_substrings(text):
+    lowered = text.lower()
+    return tuple(sum(lowered.count(term.lower()) for term in terms) for terms in FAMILIES.values())
+
+
+def random_texts(n=500, seed=0):
+    rnd = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = []
+        for _ in range(rnd.randint(0, 40)):
+            word = rnd.choice(TERMS) if rnd.random() < 0.3 else rnd.choice(FILLER)
+            words.append(word.upper() if rnd.random() < 0.1 else word)
+        texts.append(rnd.choice([" ", "  ", ", ", "\n"]).join(words))
+    return texts
+
+
+def test_whole_word_counts_match_regex_baseline():
+    matcher = TermMatcher(FAMILIES, whole_words=True)
+    for text in random_texts():
+        assert matcher.count(text) == baseline_whole_words(text), text
+
+
+def test_substring_counts_match_str_count():
+    matcher = TermMatcher(FAMILIES)
+    for text in random_texts(seed=1):
+        assert matcher.count(text) == baseline_substrings(text), text
+
+
+def test_whole_words_skip_terms_inside_longer_words():
+    matcher = TermMatcher({"road": ["road"], "phrase": ["not sure"]}, whole_words=True)
+
+    assert matcher.count("broad roads, road") == (1, 0)
+    assert matcher.count("Not sure... not  SURE not sure") == (0, 3)
+    assert matcher.count("notsure, not sured") == (0, 0)
+    assert TermMatcher({"road": ["road"], "phrase": ["not sure"]}).count("broad roads, road") == (3, 0)
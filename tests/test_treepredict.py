@@ -0,0 +1,133 @@
+"""Parity of ``CompiledForest`` with sklearn's ``predict_proba``."""
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+from backend.startup import load_model_bundle
+from backend.treepredict import CompiledForest, compile_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_FEATURES = 5
+
+# The bundled models were fitted on DataFrames.
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+
+def training_data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, N_FEATURES))
+    X[:, 3] = rng.integers(0, 6, size=n)  # few distinct values
+    y = (X[:, 0] + 0.5 * X[:, 1] ** 2 - 0.3 * X[:, 3] + rng.normal(scale=0.5, size=n) > 0.2).astype(int)
+    # Missing values in training, so both missing-value directions are learned.
+    X[rng.random(n) < 0.1, 0] = np.nan
+    X[(rng.random(n) < 0.1) & (y == 1), 2] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def model():
+    X, y = training_data()
+    return HistGradientBoostingClassifier(max_iter=60, max_depth=6, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def forest(model):
+    return CompiledForest.from_sklearn(model)
+
+
+def query_rows(forest, n=2000, seed=1):
+    """Rows covering the split thresholds, values never seen in training, and NaN."""
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(scale=2.0, size=(n, N_FEATURES))
+    internal = forest.left != np.arange(forest.n_nodes)
+    # Exactly on a threshold goes left, like sklearn's ``<=``.
+    nodes = rng.choice(np.flatnonzero(internal), size=n // 4)
+    X[np.arange(n // 4), forest.feature[nodes]] = forest.threshold[nodes]
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[: 10] = np.nan
+    X[10:20, 3] = rng.choice([-1e9, 7.5, 1e9], size=10)  # outside every training bin
+    X[20:30] = np.inf
+    X[30:40] = -np.inf
+    return X
+
+
+def assert_same(model, forest, X):
+    expected = model.predict_proba(X)[:, 1]
+    np.testing.assert_array_equal(forest.predict_proba(X), expected)
+
+
+def test_matches_predict_proba_on_a_batch(model, forest):
+    assert_same(model, forest, query_rows(forest))
+
+
+def test_matches_predict_proba_row_by_row(model, forest):
+    X = query_rows(forest, n=200, seed=2)
+    for row in X:
+        assert_same(model, forest, row[None, :])
+
+
+def test_all_missing_row_follows_learned_defaults(model, forest):
+    internal = forest.left != np.arange(forest.n_nodes)
+    assert forest.missing_left[internal].any() and not forest.missing_left[internal].all()
+    assert_same(model, forest, np.full((1, N_FEATURES), np.nan))
+
+
+def test_empty_batch(forest):
+    assert forest.predict_proba(np.empty((0, N_FEATURES))).shape == (0,)
+
+
+def test_wrong_feature_count_is_rejected(forest):
+    with pytest.raises(ValueError, match="feature columns"):
+        forest.predict_proba(np.zeros((2, N_FEATURES + 1)))
+
+
+def test_verify_returns_zero_difference(model, forest):
+    assert forest.verify(model, query_rows(forest, n=100)) == 0.0
+
+
+def test_npz_round_trip(tmp_path, model, forest):
+    path = str(tmp_path / "trees.npz")
+    forest.export(path)
+    loaded = CompiledForest.load(path)
+
+    assert (loaded.n_trees, loaded.n_nodes, loaded.max_depth) == (forest.n_trees, forest.n_nodes, forest.max_depth)
+    assert loaded.baseline == forest.baseline
+    X = query_rows(forest, n=500, seed=3)
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+    assert_same(model, loaded, X)
+
+
+def test_categorical_model_is_not_compiled():
+    X, y = training_data(n=500)
+    X[:, 3] = np.nan_to_num(X[:, 3])
+    model = HistGradientBoostingClassifier(
+        max_iter=5, categorical_features=[3], random_state=0
+    ).fit(X, y)
+    with pytest.raises(ValueError, match="categorical"):
+        CompiledForest.from_sklearn(model)
+
+
+def test_multiclass_model_is_not_compiled():
+    X, y = training_data(n=500)
+    y = np.where(np.isnan(X[:, 0]), 2, y)
+    model = HistGradientBoostingClassifier(max_iter=5, random_state=0).fit(X, y)
+    with pytest.raises(ValueError, match="binary"):
+        CompiledForest.from_sklearn(model)
+
+
+@pytest.mark.parametrize("bundle", ["congestion_model.pkl", "congestion_model_2.pkl"])
+def test_bundled_models(bundle):
+    path = os.path.join(ROOT, bundle)
+    if not os.path.exists(path):
+        pytest.skip(f"{bundle} is not present")
+    loaded = load_model_bundle(path)
+    model, features = loaded["model"], list(loaded["features"])
+    forest = compile_for(model, features)
+
+    X = np.random.default_rng(4).uniform(0, 100, size=(300, len(features)))
+    X[::7, 0] = np.nan
+    assert_same(model, forest, X)
+    assert_same(model, forest, X[:1])